@@ -6,6 +6,8 @@ import clerk from '@clerk/astro';
 // Sitemap disabled - private project, no indexing allowed
 // import sitemap from "@astrojs/sitemap";
 import compressor from 'astro-compressor';
+// Generated by scripts/fix-jng-routes.py from scripts/jng-route-map.json
+import legacyRedirects from './src/data/legacy-redirects.json';
 
 const appSiteUrl = process.env.PUBLIC_SITE_URL || 'https://jobnagringa.com.br';
 const clerkAccountsUrl =
@@ -197,6 +199,6 @@ export default defineConfig({
     },
   },
 
-  // Redirects for legacy URLs if needed
-  redirects: {},
+  // Redirects for legacy URLs (old /jng/ routes -> current pages)
+  redirects: legacyRedirects,
 });
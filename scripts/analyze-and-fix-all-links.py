@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 """
 Comprehensive analysis and fix of all <a> tags in src directory.
-Finds inconsistencies and errors in href attributes.
+Finds inconsistencies and errors in href attributes; links are checked
+against the route table of src/pages and public/.
 """
 
-import re
 from pathlib import Path
 from collections import defaultdict
 
+from asset_tools.routes import load_route_table
+from asset_tools.tokenizer import attribute_values, tokenize
+
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
 
@@ -49,7 +52,15 @@ def analyze_href(href_value, file_path, line_num):
             'suggestion': new_value
         })
     
-    # Issue 3: Hash-only links that might be incorrect
+    # Issue 3: Absolute links no page or public file serves
+    elif href_value.startswith('/') and not href_value.startswith('//') and not load_route_table().exists(href_value):
+        href_issues.append({
+            'type': 'missing_route',
+            'current': href_value,
+            'suggestion': '(no matching page)'
+        })
+    
+    # Issue 4: Hash-only links that might be incorrect
     if href_value.startswith('#') and len(href_value) > 1:
         # Check if it's a page name with hash (like "palavras-chave-dos-donts#")
         # This pattern suggests it should be an absolute path
@@ -57,94 +68,87 @@ def analyze_href(href_value, file_path, line_num):
     
     return href_issues
 
-def find_all_anchor_tags(content, file_path):
+def find_all_anchor_tags(tokens, file_path):
     """Find all <a> tags and analyze their href attributes."""
-    # Pattern to match <a> tags with href
-    pattern = r'<a[^>]*href=(["\'])([^"\']+)\1[^>]*>'
-    
     matches = []
-    for match in re.finditer(pattern, content):
-        quote_char = match.group(1)
-        href_value = match.group(2)
-        line_num = content[:match.start()].count('\n') + 1
+    for token in attribute_values(tokens, 'href'):
+        if token.tag.lower() != 'a' or not token.value or token.quote == '{':
+            continue
         
-        issues_found = analyze_href(href_value, file_path, line_num)
+        issues_found = analyze_href(token.value, file_path, token.line)
         if issues_found:
             matches.append({
-                'match': match,
-                'href': href_value,
-                'line': line_num,
+                'token': token,
+                'href': token.value,
+                'line': token.line,
                 'issues': issues_found
             })
     
     return matches
 
-def fix_href_issues(content, file_path):
+def fix_relative_page_link(href, file_path):
+    """Fix 1: href="page-name#" -> href="/aulas/page-name#" or href="/modulo/page-name#"."""
+    # Skip if already absolute or external
+    if href.startswith(('/', 'http', 'mailto:', 'tel:', '#')):
+        return href
+    
+    if '#' in href:
+        page_name, hash_part = href.split('#', 1)
+        if not page_name:
+            return href
+        suffix = f'{page_name}#{hash_part}'
+    else:
+        suffix = href
+    
+    # Determine correct path based on file location
+    file_str = str(file_path)
+    if '/jng/aulas' in file_str:
+        candidates = [f'/jng/aulas/{suffix}']
+    elif '/aulas' in file_str:
+        candidates = [f'/aulas/{suffix}']
+    elif '/jng/modulo' in file_str:
+        candidates = [f'/jng/modulo/{suffix}']
+    elif '/modulo' in file_str:
+        candidates = [f'/modulo/{suffix}']
+    else:
+        candidates = []
+    candidates.append(f'/{suffix}')
+    
+    # Only rewrite to a route that exists
+    routes = load_route_table()
+    for candidate in candidates:
+        if routes.exists(candidate):
+            return candidate
+    return href
+
+def fix_index_path(href):
+    """Fix 2: /index -> /."""
+    if href == '/index' or href.startswith('/index#'):
+        return href.replace('/index', '/', 1)
+    return href
+
+def fix_href_issues(content, tokens, file_path):
     """Fix all href issues found in content."""
     fixes_made = []
-    
-    # Fix 1: Relative paths without leading slash (page names)
-    # Pattern: href="page-name#" -> href="/aulas/page-name#" or href="/modulo/page-name#"
-    def fix_relative_page_links(match):
-        quote = match.group(1)
-        href = match.group(2)
-        
-        # Skip if already absolute or external
-        if href.startswith(('/', 'http', 'mailto:', 'tel:', '#')):
-            return match.group(0)
-        
-        # Check if it's a page name with hash
-        if '#' in href:
-            page_name, hash_part = href.split('#', 1)
-            if page_name:
-                # Determine correct path based on file location
-                file_str = str(file_path)
-                if '/jng/aulas' in file_str:
-                    new_href = f'/jng/aulas/{page_name}#{hash_part}'
-                elif '/aulas' in file_str:
-                    new_href = f'/aulas/{page_name}#{hash_part}'
-                elif '/jng/modulo' in file_str:
-                    new_href = f'/jng/modulo/{page_name}#{hash_part}'
-                elif '/modulo' in file_str:
-                    new_href = f'/modulo/{page_name}#{hash_part}'
-                else:
-                    new_href = f'/{page_name}#{hash_part}'
-                fixes_made.append(f'{href} -> {new_href}')
-                return f'href={quote}{new_href}{quote}'
-        elif href:
-            # Just a page name without hash
-            file_str = str(file_path)
-            if '/jng/aulas' in file_str:
-                new_href = f'/jng/aulas/{href}'
-            elif '/aulas' in file_str:
-                new_href = f'/aulas/{href}'
-            elif '/jng/modulo' in file_str:
-                new_href = f'/jng/modulo/{href}'
-            elif '/modulo' in file_str:
-                new_href = f'/modulo/{href}'
-            else:
-                new_href = f'/{href}'
-            fixes_made.append(f'{href} -> {new_href}')
-            return f'href={quote}{new_href}{quote}'
-        
-        return match.group(0)
-    
-    pattern1 = r'href=(["\'])([^"\']+)\1'
-    content = re.sub(pattern1, fix_relative_page_links, content)
-    
-    # Fix 2: /index -> /
-    def fix_index_path(match):
-        quote = match.group(1)
-        href = match.group(2)
-        
-        if href == '/index' or href.startswith('/index#'):
-            new_href = href.replace('/index', '/', 1)
-            fixes_made.append(f'{href} -> {new_href}')
-            return f'href={quote}{new_href}{quote}'
-        
-        return match.group(0)
-    
-    content = re.sub(pattern1, fix_index_path, content)
+    edits = []
+    
+    for token in attribute_values(tokens, 'href'):
+        # Only quoted values are rewritten; expressions are left alone
+        if not token.value or token.quote not in ('"', "'"):
+            continue
+        href = token.value
+        fixed = fix_relative_page_link(href, file_path)
+        if fixed != href:
+            fixes_made.append(f'{href} -> {fixed}')
+        indexed = fix_index_path(fixed)
+        if indexed != fixed:
+            fixes_made.append(f'{fixed} -> {indexed}')
+        if indexed != href:
+            edits.append((token.start, token.end, indexed))
+    
+    # Apply from the end so earlier offsets stay valid
+    for start, end, value in reversed(edits):
+        content = content[:start] + value + content[end:]
     
     return content, fixes_made
 
@@ -156,11 +160,14 @@ def process_file(file_path):
         
         original_content = content
         
+        # One tokenizer pass is shared by the analysis and the fixes
+        tokens = list(tokenize(content, file_path))
+        
         # Find all anchor tags with issues
-        anchor_issues = find_all_anchor_tags(content, file_path)
+        anchor_issues = find_all_anchor_tags(tokens, file_path)
         
         # Fix issues
-        content, fixes_made = fix_href_issues(content, file_path)
+        content, fixes_made = fix_href_issues(content, tokens, file_path)
         
         if content != original_content:
             with open(file_path, 'w', encoding='utf-8') as f:
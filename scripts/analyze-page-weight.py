@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Compute what each route ships and check it against per-route byte budgets.
+
+Follows each src/pages/**/*.astro page through BaseLayout.astro, the navbar
+components and imported stylesheets, totals bytes by type (images, CSS, JS,
+fonts, template HTML) and lists the largest files per page.
+
+Budgets live in page-weight-budget.json (next to the Lighthouse budget.json):
+
+    {
+      "headroom": 0.05,
+      "default": {"total": 3000000},
+      "routes": {"/": {"total": 1200000, "images": 400000}, "/aulas/*": {...}}
+    }
+
+Usage:
+    python3 scripts/analyze-page-weight.py                  # report + budget check
+    python3 scripts/analyze-page-weight.py --top 10         # show 10 offenders per page
+    python3 scripts/analyze-page-weight.py --update-budget  # write budgets from current weights
+    python3 scripts/analyze-page-weight.py --profile        # also write cProfile/collapsed stacks
+
+Exit code 1 when any route exceeds its budget.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from asset_tools.paths import BASE_DIR, SCRIPTS_DIR
+from asset_tools.page_weight import WEIGHT_TYPES, analyze_site, budgets_from_results, check_budgets
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+BUDGET_FILE = BASE_DIR / "page-weight-budget.json"
+REPORT_FILE = SCRIPTS_DIR / "page-weight-report.json"
+
+
+def format_kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Per-route page weight analyzer")
+    parser.add_argument("--budget", type=Path, default=BUDGET_FILE, help="Byte budget file")
+    parser.add_argument("--top", type=int, default=5, help="Offenders to list per page")
+    parser.add_argument("--route", help="Only print this route")
+    parser.add_argument("--update-budget", action="store_true", help="Rewrite budgets from the current weights")
+    parser.add_argument("--headroom", type=float, default=None, help="Headroom used with --update-budget")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("analyze-page-weight", args.profile):
+        return analyze_weights(args)
+
+
+def analyze_weights(args):
+    """Analyze every route, write the report and check the budgets."""
+    started = time.perf_counter()
+    with span("analyze"):
+        results = analyze_site()
+    elapsed = time.perf_counter() - started
+
+    budgets = {}
+    if args.budget.exists():
+        with open(args.budget, "r", encoding="utf-8") as f:
+            budgets = json.load(f)
+
+    if args.update_budget:
+        headroom = args.headroom if args.headroom is not None else budgets.get("headroom", 0.05)
+        budgets = budgets_from_results(results, headroom, budgets)
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"✓ Budgets for {len(results)} routes written to {args.budget.relative_to(BASE_DIR)}")
+        return 0
+
+    print("=" * 70)
+    print("PAGE WEIGHT REPORT")
+    print("=" * 70)
+    for result in sorted(results, key=lambda r: -r["totals"]["total"]):
+        if args.route and result["route"] != args.route:
+            continue
+        totals = result["totals"]
+        breakdown = ", ".join(f"{kind} {format_kb(totals[kind])}" for kind in WEIGHT_TYPES if totals[kind])
+        print(f"\n{result['route']}  {format_kb(totals['total'])}")
+        print(f"  {breakdown}")
+        for item in result["offenders"][:args.top]:
+            print(f"    {format_kb(item['size']):>10}  [{item['type']}] {item['path']}")
+        if result["missing"]:
+            print(f"  ⚠ {len(result['missing'])} referenced asset(s) missing from public/")
+
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    violations = check_budgets(results, budgets) if budgets else []
+    print()
+    print("=" * 70)
+    print(f"Analyzed {len(results)} routes in {elapsed * 1000:.0f} ms")
+    print(f"Report saved to: {REPORT_FILE.relative_to(BASE_DIR)}")
+    if not budgets:
+        print(f"No budget file at {args.budget}; run with --update-budget to create one")
+        return 0
+    if violations:
+        print(f"\n✗ {len(violations)} budget violation(s):")
+        for route, kind, actual, limit in violations:
+            print(f"  {route} [{kind}] {format_kb(actual)} > {format_kb(limit)} (+{format_kb(actual - limit)})")
+        return 1
+    print("✓ All routes within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
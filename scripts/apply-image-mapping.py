@@ -3,13 +3,13 @@
 Apply the image mapping to actually move and rename files.
 """
 
-import json
 import shutil
 from pathlib import Path
 
+from asset_tools.catalog import open_catalog
+
 BASE_DIR = Path(__file__).parent.parent
 CDN_ASSETS = BASE_DIR / "public" / "cdn-assets"
-MAPPING_FILE = BASE_DIR / "scripts" / "image-mapping.json"
 
 def main():
     """Apply the mapping."""
@@ -18,8 +18,11 @@ def main():
     print("=" * 70)
     
     # Load mapping
-    with open(MAPPING_FILE, "r", encoding="utf-8") as f:
-        mapping = json.load(f)
+    with open_catalog() as catalog:
+        mapping = {
+            item["extra"]["old_relative"]: item["extra"]
+            for item in catalog.mappings("image-mapping")
+        }
     
     print(f"\nLoaded {len(mapping)} image mappings")
     
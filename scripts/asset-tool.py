@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the asset scripts.
+
+Usage:
+    python3 scripts/asset-tool.py                       # list commands
+    python3 scripts/asset-tool.py audit 404 --fix
+    python3 scripts/asset-tool.py convert webp
+    python3 scripts/asset-tool.py rewrite jng-routes --dry-run
+"""
+
+import sys
+
+from asset_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""
+Shared helpers for the asset tooling scripts in scripts/.
+
+The standalone scripts import from this package (scripts/ is on sys.path
+when a script is run directly), so common paths and heavier engines live
+in one place instead of being copied into every script.
+"""
@@ -0,0 +1,7 @@
+"""``python3 -m asset_tools`` (from scripts/) runs the unified CLI."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Benchmarks for the hot paths of the asset tooling.
+
+Every benchmark runs against the fixture corpus in scripts/benchmarks/
+fixtures/: three pages in their pre-migration shape (PNG references,
+legacy /jng/ links), the route patterns of src/pages and the legacy route
+map, so results stay comparable across commits even as the site changes.
+Encode benchmarks use a generated image and need Pillow; they are skipped
+without it or when Pillow lacks the format. ``Corpus.synthetic`` swaps in
+a generated site of any size (asset_tools.synthetic) to see how the same
+paths scale.
+
+Results are kept in scripts/.cache/benchmark-history.json, the same shape
+as the Lighthouse history in .lighthouseci/history.json (entries with git
+info, trimmed by age and count), and ``compare`` flags benchmarks whose
+median got slower than a threshold. Timings only compare on the machine
+that took them, so the history stays local like the other caches.
+"""
+
+import hashlib
+import importlib.util
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from .paths import BASE_DIR, CACHE_DIR, SCRIPTS_DIR
+from .references import extract_asset_references
+from .route_map import RouteRewriter
+from .routes import RouteTable, page_route
+from .synthetic import SyntheticSite
+from .tokenizer import attribute_values, tokenize
+from .watch import extract_references
+
+FIXTURES_DIR = SCRIPTS_DIR / "benchmarks" / "fixtures"
+HISTORY_FILE = CACHE_DIR / "benchmark-history.json"
+DEFAULT_THRESHOLD = 0.10
+
+
+class BenchmarkSkipped(Exception):
+    """A benchmark cannot run here (missing optional dependency or codec)."""
+
+
+class Corpus:
+    """Pages, route patterns and route map a benchmark run works on."""
+
+    def __init__(self, pages, routes, route_map):
+        self.pages = pages  # [(name, content)]
+        self.routes = routes
+        self.route_map = route_map
+        self._tokens = None
+
+    @classmethod
+    def load(cls, fixtures_dir=FIXTURES_DIR):
+        fixtures_dir = Path(fixtures_dir)
+        pages = [(path.name, path.read_bytes().decode("utf-8", "surrogateescape"))
+                 for path in sorted((fixtures_dir / "pages").iterdir()) if path.is_file()]
+        with open(fixtures_dir / "routes.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(pages, data["routes"], data["route_map"])
+
+    @classmethod
+    def synthetic(cls, **params):
+        """Corpus of a generated site (see SyntheticSite for the parameters)."""
+        site = SyntheticSite(**params)
+        pages = list(site.iter_pages())
+        routes = [page_route(Path(page), Path(".")) for page, _ in pages]
+        return cls(pages, routes, site.route_map)
+
+    @property
+    def bytes(self):
+        return sum(len(content.encode("utf-8", "surrogateescape")) for _, content in self.pages)
+
+    def tokens(self):
+        """Tokens of every page (computed once, for benchmarks that start after tokenizing)."""
+        if self._tokens is None:
+            self._tokens = [list(tokenize(content, name)) for name, content in self.pages]
+        return self._tokens
+
+    def route_table(self):
+        table = RouteTable()
+        for route in self.routes:
+            table.add(route, "src/pages" + route)
+        return table
+
+    def links(self):
+        return [token.value for tokens in self.tokens() for token in attribute_values(tokens, "href")
+                if token.value.startswith("/") and not token.value.startswith("//")]
+
+    def srcsets(self):
+        return [token.value for tokens in self.tokens() for token in tokens
+                if token.name and token.name.lower() == "srcset" and token.value]
+
+
+def load_script(name):
+    """Import a hyphen-named script from scripts/ as a module (its main() is not run)."""
+    path = SCRIPTS_DIR / name
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Each benchmark: setup(corpus) -> (run, units, unit). run() is timed.
+
+def bench_extract_references(corpus):
+    pages = corpus.pages
+
+    def run():
+        for name, content in pages:
+            extract_references(content, name, name)
+    return run, corpus.bytes, "B"
+
+
+def bench_extract_asset_references(corpus):
+    pages = corpus.pages
+
+    def run():
+        for name, content in pages:
+            extract_asset_references(content, name)
+    return run, corpus.bytes, "B"
+
+
+def bench_rewrite_routes(corpus):
+    rewriter = RouteRewriter(corpus.route_map)
+    pages = corpus.pages
+
+    def run():
+        for _, content in pages:
+            rewriter.rewrite(content)
+    return run, corpus.bytes, "B"
+
+
+def bench_rewrite_image_patterns(corpus):
+    update_image_references = load_script("update-image-references-to-avif.py").update_image_references
+    pages = corpus.pages
+
+    def run():
+        for name, content in pages:
+            update_image_references(content, name)
+    return run, corpus.bytes, "B"
+
+
+def bench_update_srcset(corpus):
+    update_image_references = load_script("update-image-references-to-avif.py").update_image_references
+    attributes = [f'srcset="{value}"' for value in corpus.srcsets()]
+
+    def run():
+        for attribute in attributes:
+            update_image_references(attribute, None)
+    return run, len(attributes), "srcset"
+
+
+def bench_resolve_routes(corpus):
+    table = corpus.route_table()
+    links = corpus.links() + list(corpus.route_map) + list(corpus.route_map.values())
+
+    def run():
+        for link in links:
+            table.exists(link)
+    return run, len(links), "link"
+
+
+def _bench_hash(algorithm):
+    def setup(corpus):
+        data = [content.encode("utf-8", "surrogateescape") for _, content in corpus.pages] * 8
+
+        def run():
+            for chunk in data:
+                hashlib.new(algorithm, chunk).digest()
+        return run, sum(len(chunk) for chunk in data), "B"
+    return setup
+
+
+def fixture_image(size=512):
+    """Deterministic RGBA test image: gradients plus a hard-edged pattern."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        raise BenchmarkSkipped("Pillow is not installed")
+    gradient = Image.linear_gradient("L").resize((size, size))
+    radial = Image.radial_gradient("L").resize((size, size))
+    image = Image.merge("RGBA", (gradient, radial, gradient.rotate(90), radial.point(lambda v: 255 - v // 2)))
+    draw = ImageDraw.Draw(image)
+    for i in range(0, size, 32):
+        draw.rectangle((i, i // 2, i + 12, size - i // 2), fill=(i % 256, 40, 200, 255))
+        draw.text((i // 2, i), "jobnagringa", fill=(255, 255, 255, 255))
+    return image
+
+
+def _bench_encode(fmt, **options):
+    def setup(corpus):
+        image = fixture_image()
+        from PIL import Image
+        Image.init()
+        if fmt not in Image.SAVE:
+            raise BenchmarkSkipped(f"Pillow has no {fmt} encoder")
+
+        def run():
+            image.save(io.BytesIO(), fmt, **options)
+        return run, image.width * image.height, "px"
+    return setup
+
+
+BENCHMARKS = {
+    "extract-references": bench_extract_references,
+    "extract-asset-references": bench_extract_asset_references,
+    "rewrite-routes": bench_rewrite_routes,
+    "rewrite-image-patterns": bench_rewrite_image_patterns,
+    "update-srcset": bench_update_srcset,
+    "resolve-routes": bench_resolve_routes,
+    "hash-sha256": _bench_hash("sha256"),
+    "hash-blake2b": _bench_hash("blake2b"),
+    "encode-webp-lossless-m0": _bench_encode("WEBP", lossless=True, method=0),
+    "encode-webp-lossless-m4": _bench_encode("WEBP", lossless=True, method=4),
+    "encode-webp-lossless-m6": _bench_encode("WEBP", lossless=True, method=6),
+    "encode-webp-lossy-m0": _bench_encode("WEBP", quality=80, method=0),
+    "encode-webp-lossy-m4": _bench_encode("WEBP", quality=80, method=4),
+    "encode-webp-lossy-m6": _bench_encode("WEBP", quality=80, method=6),
+    "encode-avif-s8": _bench_encode("AVIF", quality=60, speed=8),
+    "encode-avif-s6": _bench_encode("AVIF", quality=60, speed=6),
+    "encode-avif-s4": _bench_encode("AVIF", quality=60, speed=4),
+}
+
+
+def run_benchmark(setup, corpus, repeat=5, min_time=0.05):
+    """
+    Time one benchmark. Each sample loops ``run`` until it took at least
+    ``min_time``; returns the per-call median and min with the throughput.
+    """
+    run, units, unit = setup(corpus)
+    run()  # warm up caches and lazy imports
+    samples = []
+    for _ in range(repeat):
+        loops, elapsed = 0, 0.0
+        started = time.perf_counter()
+        while elapsed < min_time or loops == 0:
+            run()
+            loops += 1
+            elapsed = time.perf_counter() - started
+        samples.append(elapsed / loops)
+    median = statistics.median(samples)
+    return {
+        "median_s": round(median, 7),
+        "min_s": round(min(samples), 7),
+        "units": units,
+        "unit": unit,
+        "throughput": round(units / median, 1) if median else None,
+        "samples": repeat,
+    }
+
+
+def run_benchmarks(names=None, corpus=None, repeat=5, min_time=0.05, report=None):
+    """Run the selected benchmarks; returns ``(results, skipped)``."""
+    corpus = corpus or Corpus.load()
+    results, skipped = {}, {}
+    for name, setup in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        try:
+            results[name] = run_benchmark(setup, corpus, repeat, min_time)
+        except BenchmarkSkipped as e:
+            skipped[name] = str(e)
+        if report:
+            report(name, results.get(name), skipped.get(name))
+    return results, skipped
+
+
+def git_info():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=BASE_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    try:
+        return {
+            "commit": git("rev-parse", "--short", "HEAD"),
+            "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+            "message": git("log", "-1", "--pretty=%s"),
+        }
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "branch": "unknown", "message": ""}
+
+
+def load_history(path=HISTORY_FILE):
+    if Path(path).exists():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"version": "1.0.0", "entries": [], "config": {"maxEntries": 100, "retentionDays": 90}}
+
+
+def add_to_history(history, results):
+    """Append a run to the history and trim old entries; returns the new entry."""
+    now = datetime.now(timezone.utc)
+    entry = {
+        "id": int(now.timestamp() * 1000),
+        "timestamp": now.isoformat(timespec="seconds"),
+        "git": git_info(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": results,
+    }
+    history["entries"].append(entry)
+    config = history["config"]
+    cutoff = (now - timedelta(days=config["retentionDays"])).timestamp() * 1000
+    history["entries"] = [e for e in history["entries"] if e["id"] > cutoff][-config["maxEntries"]:]
+    return entry
+
+
+def save_history(history, path=HISTORY_FILE):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two result sets by median time.
+
+    Returns ``[(name, baseline median, current median, change, regressed)]``
+    where ``change`` is the relative slowdown (0.25 = 25% slower).
+    """
+    rows = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before or not before.get("median_s"):
+            continue
+        change = result["median_s"] / before["median_s"] - 1
+        rows.append((name, before["median_s"], result["median_s"], change, change > threshold))
+    return rows
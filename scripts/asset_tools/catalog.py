@@ -0,0 +1,471 @@
+"""
+SQLite-backed asset catalog.
+
+One database replaces the scattered JSON state files (image-mapping.json,
+asset-migration-map.json, gif-reorganization-map.json and the conversion
+logs). Every table is keyed or indexed on the column the scripts look up by,
+so point lookups do not need the whole document in memory, and runs can
+upsert just the rows they touched. The JSON files that are still written
+are re-imported whenever their content changes (see ``open_catalog``).
+
+Tables:
+    files              repo-relative path -> size, mtime
+    hashes             (path, algorithm) -> digest, valid for the stored size/mtime
+    mappings           (source, old_path) -> new_path
+    conversions        (input, format) -> output, sizes, status
+    asset_references   (file, asset_path, line) -> attribute
+    imports            legacy JSON file -> size, mtime, digest when last imported
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from .paths import BASE_DIR, CDN_ASSETS_DIR, SCRIPTS_DIR
+
+DEFAULT_DB = SCRIPTS_DIR / "asset-catalog.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+CREATE INDEX IF NOT EXISTS idx_hashes_digest ON hashes (algorithm, digest);
+CREATE TABLE IF NOT EXISTS mappings (
+    source TEXT NOT NULL,
+    old_path TEXT NOT NULL,
+    new_path TEXT NOT NULL,
+    category TEXT,
+    extra TEXT,
+    PRIMARY KEY (source, old_path)
+);
+CREATE INDEX IF NOT EXISTS idx_mappings_old ON mappings (old_path);
+CREATE INDEX IF NOT EXISTS idx_mappings_new ON mappings (new_path);
+CREATE TABLE IF NOT EXISTS conversions (
+    input TEXT NOT NULL,
+    format TEXT NOT NULL,
+    output TEXT,
+    status TEXT NOT NULL,
+    size_before INTEGER,
+    size_after INTEGER,
+    message TEXT,
+    converted_at REAL,
+    PRIMARY KEY (input, format)
+);
+CREATE INDEX IF NOT EXISTS idx_conversions_output ON conversions (output);
+CREATE TABLE IF NOT EXISTS asset_references (
+    file TEXT NOT NULL,
+    asset_path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    attribute TEXT,
+    PRIMARY KEY (file, asset_path, line)
+);
+CREATE INDEX IF NOT EXISTS idx_references_asset ON asset_references (asset_path);
+CREATE TABLE IF NOT EXISTS imports (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    digest TEXT NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+# Legacy JSON state files and the mapping source name each is imported under
+IMAGE_MAPPING_FILE = SCRIPTS_DIR / "image-mapping.json"
+ASSET_MIGRATION_MAP_FILE = SCRIPTS_DIR / "asset-migration-map.json"
+GIF_REORGANIZATION_MAP_FILE = SCRIPTS_DIR / "gif-reorganization-map.json"
+AVIF_CONVERSION_LOG_FILE = SCRIPTS_DIR / "avif-conversion-log.json"
+WEBP_CONVERSION_LOG_FILE = SCRIPTS_DIR / "webp-conversion-log.json"
+
+
+def repo_relative(path):
+    """Normalize a path to a repo-relative POSIX string."""
+    path = Path(path)
+    if path.is_absolute():
+        try:
+            path = path.relative_to(BASE_DIR)
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+class AssetCatalog:
+    """Small API over the catalog database used by the asset scripts."""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    # Files and hashes
+
+    def upsert_files(self, paths):
+        """Record size/mtime for many files in one batch; returns the row count."""
+        now = time.time()
+        rows = []
+        for path in paths:
+            full = BASE_DIR / path if not Path(path).is_absolute() else Path(path)
+            try:
+                st = full.stat()
+            except OSError:
+                continue
+            rows.append((repo_relative(full), st.st_size, st.st_mtime, now))
+        self.conn.executemany(
+            "INSERT INTO files (path, size, mtime, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime, "
+            "updated_at=excluded.updated_at",
+            rows,
+        )
+        return len(rows)
+
+    def remove_files(self, paths):
+        rel = [(repo_relative(p),) for p in paths]
+        self.conn.executemany("DELETE FROM files WHERE path = ?", rel)
+        self.conn.executemany("DELETE FROM hashes WHERE path = ?", rel)
+
+    def get_file(self, path):
+        row = self.conn.execute("SELECT * FROM files WHERE path = ?", (repo_relative(path),)).fetchone()
+        return dict(row) if row else None
+
+    def file_hash(self, path, algorithm="sha256"):
+        """
+        Return the digest of a file, reusing the stored one while size and
+        mtime are unchanged.
+        """
+        full = BASE_DIR / path if not Path(path).is_absolute() else Path(path)
+        try:
+            st = full.stat()
+        except OSError:
+            return None
+        rel = repo_relative(full)
+        row = self.conn.execute(
+            "SELECT digest, size, mtime FROM hashes WHERE path = ? AND algorithm = ?",
+            (rel, algorithm),
+        ).fetchone()
+        if row and row["size"] == st.st_size and row["mtime"] == st.st_mtime:
+            return row["digest"]
+
+        value = _file_digest(full, algorithm)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO hashes (path, algorithm, digest, size, mtime) VALUES (?, ?, ?, ?, ?)",
+            (rel, algorithm, value, st.st_size, st.st_mtime),
+        )
+        return value
+
+    def find_by_hash(self, digest, algorithm="sha256"):
+        """Return every path whose stored digest matches."""
+        rows = self.conn.execute(
+            "SELECT path FROM hashes WHERE algorithm = ? AND digest = ?", (algorithm, digest)
+        ).fetchall()
+        return [row["path"] for row in rows]
+
+    # Path mappings
+
+    def upsert_mappings(self, source, rows):
+        """
+        Batch upsert old->new mappings for one source.
+
+        ``rows`` yields ``(old_path, new_path)`` or
+        ``(old_path, new_path, category, extra_dict)`` tuples.
+        """
+        batch = []
+        for row in rows:
+            old_path, new_path = row[0], row[1]
+            category = row[2] if len(row) > 2 else None
+            extra = json.dumps(row[3], ensure_ascii=False) if len(row) > 3 and row[3] else None
+            batch.append((source, old_path, new_path, category, extra))
+        self.conn.executemany(
+            "INSERT INTO mappings (source, old_path, new_path, category, extra) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(source, old_path) DO UPDATE SET new_path=excluded.new_path, "
+            "category=excluded.category, extra=excluded.extra",
+            batch,
+        )
+        return len(batch)
+
+    def replace_mappings(self, source, rows):
+        """Replace every mapping of one source, so rows dropped from it go too."""
+        self.conn.execute("DELETE FROM mappings WHERE source = ?", (source,))
+        return self.upsert_mappings(source, rows)
+
+    def lookup_mapping(self, old_path, source=None):
+        """Return the new path for ``old_path`` (optionally within one source)."""
+        if source:
+            row = self.conn.execute(
+                "SELECT new_path FROM mappings WHERE source = ? AND old_path = ?", (source, old_path)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT new_path FROM mappings WHERE old_path = ? LIMIT 1", (old_path,)
+            ).fetchone()
+        return row["new_path"] if row else None
+
+    def reverse_mapping(self, new_path):
+        """Return every old path that was mapped to ``new_path``."""
+        rows = self.conn.execute("SELECT old_path FROM mappings WHERE new_path = ?", (new_path,)).fetchall()
+        return [row["old_path"] for row in rows]
+
+    def mappings(self, source):
+        """Return the rows of one mapping source as dicts."""
+        rows = self.conn.execute(
+            "SELECT old_path, new_path, category, extra FROM mappings WHERE source = ?", (source,)
+        ).fetchall()
+        result = []
+        for row in rows:
+            item = dict(row)
+            item["extra"] = json.loads(item["extra"]) if item["extra"] else {}
+            result.append(item)
+        return result
+
+    def mapping_dict(self, source):
+        """Return ``{old_path: new_path}`` for one mapping source."""
+        rows = self.conn.execute(
+            "SELECT old_path, new_path FROM mappings WHERE source = ?", (source,)
+        ).fetchall()
+        return {row["old_path"]: row["new_path"] for row in rows}
+
+    def count_mappings(self, source):
+        return self.conn.execute("SELECT COUNT(*) FROM mappings WHERE source = ?", (source,)).fetchone()[0]
+
+    # Conversions
+
+    def record_conversion(self, input_path, fmt, status, output_path=None,
+                          size_before=None, size_after=None, message=None):
+        """Record one conversion result; safe to call per item during a run."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO conversions "
+            "(input, format, output, status, size_before, size_after, message, converted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (repo_relative(input_path), fmt, repo_relative(output_path) if output_path else None,
+             status, size_before, size_after, message, time.time()),
+        )
+
+    def clear_conversions(self, fmt):
+        """Forget every conversion result of one format (before re-importing its log)."""
+        self.conn.execute("DELETE FROM conversions WHERE format = ?", (fmt,))
+
+    def get_conversion(self, input_path, fmt):
+        row = self.conn.execute(
+            "SELECT * FROM conversions WHERE input = ? AND format = ?", (repo_relative(input_path), fmt)
+        ).fetchone()
+        return dict(row) if row else None
+
+    # References
+
+    def replace_references(self, file, references):
+        """
+        Replace the stored references of one source file.
+
+        ``references`` yields ``(asset_path, line, attribute)`` tuples.
+        """
+        rel = repo_relative(file)
+        self.conn.execute("DELETE FROM asset_references WHERE file = ?", (rel,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO asset_references (file, asset_path, line, attribute) VALUES (?, ?, ?, ?)",
+            [(rel, asset_path, line, attribute) for asset_path, line, attribute in references],
+        )
+
+    def files_referencing(self, asset_path):
+        rows = self.conn.execute(
+            "SELECT DISTINCT file FROM asset_references WHERE asset_path = ?", (asset_path,)
+        ).fetchall()
+        return [row["file"] for row in rows]
+
+    # Legacy JSON imports
+
+    def import_is_current(self, name, path):
+        """
+        Whether ``path`` is unchanged since it was last imported as ``name``.
+
+        Size and mtime are compared first; the file is only hashed when they
+        differ, so a touched but identical file is not imported again.
+        """
+        st = Path(path).stat()
+        row = self.conn.execute("SELECT size, mtime, digest FROM imports WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return False
+        if row["size"] == st.st_size and row["mtime"] == st.st_mtime:
+            return True
+        if row["size"] == st.st_size and row["digest"] == _file_digest(path):
+            self.record_import(name, path)
+            return True
+        return False
+
+    def record_import(self, name, path):
+        st = Path(path).stat()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO imports (name, size, mtime, digest, imported_at) VALUES (?, ?, ?, ?, ?)",
+            (name, st.st_size, st.st_mtime, _file_digest(path), time.time()),
+        )
+
+
+def _file_digest(path, algorithm="sha256"):
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_json(path):
+    if not Path(path).exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def import_image_mapping(catalog, path=IMAGE_MAPPING_FILE):
+    """Import organize-images.py output (keyed by old relative path)."""
+    data = _load_json(path) or {}
+    rows = [
+        (item["old_path"], item["new_path"], item.get("category"),
+         {"old_relative": item.get("old_relative", key), "new_relative": item.get("new_relative"),
+          "new_name": item.get("new_name")})
+        for key, item in data.items()
+    ]
+    return catalog.replace_mappings("image-mapping", rows)
+
+
+def import_asset_migration_map(catalog, path=ASSET_MIGRATION_MAP_FILE):
+    """
+    Import asset-migration-map.json.
+
+    Handles both the flat organize-public-assets.py layout and the
+    category -> {old: new} layout that is currently checked in.
+    """
+    data = _load_json(path) or {}
+    rows = []
+    for key, value in data.items():
+        if isinstance(value, dict) and "new_path" in value:
+            rows.append((f"/{key}" if not key.startswith("/") else key,
+                         f"/{value['new_path']}" if not value["new_path"].startswith("/") else value["new_path"],
+                         value.get("category"),
+                         {"old_name": value.get("old_name"), "new_name": value.get("new_name")}))
+        elif isinstance(value, dict):
+            rows.extend((old, new, key) for old, new in value.items())
+    return catalog.replace_mappings("asset-migration", rows)
+
+
+def import_gif_reorganization_map(catalog, path=GIF_REORGANIZATION_MAP_FILE):
+    data = _load_json(path) or {}
+    rows = [
+        (key, f"/cdn-assets/{item['new_path']}", "gif", {"source": item.get("source")})
+        for key, item in data.items()
+    ]
+    return catalog.replace_mappings("gif-reorganization", rows)
+
+
+def import_avif_conversion_log(catalog, path=AVIF_CONVERSION_LOG_FILE):
+    data = _load_json(path) or {}
+    cdn = CDN_ASSETS_DIR
+    count = 0
+    # The log covers the converter's whole last run, so it replaces earlier results
+    catalog.clear_conversions("avif")
+    for item in data.get("converted", []):
+        catalog.record_conversion(cdn / item["input"], "avif", "converted", cdn / item["output"],
+                                  item.get("size_before"), item.get("size_after"))
+        count += 1
+    for rel in data.get("already_exists", []):
+        input_path = cdn / rel
+        catalog.record_conversion(input_path, "avif", "already_exists", input_path.with_suffix(".avif"))
+        count += 1
+    for item in data.get("kept_original", []):
+        decision = item.get("decision") or {}
+        catalog.record_conversion(cdn / item["input"], "avif", "kept_original", None,
+                                  decision.get("size_before"), decision.get("size_after"), decision.get("reason"))
+        count += 1
+    for item in data.get("errors", []):
+        catalog.record_conversion(cdn / item["file"], "avif", "error", message=item.get("error"))
+        count += 1
+    return count
+
+
+def import_webp_conversion_log(catalog, path=WEBP_CONVERSION_LOG_FILE):
+    data = _load_json(path) or {}
+    count = 0
+    catalog.clear_conversions("webp")
+    for item in data.get("converted", []):
+        catalog.record_conversion(item["original"], "webp", "converted", item["webp"], message=item.get("message"))
+        count += 1
+    for item in data.get("skipped", []):
+        catalog.record_conversion(item["path"], "webp", "skipped", message=item.get("reason"))
+        count += 1
+    for item in data.get("kept_original", []):
+        decision = item.get("decision") or {}
+        catalog.record_conversion(item["original"], "webp", "kept_original", None,
+                                  decision.get("size_before"), decision.get("size_after"), item.get("message"))
+        count += 1
+    for item in data.get("errors", []):
+        catalog.record_conversion(item["path"], "webp", "error", message=item.get("error"))
+        count += 1
+    return count
+
+
+IMPORTERS = [
+    ("image-mapping.json", IMAGE_MAPPING_FILE, import_image_mapping),
+    ("asset-migration-map.json", ASSET_MIGRATION_MAP_FILE, import_asset_migration_map),
+    ("gif-reorganization-map.json", GIF_REORGANIZATION_MAP_FILE, import_gif_reorganization_map),
+    ("avif-conversion-log.json", AVIF_CONVERSION_LOG_FILE, import_avif_conversion_log),
+    ("webp-conversion-log.json", WEBP_CONVERSION_LOG_FILE, import_webp_conversion_log),
+]
+
+
+def import_legacy_json(catalog, changed_only=False):
+    """
+    Import the legacy JSON state files; returns {filename: rows}.
+
+    With ``changed_only`` a file is skipped while it is unchanged since its
+    last import. Missing files are skipped either way. Each file replaces
+    the rows of its previous import in one transaction, so entries removed
+    from a file leave the catalog and a failed import changes nothing.
+    """
+    counts = {}
+    catalog.commit()
+    for name, path, importer in IMPORTERS:
+        if not path.exists() or (changed_only and catalog.import_is_current(name, path)):
+            continue
+        with catalog.conn:
+            counts[name] = importer(catalog, path)
+            catalog.record_import(name, path)
+    return counts
+
+
+def open_catalog(db_path=DEFAULT_DB):
+    """
+    Open the catalog, importing the legacy JSON files that are new or
+    changed since their last import (organize-images.py and the converters
+    still write image-mapping.json and the conversion logs).
+    """
+    catalog = AssetCatalog(db_path)
+    import_legacy_json(catalog, changed_only=True)
+    return catalog
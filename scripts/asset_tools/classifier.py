@@ -0,0 +1,129 @@
+"""
+Rule-based asset classifier.
+
+Classification rules live in scripts/asset-categories.json:
+
+    exact       filename -> category (+ optional rename); a null category
+                falls through to the keyword rules
+    keywords    ordered list of {category, keywords}; earlier entries win
+    extensions  extension -> category fallback
+    default     category when nothing else matches
+
+All keyword rules are compiled into one regex of zero-width lookaheads, one
+alternation ordered by priority, so every position of a filename yields the
+highest-priority keyword starting there. A directory listing is classified by
+joining the names and running that regex once over the whole listing.
+"""
+
+import bisect
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from .paths import SCRIPTS_DIR
+
+DEFAULT_RULES_FILE = SCRIPTS_DIR / "asset-categories.json"
+
+
+class AssetClassifier:
+    """Compiled form of the classification rules."""
+
+    def __init__(self, rules):
+        self.exact = {}
+        self.known_names = {}
+        for entry in rules.get("exact", []):
+            self.exact[entry["name"]] = entry.get("category")
+            if entry.get("rename"):
+                self.known_names[entry["name"]] = entry["rename"]
+
+        self.extensions = {ext.lower(): category for ext, category in rules.get("extensions", {}).items()}
+        self.default = rules.get("default", "other")
+
+        # Keyword priority is the index of its rule group; duplicates keep the first group
+        self._keyword_rule = {}
+        ordered = []
+        for priority, group in enumerate(rules.get("keywords", [])):
+            for keyword in group["keywords"]:
+                keyword = keyword.lower()
+                if keyword and keyword not in self._keyword_rule:
+                    self._keyword_rule[keyword] = (priority, group["category"])
+                    ordered.append(keyword)
+        # Within a position, alternation order decides: priority first, then longer keywords
+        ordered.sort(key=lambda k: (self._keyword_rule[k][0], -len(k)))
+        if ordered:
+            self._pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+        else:
+            self._pattern = None
+
+        self.hits = Counter()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _best_keywords(self, text, offsets):
+        """
+        Run the keyword automaton over ``text`` once.
+
+        Returns ``{index: keyword}`` with the highest-priority keyword found in
+        each segment, where segments start at ``offsets``.
+        """
+        best = {}
+        if self._pattern is None:
+            return best
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            index = bisect.bisect_right(offsets, match.start()) - 1
+            current = best.get(index)
+            if current is None or self._keyword_rule[keyword][0] < self._keyword_rule[current][0]:
+                best[index] = keyword
+        return best
+
+    def _resolve(self, filename, keyword):
+        """Apply the rule layers for one filename given its best keyword."""
+        if filename in self.exact:
+            category = self.exact[filename]
+            if category:
+                self.hits[f"exact:{filename}"] += 1
+                return category, self.known_names.get(filename)
+
+        if keyword is not None:
+            category = self._keyword_rule[keyword][1]
+            self.hits[f"keyword:{category}:{keyword}"] += 1
+            return category, None
+
+        ext = Path(filename).suffix.lower()
+        if ext in self.extensions:
+            self.hits[f"extension:{ext}"] += 1
+            return self.extensions[ext], None
+
+        self.hits["default"] += 1
+        return self.default, None
+
+    def classify(self, filename):
+        """Return ``(category, known_name_or_None)`` for one filename."""
+        best = self._best_keywords(filename.lower(), [0])
+        return self._resolve(filename, best.get(0))
+
+    def classify_many(self, filenames):
+        """Classify a whole listing in one pass; returns a list of results."""
+        filenames = list(filenames)
+        lowered = [name.lower() for name in filenames]
+        offsets = []
+        position = 0
+        for name in lowered:
+            offsets.append(position)
+            position += len(name) + 1
+        text = "\n".join(lowered)
+        best = self._best_keywords(text, offsets)
+        return [self._resolve(name, best.get(i)) for i, name in enumerate(filenames)]
+
+    def hit_report(self):
+        """Per-rule hit counts, most used first."""
+        return self.hits.most_common()
+
+
+def load_classifier(path=DEFAULT_RULES_FILE):
+    return AssetClassifier.from_file(path)
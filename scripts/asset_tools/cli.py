@@ -0,0 +1,169 @@
+"""
+Unified command line for the asset scripts.
+
+    python3 scripts/asset-tool.py [--profile] <group> <command> [args...]
+
+Commands are grouped as convert, rewrite, audit, organize and migrate; each
+one runs the matching standalone script in scripts/ with the remaining
+arguments. Nothing but this registry is imported up front: a script (and
+whatever it needs, Pillow included) is only loaded when its command runs,
+so listing commands or running an audit never pays for the image
+libraries. ``--profile`` runs any command under cProfile and the stack
+sampler (see asset_tools.profiling). ``-h``/``--help`` after a command is
+passed to scripts that parse their arguments; for the others the CLI
+prints the script's docstring instead of running it.
+"""
+
+import ast
+import sys
+
+from .paths import SCRIPTS_DIR
+from .profiling import profiled
+
+PROG = "asset-tool"
+
+# group -> {command: (script, summary)}
+COMMANDS = {
+    "convert": {
+        "avif": ("convert-images-to-avif.py", "Convert raster images to AVIF"),
+        "webp": ("convert-images-to-webp.py", "Convert raster images to lossless WebP"),
+        "avif-only": ("convert-to-avif-only.py", "Convert images and references to AVIF only"),
+        "pipeline": ("run-pipeline.py", "Run the out-of-date image pipeline stages"),
+        "summarize-log": ("summarize-conversion-log.py", "Summarize a streaming conversion log"),
+    },
+    "rewrite": {
+        "links": ("analyze-and-fix-all-links.py", "Analyze and fix <a> links"),
+        "jng-routes": ("fix-jng-routes.py", "Rewrite legacy /jng/ routes from the route map"),
+        "html-extensions": ("remove-html-extensions.py", "Drop .html from internal links"),
+        "broken-routes": ("fix-broken-routes.py", "Fix /jng/*.html route references"),
+        "double-quotes": ("fix-double-quotes.py", "Fix doubled quotes in href attributes"),
+        "src-links": ("fix-src-links.py", "Fix links in src/"),
+        "site-links": ("replace-jobnagringa-links.py", "Make jobnagringa.com.br links relative"),
+        "asset-references": ("update-asset-references.py", "Update asset references after a migration"),
+        "bulk-references": ("bulk-update-references.py", "Bulk update references from the migration map"),
+        "image-references": ("update-image-references.py", "Update image references from the image mapping"),
+        "avif-references": ("update-image-references-to-avif.py", "Point image references at AVIF files"),
+        "webp-references": ("update-image-references-to-webp.py", "Point image references at WebP files"),
+    },
+    "audit": {
+        "404": ("find-404-errors.py", "Find broken asset references and links"),
+        "images": ("verify-and-fix-image-paths.py", "Verify image paths in src/"),
+        "missing-images": ("fix-missing-images.py", "Find and fix missing image references"),
+        "orphans": ("find-orphan-assets.py", "Find unreferenced files in public/cdn-assets"),
+        "page-weight": ("analyze-page-weight.py", "Per-route page weight and budgets"),
+        "crawl": ("crawl-site.py", "Crawl the built site for broken links"),
+        "watch": ("watch-audit.py", "Watch src/ and public/ for broken references"),
+        "repeated-markup": ("find-repeated-markup.py", "Find markup repeated across pages"),
+        "benchmarks": ("run-benchmarks.py", "Benchmark the tooling hot paths against the fixture corpus"),
+        "synthetic": ("generate-synthetic-corpus.py", "Generate a synthetic site for scale testing"),
+    },
+    "organize": {
+        "catalog": ("build-asset-catalog.py", "Build or refresh the asset catalog"),
+        "images": ("organize-images.py", "Organize images into readable folders and names"),
+        "public": ("organize-public-assets.py", "Organize and standardize public assets"),
+        "gifs": ("download-and-organize-gifs.py", "Download and reorganize GIFs"),
+        "image-mapping": ("apply-image-mapping.py", "Move and rename files from the image mapping"),
+        "prune-css": ("prune-css.py", "Prune unused selectors from the Webflow stylesheet"),
+        "critical-css": ("extract-critical-css.py", "Extract per-route critical CSS"),
+    },
+    "migrate": {
+        "page": ("migrate-page.py", "Migrate one legacy HTML page to Astro"),
+        "pages": ("batch-migrate-pages.py", "Migrate all legacy HTML pages"),
+        "assets": ("migrate-assets.py", "Perform the asset migration"),
+        "external-assets": ("fetch-external-assets.py", "Download external images referenced in the code"),
+        "redirects": ("generate-legacy-redirects.py", "Generate the legacy .html redirect table"),
+    },
+}
+
+
+def usage(group=None):
+    """Help text for all groups, or for the commands of one group."""
+    lines = []
+    if group is None:
+        lines.append(f"usage: {PROG} [--profile] <group> <command> [args...]")
+        lines.append("")
+        for name, commands in COMMANDS.items():
+            lines.append(f"{name}:")
+            lines.extend(f"  {command:<18} {summary}" for command, (_, summary) in commands.items())
+    else:
+        lines.append(f"usage: {PROG} {group} <command> [args...]")
+        lines.append("")
+        lines.extend(f"  {command:<18} {summary}" for command, (_, summary) in COMMANDS[group].items())
+    lines.append("")
+    lines.append(f"Run '{PROG} <group> <command> --help' for the options of a command.")
+    return "\n".join(lines)
+
+
+def parses_arguments(script):
+    """Whether a script in scripts/ imports argparse (and so handles --help itself)."""
+    tree = ast.parse((SCRIPTS_DIR / script).read_bytes())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import) and any(alias.name == "argparse" for alias in node.names):
+            return True
+        if isinstance(node, ast.ImportFrom) and node.module == "argparse":
+            return True
+    return False
+
+
+def script_help(script, prog):
+    """Usage text of a script without an argument parser: its docstring."""
+    doc = ast.get_docstring(ast.parse((SCRIPTS_DIR / script).read_bytes()))
+    lines = [f"usage: {prog}", ""]
+    lines.append(doc or "(no description)")
+    lines.append("")
+    lines.append("(Shown instead of running the command, which does not parse --help.)")
+    return "\n".join(lines)
+
+
+def run_script(script, args, prog):
+    """Run a script from scripts/ as __main__ with ``args``; returns its exit code."""
+    path = SCRIPTS_DIR / script
+    saved_argv = sys.argv
+    sys.argv = [prog] + list(args)
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    try:
+        # exec instead of runpy.run_path, which would reset sys.argv[0] (and
+        # with it the prog name argparse shows) to the script path
+        code = compile(path.read_bytes(), str(path), "exec")
+        exec(code, {"__name__": "__main__", "__file__": str(path), "__builtins__": __builtins__})
+    except SystemExit as exit:
+        code = exit.code
+        if code is None or isinstance(code, int):
+            return code or 0
+        print(code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    profile = bool(argv) and argv[0] == "--profile"
+    if profile:
+        argv = argv[1:]
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print(usage())
+        return 0
+    group = argv[0]
+    if group not in COMMANDS:
+        print(f"{PROG}: unknown group '{group}'\n", file=sys.stderr)
+        print(usage(), file=sys.stderr)
+        return 2
+    if len(argv) < 2 or argv[1] in ("-h", "--help"):
+        print(usage(group))
+        return 0 if len(argv) > 1 else 2
+    command = argv[1]
+    if command not in COMMANDS[group]:
+        print(f"{PROG}: unknown {group} command '{command}'\n", file=sys.stderr)
+        print(usage(group), file=sys.stderr)
+        return 2
+    script, _ = COMMANDS[group][command]
+    prog = f"{PROG} {group} {command}"
+    if any(arg in ("-h", "--help") for arg in argv[2:]) and not parses_arguments(script):
+        # Running the script would do the work (and possibly rewrite files)
+        print(script_help(script, prog))
+        return 0
+    with profiled(script[:-3], profile):
+        return run_script(script, argv[2:], prog)
@@ -0,0 +1,274 @@
+"""
+Asynchronous crawler for the built site.
+
+Starts from ``/`` and follows every same-origin link, script, stylesheet,
+image and CSS ``url()`` it finds, with a bounded number of concurrent
+requests over keep-alive connections (the pool from ``fetcher``). Each URL
+is requested once; status, bytes, time to first byte and total time are
+recorded together with the pages that reference it, which is what the
+broken-link report needs.
+
+``serve_dist`` serves prerendered ``astro build`` output (dist/client for
+the node adapter) from a local stdlib server, so the crawl needs neither
+node nor network access. It refuses a build without a prerendered
+index.html: this site renders on the server (``output: 'server'``), so
+dist/client only holds assets, and a static server would only answer
+with directory listings. Crawl ``astro preview`` instead (with
+``PLAYWRIGHT=1`` to get past the auth middleware).
+"""
+
+import asyncio
+import re
+import threading
+import time
+from functools import partial
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+from .fetcher import REDIRECT_STATUSES, USER_AGENT, ConnectionPool, FetchError
+from .paths import BASE_DIR
+from .references import split_srcset
+
+DIST_DIR = BASE_DIR / "dist"
+CSS_URL = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.IGNORECASE)
+CSS_IMPORT = re.compile(r'@import\s+(["\'])([^"\']+)\1')
+SKIP_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'blob:', '#')
+
+# (tag, attribute) pairs that point at other URLs; srcset is split separately
+LINK_ATTRIBUTES = {
+    ('a', 'href'), ('link', 'href'), ('area', 'href'),
+    ('script', 'src'), ('img', 'src'), ('source', 'src'), ('video', 'src'),
+    ('video', 'poster'), ('audio', 'src'), ('iframe', 'src'), ('embed', 'src'),
+    ('input', 'src'), ('track', 'src'),
+}
+SRCSET_TAGS = {'img', 'source'}
+REQUEST_HEADERS = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'identity', 'Connection': 'keep-alive'}
+
+
+class _LinkParser(HTMLParser):
+    """Collect ``(url, kind)`` pairs from an HTML document."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.base = None
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'base' and attrs.get('href'):
+            self.base = attrs['href']
+        if tag == 'link' and set((attrs.get('rel') or '').split()) & {'preconnect', 'dns-prefetch'}:
+            # Origins, not resources
+            return
+        kind = 'page' if tag in ('a', 'area', 'iframe') else 'resource'
+        for name, value in attrs.items():
+            if value and (tag, name) in LINK_ATTRIBUTES:
+                self.links.append((value, kind))
+            elif value and name == 'srcset' and tag in SRCSET_TAGS:
+                self.links.extend((candidate, 'resource') for candidate in split_srcset(value))
+            elif value and name == 'style' and 'url(' in value:
+                self.links.extend((match.group(2), 'resource') for match in CSS_URL.finditer(value))
+        self._in_style = tag == 'style'
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            self.links.extend((match.group(2), 'resource') for match in CSS_URL.finditer(data))
+
+
+def extract_links(body, content_type):
+    """Return ``(url, kind)`` pairs from an HTML or CSS body."""
+    text = body.decode('utf-8', errors='replace')
+    if 'css' in content_type:
+        links = [(m.group(2), 'resource') for m in CSS_IMPORT.finditer(text)]
+        return links + [(m.group(2), 'resource') for m in CSS_URL.finditer(text)]
+    parser = _LinkParser()
+    parser.feed(text)
+    parser.close()
+    return parser.links
+
+
+class Crawler:
+    """
+    Breadth-first crawl of one origin.
+
+    ``results`` maps each URL to ``{status, bytes, ttfb, elapsed,
+    content_type, kind, referrers, error, location}``.
+    """
+
+    def __init__(self, base_url, concurrency=16, timeout=15, max_urls=20000, check_external=False):
+        parts = urlsplit(base_url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}/"
+        self.origin = (parts.scheme, parts.netloc)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_urls = max_urls
+        self.check_external = check_external
+        self.pool = ConnectionPool(per_host=concurrency, timeout=timeout)
+        self.results = {}
+        self.visited = set()
+        self.queue = None
+
+    def _enqueue(self, url, kind, referrer):
+        url, _ = urldefrag(url)
+        if url in self.visited:
+            if referrer:
+                self.results[url]['referrers'].add(referrer)
+            return
+        if len(self.visited) >= self.max_urls:
+            return
+        self.visited.add(url)
+        self.results[url] = {'status': None, 'bytes': 0, 'ttfb': None, 'elapsed': None,
+                             'content_type': None, 'kind': kind, 'referrers': {referrer} if referrer else set(),
+                             'error': None, 'location': None}
+        self.queue.put_nowait(url)
+
+    def _is_internal(self, url):
+        parts = urlsplit(url)
+        return (parts.scheme, parts.netloc) == self.origin
+
+    async def _get(self, url):
+        """GET one URL; returns (status, headers, body or None, ttfb, byte count)."""
+        response = await self.pool.request(url, REQUEST_HEADERS)
+        try:
+            # Only HTML and CSS bodies are parsed; everything else is just counted
+            keep = response.status == 200 and any(t in response.headers.get('content-type', '')
+                                                  for t in ('html', 'css'))
+            chunks = []
+            size = 0
+            async for chunk in response.iter_body():
+                size += len(chunk)
+                if keep:
+                    chunks.append(chunk)
+        finally:
+            response.release()
+        return response.status, response.headers, b''.join(chunks) if keep else None, response.ttfb, size
+
+    async def _visit(self, url):
+        result = self.results[url]
+        started = time.perf_counter()
+        try:
+            status, headers, body, ttfb, size = await self._get(url)
+        except (FetchError, OSError, asyncio.TimeoutError, ValueError) as e:
+            result.update(error=str(e) or e.__class__.__name__, elapsed=time.perf_counter() - started)
+            return
+        content_type = headers.get('content-type', '').split(';')[0].strip()
+        result.update(status=status, bytes=size, ttfb=ttfb, elapsed=time.perf_counter() - started,
+                      content_type=content_type)
+
+        if status in REDIRECT_STATUSES and 'location' in headers:
+            target = urljoin(url, headers['location'])
+            result['location'] = target
+            if self._is_internal(target) or self.check_external:
+                self._enqueue(target, result['kind'], url)
+            return
+        if body is None or not self._is_internal(url):
+            return
+
+        base = url
+        for link, kind in extract_links(body, content_type):
+            link = link.strip()
+            if not link or link.startswith(SKIP_SCHEMES) or '{' in link:
+                continue
+            absolute = urljoin(base, link)
+            if not absolute.startswith(('http://', 'https://')):
+                continue
+            if self._is_internal(absolute) or self.check_external:
+                self._enqueue(absolute, kind, url)
+
+    async def _worker(self):
+        while True:
+            url = await self.queue.get()
+            try:
+                await self._visit(url)
+            finally:
+                self.queue.task_done()
+
+    async def crawl(self, start_paths=('/',)):
+        """Crawl from the start paths until no unvisited URL is left."""
+        self.queue = asyncio.Queue()
+        for path in start_paths:
+            self._enqueue(urljoin(self.base_url, path), 'page', None)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await self.queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self.pool.close()
+        return self.results
+
+
+def crawl_site(base_url, start_paths=('/',), concurrency=16, timeout=15, max_urls=20000, check_external=False):
+    """Synchronous wrapper around Crawler.crawl for the scripts."""
+    crawler = Crawler(base_url, concurrency=concurrency, timeout=timeout,
+                      max_urls=max_urls, check_external=check_external)
+    return asyncio.run(crawler.crawl(start_paths))
+
+
+def broken_links(results):
+    """Return the results that failed or answered with a 4xx/5xx status."""
+    return {url: r for url, r in results.items() if r['error'] or (r['status'] or 0) >= 400}
+
+
+def slowest(results, count=20, key='elapsed'):
+    """Return the ``count`` slowest URLs as ``(url, result)`` pairs."""
+    timed = [(url, r) for url, r in results.items() if r[key] is not None]
+    return sorted(timed, key=lambda item: -item[1][key])[:count]
+
+
+class _DistHandler(SimpleHTTPRequestHandler):
+    """Static handler that maps clean URLs to Astro's ``route/index.html`` output."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def list_directory(self, path):
+        # A generated listing is not a page of the site; report it as missing
+        self.send_error(404)
+        return None
+
+    def translate_path(self, path):
+        translated = Path(super().translate_path(path))
+        if translated.is_dir():
+            return str(translated)
+        if not translated.exists():
+            html = translated.with_name(translated.name + '.html')
+            if html.exists():
+                return str(html)
+        return str(translated)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def dist_root(dist_dir=DIST_DIR):
+    """Directory holding the static output (dist/client with the node adapter)."""
+    dist_dir = Path(dist_dir)
+    client = dist_dir / 'client'
+    return client if client.is_dir() else dist_dir
+
+
+def serve_dist(dist_dir=DIST_DIR, host='127.0.0.1', port=0):
+    """
+    Serve the build output in a background thread.
+
+    Returns ``(server, base_url)``; call ``server.shutdown()`` when done.
+    """
+    root = dist_root(dist_dir)
+    if not root.is_dir():
+        raise FileNotFoundError(f"No build output at {root}; run `npm run build` first")
+    if not (root / 'index.html').is_file():
+        raise FileNotFoundError(
+            f"No prerendered index.html in {root}: the pages are rendered on the server. "
+            "Start `PLAYWRIGHT=1 npm run preview:raw` and crawl it with --url http://localhost:4321")
+    server = ThreadingHTTPServer((host, port), partial(_DistHandler, directory=str(root)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
@@ -0,0 +1,208 @@
+"""
+Per-route critical CSS.
+
+For every page in src/pages the page and the components it imports (the
+import closure from ``page_weight.SourceIndex``) are reduced to the
+classes, ids and tags they contain, and the global stylesheets are pruned
+against that index. The result is written to src/generated/critical-css/,
+where BaseLayout inlines it for the matching ``Astro.routePattern`` and
+loads the full stylesheets without blocking rendering. Font faces are left
+to the full stylesheets (an inlined base64 icon font would be re-sent with
+every page), and a route whose critical CSS is still above
+``MAX_INLINE_BYTES`` gets no file, so it keeps the blocking stylesheets.
+
+Vite serves ``?url`` imports as they are, without the PostCSS pipeline
+(PurgeCSS, cssnano), so the deferred copies of the full stylesheets are
+pruned against the whole site and minified here as well, into
+src/generated/styles/.
+
+Results are cached by ``(page hash, stylesheet hash)``: the page hash
+covers every file in the page's import closure, the stylesheet hash the
+stylesheets and the allowlist, so a rerun only recomputes routes whose
+inputs changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from .css import (AtBlock, AtRule, UsedSelectors, apply_allowlist, load_allowlist, minify_css, parse_stylesheet,
+                  prune_nodes, prune_stylesheet, used_selectors_in)
+from .page_weight import SourceIndex
+from .paths import BASE_DIR, CACHE_DIR, PAGES_DIR, SCRIPTS_DIR, SRC_DIR
+from .references import iter_source_files
+from .routes import iter_pages, page_route
+
+STYLESHEETS = (SRC_DIR / "styles" / "webflow.css", SRC_DIR / "styles" / "global.css")
+OUTPUT_DIR = SRC_DIR / "generated" / "critical-css"
+DEFERRED_DIR = SRC_DIR / "generated" / "styles"
+CACHE_FILE = CACHE_DIR / "critical-css.json"
+ALLOWLIST_FILE = SCRIPTS_DIR / "css-prune-allowlist.json"
+TEMPLATE_SUFFIXES = ('.astro', '.ts', '.tsx', '.js', '.jsx', '.md', '.mdx')
+# Bump when the generated CSS changes for the same inputs
+CACHE_VERSION = 2
+
+# Above this the inlined CSS costs more on every uncached page than the
+# blocking request it saves
+MAX_INLINE_BYTES = 32 * 1024
+DATA_URI_FONT = re.compile(r'url\(\s*["\']?data:(?:font/|application/(?:x-)?font)', re.IGNORECASE)
+
+# The PurgeCSS safelist in postcss.config.mjs, kept for the deferred stylesheets
+POSTCSS_SAFELIST = {
+    "classes": ["w-*", "is-*", "has-*", "fs-*", "cl-*", "hide-*", "show-*", "dark", "light"],
+    "tags": ["html", "body"],
+}
+
+
+def route_slug(route):
+    """File name for a route; BaseLayout derives the same name from Astro.routePattern."""
+    return "index" if route == "/" else route.strip("/").replace("/", "__")
+
+
+def is_font_node(node):
+    """True for ``@font-face`` rules and rules embedding a data-URI font."""
+    if isinstance(node, AtRule) and node.prelude.lower().startswith('@font-face'):
+        return True
+    return not isinstance(node, AtBlock) and bool(DATA_URI_FONT.search(node.text))
+
+
+def _without_fonts(nodes):
+    kept = []
+    for node in nodes:
+        if isinstance(node, AtBlock):
+            kept.append(node._replace(children=_without_fonts(node.children)))
+        elif not is_font_node(node):
+            kept.append(node)
+    return kept
+
+
+def _hash_files(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(str(path).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update((BASE_DIR / path).read_bytes())
+    return digest.hexdigest()
+
+
+class CriticalCssBuilder:
+    """Compute and write critical CSS for the pages, reusing cached results."""
+
+    def __init__(self, stylesheets=STYLESHEETS, output_dir=OUTPUT_DIR, cache_file=CACHE_FILE,
+                 allowlist_file=ALLOWLIST_FILE, deferred_dir=DEFERRED_DIR, max_inline_bytes=MAX_INLINE_BYTES):
+        self.stylesheets = [Path(sheet) for sheet in stylesheets]
+        self.output_dir = Path(output_dir)
+        self.deferred_dir = Path(deferred_dir)
+        self.cache_file = Path(cache_file)
+        self.max_inline_bytes = max_inline_bytes
+        self.allowlist = load_allowlist(allowlist_file)
+        self.sheet_hash = f"{CACHE_VERSION}:{max_inline_bytes}:" + _hash_files(
+            [sheet.relative_to(BASE_DIR) for sheet in self.stylesheets]
+            + ([Path(allowlist_file).relative_to(BASE_DIR)] if Path(allowlist_file).exists() else [])
+        )
+        self.sources = SourceIndex()
+        self.cache = {}
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError):
+                self.cache = {}
+        self.stylesheet_bytes = {}
+        self._nodes = None
+        self._file_used = {}
+
+    @property
+    def nodes(self):
+        # Stylesheets are only parsed when at least one route needs recomputing
+        if self._nodes is None:
+            self._nodes = []
+            for sheet in self.stylesheets:
+                self._nodes.extend(parse_stylesheet(sheet.read_text(encoding="utf-8", errors="replace")))
+            self._nodes = _without_fonts(self._nodes)
+        return self._nodes
+
+    def _used_for(self, files):
+        used = UsedSelectors()
+        for rel_path in files:
+            if rel_path not in self._file_used:
+                content = (BASE_DIR / rel_path).read_text(encoding="utf-8", errors="replace")
+                self._file_used[rel_path] = used_selectors_in(content, rel_path)
+            used.merge(self._file_used[rel_path])
+        return apply_allowlist(used, self.allowlist)
+
+    def build_page(self, page_file):
+        """Return ``{route, file, bytes, inlined, cached}`` for one page."""
+        rel_page = Path(page_file).relative_to(BASE_DIR).as_posix()
+        route = page_route(page_file)
+        closure = [path for path in self.sources.closure(rel_page) if path.endswith(TEMPLATE_SUFFIXES)]
+        key = f"{_hash_files(sorted(closure))}:{self.sheet_hash}"
+        output = self.output_dir / f"{route_slug(route)}.css"
+
+        cached = self.cache.get(route)
+        if cached and cached["key"] == key and output.exists() == cached["inlined"]:
+            return {"route": route, "file": rel_page, "bytes": cached["bytes"], "inlined": cached["inlined"],
+                    "cached": True}
+
+        css = minify_css("\n".join(text for _, text in prune_nodes(self.nodes, self._used_for(closure)))) + "\n"
+        size = len(css.encode("utf-8"))
+        inlined = size <= self.max_inline_bytes
+        if inlined:
+            _write_atomic(output, css)
+        elif output.exists():
+            output.unlink()
+        self.cache[route] = {"key": key, "bytes": size, "inlined": inlined}
+        return {"route": route, "file": rel_page, "bytes": size, "inlined": inlined, "cached": False}
+
+    def build_stylesheets(self):
+        """Write pruned, minified copies of the full stylesheets; returns ``{name: bytes}``."""
+        files = sorted(path.relative_to(BASE_DIR).as_posix()
+                       for path in iter_source_files((SRC_DIR,), TEMPLATE_SUFFIXES))
+        key = f"{_hash_files(files)}:{self.sheet_hash}"
+        outputs = [self.deferred_dir / sheet.name for sheet in self.stylesheets]
+        cached = self.cache.get("stylesheets")
+        if cached and cached["key"] == key and all(output.exists() for output in outputs):
+            return cached["bytes"]
+
+        used = apply_allowlist(self._used_for(files), POSTCSS_SAFELIST)
+        sizes = {}
+        for sheet, output in zip(self.stylesheets, outputs):
+            css, _ = prune_stylesheet(sheet.read_text(encoding="utf-8", errors="replace"), used)
+            css = minify_css(css) + "\n"
+            _write_atomic(output, css)
+            sizes[sheet.name] = len(css.encode("utf-8"))
+        self.cache["stylesheets"] = {"key": key, "bytes": sizes}
+        return sizes
+
+    def build(self, pages_dir=PAGES_DIR):
+        self.stylesheet_bytes = self.build_stylesheets()
+        results = [self.build_page(page) for page in iter_pages(pages_dir)]
+        self._remove_stale({route_slug(result["route"]) + ".css" for result in results if result["inlined"]})
+        self.save()
+        return results
+
+    def _remove_stale(self, expected):
+        if not self.output_dir.exists():
+            return
+        for file in self.output_dir.glob("*.css"):
+            if file.name not in expected:
+                file.unlink()
+
+    def save(self):
+        self.sources.save()
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, indent=2)
+
+
+def _write_atomic(output, text):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_suffix(".css.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, output)
+
+
+def full_stylesheet_bytes(stylesheets=STYLESHEETS):
+    return sum(Path(sheet).stat().st_size for sheet in stylesheets)
@@ -0,0 +1,379 @@
+"""
+Stylesheet parsing and used-selector pruning.
+
+``parse_stylesheet`` splits a stylesheet into rules, grouping blocks
+(``@media``, ``@supports``, ...) and opaque at-rules (``@font-face``,
+``@keyframes``, ``@import``) in one scan. ``UsedSelectors`` is the index of
+classes, ids and tags the templates use; every selector is reduced once to
+the simple selectors it requires, and each of those is a set lookup, so
+pruning a whole stylesheet is linear in its size.
+
+Selectors are kept conservatively: anything inside ``:not()``, ``:is()``,
+``:where()`` and ``:has()`` and attribute selectors are treated as matching.
+"""
+
+import fnmatch
+import json
+import re
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from .tokenizer import tokenize
+
+Rule = namedtuple('Rule', 'selectors body text')
+AtBlock = namedtuple('AtBlock', 'prelude children text')
+AtRule = namedtuple('AtRule', 'prelude text')
+
+GROUPING_AT_RULES = {'media', 'supports', 'document', '-moz-document', 'layer', 'container'}
+CSS_TOKEN = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[{};]', re.DOTALL)
+COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+SIMPLE_SELECTOR = re.compile(
+    r'\\.'
+    r'|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+    r'|\[[^\]]*\]'
+    r'|::?(-?[\w-]+)(\()?'
+    r'|\.((?:[\w-]|\\.)+)'
+    r'|#((?:[\w-]|\\.)+)'
+    r'|([A-Za-z][\w-]*)'
+    r'|[()]'
+)
+CLASS_WORD = re.compile(r'-?[A-Za-z_][\w-]*')
+ANIMATION_DECLARATION = re.compile(r'animation(?:-name)?\s*:([^;}]*)', re.IGNORECASE)
+MINIFY_TOKEN = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|\s+', re.DOTALL)
+TIGHT_PUNCTUATION = '{};,'
+
+TEMPLATE_CLASS_ATTRIBUTES = {'class', 'class:list', 'classname'}
+ALLOWLIST_KEYS = {'class': 'classes', 'id': 'ids', 'tag': 'tags'}
+
+
+def parse_stylesheet(text):
+    """Parse CSS text into a list of Rule / AtBlock / AtRule nodes."""
+    nodes, _ = _parse_block(text, 0)
+    return nodes
+
+
+def _parse_block(text, pos):
+    nodes = []
+    prelude_start = pos
+    while True:
+        match = CSS_TOKEN.search(text, pos)
+        if match is None:
+            return nodes, len(text)
+        token = match.group()
+        if token not in '{};':
+            pos = match.end()  # comment or string
+            continue
+        prelude = COMMENT.sub('', text[prelude_start:match.start()]).strip()
+        if token == '}':
+            return nodes, match.end()
+        if token == ';':
+            if prelude:
+                nodes.append(AtRule(prelude, prelude + ';'))
+            prelude_start = pos = match.end()
+            continue
+
+        # token == '{'
+        if prelude.startswith('@'):
+            name = prelude[1:].split(None, 1)[0].split('(')[0].lower()
+            if name in GROUPING_AT_RULES:
+                children, end = _parse_block(text, match.end())
+                nodes.append(AtBlock(prelude, children, text[match.start():end]))
+            else:
+                end = _matching_brace(text, match.start())
+                nodes.append(AtRule(prelude, prelude + ' ' + text[match.start():end].strip()))
+        else:
+            end = _matching_brace(text, match.start())
+            body = text[match.end():end - 1]
+            nodes.append(Rule(split_selectors(prelude), body, prelude + ' {' + body + '}'))
+        prelude_start = pos = end
+
+
+def _matching_brace(text, pos):
+    depth = 0
+    for match in CSS_TOKEN.finditer(text, pos):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return len(text)
+
+
+def split_selectors(selector_list):
+    """Split a selector list on top-level commas."""
+    selectors = []
+    depth = 0
+    start = 0
+    quote = None
+    for i, char in enumerate(selector_list):
+        if quote:
+            if char == quote and selector_list[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(selector_list[start:i].strip())
+            start = i + 1
+    selectors.append(selector_list[start:].strip())
+    return [selector for selector in selectors if selector]
+
+
+@lru_cache(maxsize=None)
+def selector_requirements(selector):
+    """
+    Return the ``(kind, name)`` simple selectors a selector needs, e.g.
+    ``.w-nav[data-x] > a.is-active`` -> ``{('class', 'w-nav'), ('tag', 'a'), ('class', 'is-active')}``.
+    """
+    requirements = set()
+    skip_depth = 0
+    for match in SIMPLE_SELECTOR.finditer(selector):
+        text = match.group()
+        if text == '(':
+            if skip_depth:
+                skip_depth += 1
+            continue
+        if text == ')':
+            if skip_depth:
+                skip_depth -= 1
+            continue
+        if match.group(2):
+            # :not(...), :is(...), :nth-child(...): arguments never make the selector unmatchable
+            skip_depth += 1
+            continue
+        if skip_depth:
+            continue
+        if match.group(3):
+            requirements.add(('class', match.group(3).replace('\\', '')))
+        elif match.group(4):
+            requirements.add(('id', match.group(4).replace('\\', '')))
+        elif match.group(5):
+            requirements.add(('tag', match.group(5).lower()))
+    return frozenset(requirements)
+
+
+class UsedSelectors:
+    """Index of the classes, ids and tags a set of templates can produce."""
+
+    def __init__(self, classes=(), ids=(), tags=(), patterns=None):
+        self.names = {'class': set(classes), 'id': set(ids), 'tag': {tag.lower() for tag in tags}}
+        self.globs = {kind: set((patterns or {}).get(kind, ())) for kind in self.names}
+        self._compiled = {}
+        self._memo = {}
+
+    def add_patterns(self, kind, globs):
+        self.globs[kind].update(globs)
+        self._compiled.pop(kind, None)
+        self._memo.clear()
+
+    def _pattern(self, kind):
+        if kind not in self._compiled:
+            # One compiled alternation per kind for all globs
+            globs = sorted(self.globs[kind])
+            self._compiled[kind] = re.compile('|'.join(fnmatch.translate(glob) for glob in globs)) if globs else None
+        return self._compiled[kind]
+
+    def has(self, kind, name):
+        if name in self.names[kind]:
+            return True
+        key = (kind, name)
+        if key not in self._memo:
+            pattern = self._pattern(kind)
+            self._memo[key] = bool(pattern and pattern.match(name))
+        return self._memo[key]
+
+    def matches(self, selector):
+        return all(self.has(kind, name) for kind, name in selector_requirements(selector))
+
+    def merge(self, other):
+        for kind in self.names:
+            self.names[kind] |= other.names[kind]
+            self.globs[kind] |= other.globs[kind]
+        self._compiled.clear()
+        self._memo.clear()
+        return self
+
+
+def collect_used_selectors(files, allowlist=None):
+    """
+    Build a UsedSelectors index from template and script files.
+
+    Classes come from ``class``/``class:list`` attributes (every word in an
+    expression counts, the static prefix of a ``${}`` template becomes a
+    prefix pattern), ids from ``id`` attributes, tags from start tags. Words
+    in script strings are added as classes and ids too, since scripts
+    toggle classes and query by id.
+    """
+    used = UsedSelectors()
+    for file in files:
+        content = Path(file).read_text(encoding='utf-8', errors='replace')
+        used.merge(used_selectors_in(content, file))
+    if allowlist:
+        apply_allowlist(used, allowlist)
+    return used
+
+
+def used_selectors_in(content, path=None):
+    """UsedSelectors for a single file's content."""
+    used = UsedSelectors()
+    prefixes = set()
+    _collect_tokens(tokenize(content, path), used, prefixes)
+    used.add_patterns('class', [prefix + '*' for prefix in prefixes])
+    return used
+
+
+def apply_allowlist(used, allowlist):
+    """Add the names and globs of an allowlist (``{"classes", "ids", "tags"}``) to an index."""
+    for kind, key in ALLOWLIST_KEYS.items():
+        globs = allowlist.get(key, [])
+        used.names[kind].update(glob for glob in globs if not _is_glob(glob))
+        used.add_patterns(kind, [glob for glob in globs if _is_glob(glob)])
+    used._memo.clear()
+    return used
+
+
+def _is_glob(name):
+    return any(ch in name for ch in '*?[')
+
+
+def _collect_tokens(tokens, used, prefixes):
+    classes, ids, tags = used.names['class'], used.names['id'], used.names['tag']
+    for token in tokens:
+        if token.kind == 'tag':
+            if token.name[0].islower():
+                tags.add(token.name.lower())
+            continue
+        if not token.value:
+            continue
+        name = (token.name or '').lower()
+        if token.kind == 'attr' and name in TEMPLATE_CLASS_ATTRIBUTES:
+            _add_words(token.value, classes, prefixes)
+        elif token.kind == 'attr' and name == 'id':
+            _add_words(token.value, ids, None)
+        elif token.kind in ('string', 'prop'):
+            _add_words(token.value, classes, prefixes if name in TEMPLATE_CLASS_ATTRIBUTES else None)
+            ids.update(CLASS_WORD.findall(token.value))
+
+
+def _add_words(value, target, prefixes):
+    if prefixes is not None and '${' in value:
+        for part in value.split('${')[:-1]:
+            words = part.split()
+            if words and not part[-1:].isspace():
+                prefixes.add(words[-1])
+    target.update(CLASS_WORD.findall(value))
+
+
+def load_allowlist(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def prune_nodes(nodes, used, stats=None, section='(top level)'):
+    """
+    Return ``[(node, css_text)]`` for the nodes whose selectors can match.
+
+    ``stats`` (an OrderedDict) collects ``{section: {bytes_before,
+    bytes_after, rules_before, rules_after}}``.
+    """
+    if stats is None:
+        stats = OrderedDict()
+    out = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            entry = stats.setdefault(section, _empty_stats())
+            entry['rules_before'] += 1
+            entry['bytes_before'] += len(node.text)
+            kept = [selector for selector in node.selectors if used.matches(selector)]
+            if not kept:
+                continue
+            text = node.text if len(kept) == len(node.selectors) else ',\n'.join(kept) + ' {' + node.body + '}'
+            entry['rules_after'] += 1
+            entry['bytes_after'] += len(text)
+            out.append((node, text))
+        elif isinstance(node, AtBlock):
+            inner = prune_nodes(node.children, used, stats, node.prelude)
+            if inner:
+                out.append((node, node.prelude + ' {\n' + '\n'.join(text for _, text in inner) + '\n}'))
+        else:
+            entry = stats.setdefault(node.prelude.split(None, 1)[0], _empty_stats())
+            entry['rules_before'] += 1
+            entry['bytes_before'] += len(node.text)
+            out.append((node, node.text))
+    return out
+
+
+def prune_stylesheet(text, used):
+    """
+    Prune a stylesheet against a UsedSelectors index.
+
+    Returns ``(css, stats)``. Opaque at-rules are kept, except ``@keyframes``
+    that no remaining rule animates.
+    """
+    stats = OrderedDict()
+    pieces = prune_nodes(parse_stylesheet(text), used, stats)
+    animated = set()
+    for node, css in pieces:
+        if not _is_keyframes(node):
+            for match in ANIMATION_DECLARATION.finditer(css):
+                animated.update(CLASS_WORD.findall(match.group(1)))
+    kept = []
+    for node, css in pieces:
+        if _is_keyframes(node) and node.prelude.split(None, 1)[-1].strip() not in animated:
+            continue
+        if isinstance(node, AtRule):
+            entry = stats[node.prelude.split(None, 1)[0]]
+            entry['rules_after'] += 1
+            entry['bytes_after'] += len(css)
+        kept.append(css)
+    return '\n'.join(kept) + '\n', stats
+
+
+def minify_css(text):
+    """Drop comments and collapse whitespace, leaving strings untouched."""
+    pieces = []  # (text, is_string); None for whitespace
+    pos = 0
+    for match in MINIFY_TOKEN.finditer(text):
+        if match.start() > pos:
+            pieces.append((text[pos:match.start()], False))
+        pos = match.end()
+        token = match.group()
+        if token[0] in '"\'':
+            pieces.append((token, True))
+        elif not token.startswith('/*'):
+            pieces.append(None)
+    if pos < len(text):
+        pieces.append((text[pos:], False))
+
+    runs = [['', False]]
+    for i, piece in enumerate(pieces):
+        if piece is None:
+            before = runs[-1][0][-1:]
+            after = pieces[i + 1][0][:1] if i + 1 < len(pieces) and pieces[i + 1] else ''
+            # Whitespace only matters between two tokens (descendant combinator, value lists)
+            if before and after and before not in TIGHT_PUNCTUATION and after not in TIGHT_PUNCTUATION:
+                piece = (' ', False)
+            else:
+                continue
+        if piece[1] or runs[-1][1]:
+            runs.append(list(piece))
+        else:
+            runs[-1][0] += piece[0]
+    return ''.join(run if is_string else run.replace(';}', '}') for run, is_string in runs)
+
+
+def _is_keyframes(node):
+    return isinstance(node, AtRule) and node.prelude.lower().startswith(('@keyframes', '@-webkit-keyframes'))
+
+
+def _empty_stats():
+    return {'bytes_before': 0, 'bytes_after': 0, 'rules_before': 0, 'rules_after': 0}
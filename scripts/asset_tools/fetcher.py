@@ -0,0 +1,496 @@
+"""
+Asynchronous fetcher for external assets.
+
+Downloads run on asyncio with a global concurrency limit and a small pool of
+keep-alive connections per host. Every response is streamed to disk while it
+is hashed, and stored in an on-disk cache together with its ETag and
+Last-Modified validators, so later runs send conditional requests and only
+transfer assets that actually changed on the remote side.
+
+Only the standard library is used; plain ``http://`` URLs work as well, which
+makes it easy to point the fetcher at a local stand-in server.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import ssl
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote, urljoin, urlsplit
+
+from .paths import CACHE_DIR
+
+DEFAULT_CACHE_DIR = CACHE_DIR / "external-assets"
+USER_AGENT = "jng-asset-fetcher/1.0"
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class FetchError(Exception):
+    """Raised when an asset cannot be downloaded or fails verification."""
+
+
+class _StaleConnection(FetchError):
+    """A pooled keep-alive connection was closed by the server."""
+
+
+class _Connection:
+    """One open HTTP/1.1 connection to a host."""
+
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+        self.released = False
+
+    def is_usable(self):
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self):
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class Response:
+    """
+    Status and headers of a response whose body is still on the connection.
+
+    Read the body with ``iter_body`` (or ``drain``) and then ``release``
+    the connection; it goes back to the pool only if the whole body was
+    read and the server allows keep-alive.
+    """
+
+    def __init__(self, pool, conn, version, status, headers, ttfb):
+        self.pool = pool
+        self.conn = conn
+        self.version = version
+        self.status = status
+        self.headers = headers
+        self.ttfb = ttfb
+        self.complete = False
+        self.released = False
+
+    async def iter_body(self):
+        async for chunk in _iter_body(self.conn.reader, self.status, self.headers, self.pool.timeout):
+            yield chunk
+        self.complete = True
+
+    async def drain(self):
+        async for _chunk in self.iter_body():
+            pass
+
+    def release(self):
+        """Hand the connection back to the pool (once; later calls do nothing)."""
+        if self.released:
+            return
+        self.released = True
+        self.pool.release(self.conn, self.complete and _keep_alive(self.version, self.headers))
+
+
+class ConnectionPool:
+    """Keep-alive connections grouped by (scheme, host, port)."""
+
+    def __init__(self, per_host=4, timeout=30, ssl_context=None):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle = {}
+        self._limits = {}
+        self.stats = {"opened": 0, "reused": 0}
+
+    def _limit(self, key):
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.per_host)
+        return self._limits[key]
+
+    async def acquire(self, scheme, host, port, fresh=False):
+        """Return an idle connection for the host, or open a new one."""
+        key = (scheme, host, port)
+        limit = self._limit(key)
+        await limit.acquire()
+        idle = self._idle.get(key, [])
+        while idle and not fresh:
+            conn = idle.pop()
+            if conn.is_usable():
+                self.stats["reused"] += 1
+                conn.released = False
+                return conn
+            conn.close()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    host, port,
+                    ssl=self.ssl_context if scheme == "https" else None,
+                    server_hostname=host if scheme == "https" else None,
+                ),
+                self.timeout,
+            )
+        except BaseException:
+            limit.release()
+            raise
+        self.stats["opened"] += 1
+        return _Connection(key, reader, writer)
+
+    def release(self, conn, reusable):
+        """Hand a connection back; it is kept only if the response allowed it."""
+        if conn.released:
+            return
+        conn.released = True
+        if reusable and conn.is_usable():
+            self._idle.setdefault(conn.key, []).append(conn)
+        else:
+            conn.close()
+        self._limit(conn.key).release()
+
+    async def request(self, url, headers):
+        """
+        Send one GET over a pooled connection and read the response headers.
+
+        A request on a reused connection the server has meanwhile closed is
+        retried once on a new one. Returns a ``Response``; the caller reads
+        the body and releases it.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise FetchError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"GET {_request_target(parts)} HTTP/1.1", f"Host: {host_header}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        for attempt in range(2):
+            conn = await self.acquire(parts.scheme, parts.hostname, port, fresh=attempt > 0)
+            reused = conn.requests > 0
+            started = time.perf_counter()
+            try:
+                conn.writer.write(payload)
+                await conn.writer.drain()
+                version, status, response_headers = await _read_headers(conn.reader, self.timeout)
+            except (_StaleConnection, ConnectionError, asyncio.IncompleteReadError):
+                self.release(conn, reusable=False)
+                if reused and attempt == 0:
+                    # The server dropped an idle keep-alive connection; retry on a new one
+                    continue
+                raise FetchError(f"Connection to {parts.hostname} failed")
+            except BaseException:
+                self.release(conn, reusable=False)
+                raise
+            conn.requests += 1
+            return Response(self, conn, version, status, response_headers, time.perf_counter() - started)
+        raise FetchError(f"Connection to {parts.hostname} failed")
+
+    async def close(self):
+        """Close every idle connection."""
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+                try:
+                    await conn.writer.wait_closed()
+                except Exception:
+                    pass
+        self._idle.clear()
+
+
+class FetchCache:
+    """
+    On-disk cache of downloaded assets.
+
+    Bodies are stored once per content hash under ``blobs/``; ``index.json``
+    maps each URL to its validators and blob hash.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.tmp_dir = self.cache_dir / "tmp"
+        self.index_file = self.cache_dir / "index.json"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.entries = {}
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def blob_path(self, sha256):
+        return self.blob_dir / sha256[:2] / sha256
+
+    def lookup(self, url):
+        """Return the cache entry for a URL if its blob is still intact."""
+        entry = self.entries.get(url)
+        if not entry:
+            return None
+        blob = self.blob_path(entry["sha256"])
+        try:
+            if blob.stat().st_size != entry["size"]:
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def store(self, url, tmp_path, sha256, size, headers):
+        """Move a verified temp file into the blob store and index it."""
+        blob = self.blob_path(sha256)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, blob)
+        entry = {
+            "sha256": sha256,
+            "size": size,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_type": headers.get("content-type"),
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        self.entries[url] = entry
+        return entry
+
+    def save(self):
+        tmp_index = self.index_file.with_suffix(".json.tmp")
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_index, self.index_file)
+
+
+def _request_target(parts):
+    path = quote(parts.path or "/", safe="/%:@!$&'()*+,;=-._~")
+    if parts.query:
+        path += "?" + parts.query
+    return path
+
+
+async def _read_headers(reader, timeout):
+    status_line = await asyncio.wait_for(reader.readline(), timeout)
+    if not status_line:
+        raise _StaleConnection("connection closed before response")
+    try:
+        version, status = status_line.decode("latin-1").split()[:2]
+        status = int(status)
+    except ValueError:
+        raise FetchError(f"Malformed status line: {status_line!r}")
+    headers = {}
+    while True:
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return version, status, headers
+
+
+async def _iter_body(reader, status, headers, timeout):
+    """Yield response body chunks; returns once the message is complete."""
+    if status in (204, 304) or 100 <= status < 200:
+        return
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size_line = await asyncio.wait_for(reader.readline(), timeout)
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers
+                while (await asyncio.wait_for(reader.readline(), timeout)) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            remaining = size
+            while remaining:
+                chunk = await asyncio.wait_for(reader.read(min(CHUNK_SIZE, remaining)), timeout)
+                if not chunk:
+                    raise FetchError("connection closed mid-chunk")
+                remaining -= len(chunk)
+                yield chunk
+            await asyncio.wait_for(reader.readexactly(2), timeout)
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining:
+            chunk = await asyncio.wait_for(reader.read(min(CHUNK_SIZE, remaining)), timeout)
+            if not chunk:
+                raise FetchError("connection closed before Content-Length was reached")
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while True:
+            chunk = await asyncio.wait_for(reader.read(CHUNK_SIZE), timeout)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    if "content-length" not in headers and "chunked" not in headers.get("transfer-encoding", "").lower():
+        return False
+    return connection != "close"
+
+
+def _copy_to_target(blob, target):
+    """Materialize a cached blob at the requested target path."""
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if target.stat().st_size == blob.stat().st_size:
+            # Cheap check first; only hash when sizes agree
+            if _sha256_file(target) == blob.name:
+                return
+    except OSError:
+        pass
+    tmp_target = target.with_name(f".{target.name}.part")
+    shutil.copyfile(blob, tmp_target)
+    os.replace(tmp_target, target)
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetFetcher:
+    """
+    Download many assets concurrently with conditional requests.
+
+    Usage::
+
+        async with AssetFetcher(concurrency=8) as fetcher:
+            results = await fetcher.fetch_all([(url, target_path), ...])
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, concurrency=8, per_host=4,
+                 timeout=30, ssl_context=None):
+        self.cache = FetchCache(cache_dir)
+        self.pool = ConnectionPool(per_host=per_host, timeout=timeout, ssl_context=ssl_context)
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.pool.close()
+        self.cache.save()
+
+    async def fetch(self, url, target=None, expected_sha256=None):
+        """
+        Fetch one URL into the cache and optionally copy it to ``target``.
+
+        Returns a result dict with ``status`` set to ``downloaded``,
+        ``not_modified`` or ``error``.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        result = {"url": url, "target": str(target) if target else None, "status": "error",
+                  "sha256": None, "size": 0, "bytes_transferred": 0, "elapsed": 0.0, "error": None}
+        async with self._semaphore:
+            try:
+                await self._fetch(url, target, expected_sha256, result)
+            except (FetchError, OSError, asyncio.TimeoutError, ValueError) as e:
+                result["status"] = "error"
+                result["error"] = str(e) or e.__class__.__name__
+        result["elapsed"] = time.perf_counter() - started
+        return result
+
+    async def _fetch(self, url, target, expected_sha256, result):
+        cached = self.cache.lookup(url)
+        if cached and expected_sha256 and cached["sha256"] != expected_sha256:
+            cached = None
+
+        headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "identity", "Connection": "keep-alive"}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        current_url = url
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self.pool.request(current_url, headers)
+            try:
+                if response.status == 304 and cached:
+                    await response.drain()
+                    result.update(status="not_modified", sha256=cached["sha256"], size=cached["size"])
+                    if target:
+                        _copy_to_target(self.cache.blob_path(cached["sha256"]), target)
+                    return
+
+                if response.status in REDIRECT_STATUSES and "location" in response.headers:
+                    await response.drain()
+                    current_url = urljoin(current_url, response.headers["location"])
+                    continue
+
+                if response.status != 200:
+                    # Do not bother draining error bodies; release() drops the connection
+                    raise FetchError(f"HTTP {response.status}")
+
+                sha256, size = await self._stream_to_cache(url, response, expected_sha256, result)
+            finally:
+                # Reused only when the body was fully consumed
+                response.release()
+            result.update(status="downloaded", sha256=sha256, size=size)
+            if target:
+                _copy_to_target(self.cache.blob_path(sha256), target)
+            return
+        raise FetchError(f"Too many redirects for {url}")
+
+    async def _stream_to_cache(self, url, response, expected_sha256, result):
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache.tmp_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in response.iter_body():
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                    result["bytes_transferred"] = size
+            expected_length = response.headers.get("content-length")
+            if expected_length is not None and int(expected_length) != size:
+                raise FetchError(f"Truncated body: got {size} of {expected_length} bytes")
+            sha256 = digest.hexdigest()
+            if expected_sha256 and sha256 != expected_sha256:
+                raise FetchError(f"Hash mismatch: expected {expected_sha256}, got {sha256}")
+            self.cache.store(url, tmp_name, sha256, size, response.headers)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return sha256, size
+
+    async def fetch_all(self, jobs):
+        """
+        Fetch several assets concurrently.
+
+        ``jobs`` is an iterable of URLs, ``(url, target)`` tuples or
+        ``(url, target, expected_sha256)`` tuples.
+        """
+        tasks = []
+        for job in jobs:
+            if isinstance(job, str):
+                job = (job,)
+            tasks.append(self.fetch(*job))
+        return await asyncio.gather(*tasks)
+
+
+def fetch_assets(jobs, cache_dir=DEFAULT_CACHE_DIR, concurrency=8, per_host=4, timeout=30):
+    """Synchronous wrapper around AssetFetcher.fetch_all for the scripts."""
+    async def run():
+        async with AssetFetcher(cache_dir=cache_dir, concurrency=concurrency,
+                                per_host=per_host, timeout=timeout) as fetcher:
+            results = await fetcher.fetch_all(jobs)
+            return results, dict(fetcher.pool.stats)
+    return asyncio.run(run())
@@ -0,0 +1,114 @@
+"""
+Memory-bounded decoding for the image converters.
+
+Opening a large source and converting it to RGBA at full resolution
+costs width x height x 4 bytes before the encoder allocates anything
+(an 8000 x 8000 export is ~256 MB). ``prepare_image`` keeps decodes
+bounded:
+
+- JPEGs are decoded with ``draft`` at the smallest 1/2, 1/4 or 1/8 scale
+  that still covers the target size, so the full-resolution raster is
+  never materialized;
+- an image whose decode would still exceed the pixel budget is refused
+  (``ImageTooLarge``) before any pixel data is read;
+- with a max dimension (off by default, so output resolution never
+  changes unless asked for), anything larger is downscaled (``reduce``
+  then Lanczos) before the mode conversion, so RGBA is only allocated at
+  the output size.
+
+    with Image.open(path) as img:
+        img, decode = prepare_image(img, max_dimension=4096)
+        img.save(output, 'WEBP', lossless=True)
+
+Pillow is only imported by the functions that decode, so the converters
+start (and print --help) without loading it, and the AVIF converter can
+fall back to ffmpeg when it is missing (``pillow_available``).
+"""
+
+import importlib.util
+
+# Longest output side in pixels; 0 (the default) disables downscaling
+DEFAULT_MAX_DIMENSION = 0
+# Largest decode in megapixels (after JPEG draft scaling)
+DEFAULT_PIXEL_BUDGET = 64
+
+
+class ImageTooLarge(ValueError):
+    """The decode of an image would exceed the pixel budget."""
+
+
+def pillow_available():
+    """Whether Pillow is installed (checked without importing it)."""
+    return importlib.util.find_spec('PIL') is not None
+
+
+def add_decode_arguments(parser):
+    parser.add_argument("--max-dimension", type=int, default=DEFAULT_MAX_DIMENSION,
+                        help="Downscale images whose longest side exceeds this (default 0 = never)")
+    parser.add_argument("--pixel-budget", type=float, default=DEFAULT_PIXEL_BUDGET,
+                        help=f"Refuse images whose decode exceeds this many megapixels (default {DEFAULT_PIXEL_BUDGET})")
+
+
+def fit_within(size, max_dimension):
+    """``size`` scaled down (aspect ratio kept) so its longest side is at most ``max_dimension``."""
+    width, height = size
+    if not max_dimension or max(width, height) <= max_dimension:
+        return size
+    scale = max_dimension / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def output_pixels(path, max_dimension=DEFAULT_MAX_DIMENSION):
+    """Pixel count ``prepare_image`` will produce for a file (reads the header only)."""
+    from PIL import Image
+    with Image.open(path) as img:
+        width, height = fit_within(img.size, max_dimension)
+    return width * height
+
+
+def normalize_mode(img):
+    """Convert to RGB or RGBA (the modes WebP and AVIF encode), keeping transparency."""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Preserve transparency
+        if img.mode == 'P' and 'transparency' in img.info:
+            img = img.convert('RGBA')
+        elif img.mode == 'LA':
+            img = img.convert('RGBA')
+        elif img.mode != 'RGBA':
+            img = img.convert('RGBA')
+    elif img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGB')
+    return img
+
+
+def prepare_image(img, max_dimension=DEFAULT_MAX_DIMENSION, pixel_budget=DEFAULT_PIXEL_BUDGET):
+    """
+    Decode an opened image within the memory bounds.
+
+    Returns the RGB/RGBA image to encode and a dict describing the decode
+    (``source``, ``decoded`` and ``output`` sizes) for the conversion log.
+    Raises ImageTooLarge when the decode would exceed ``pixel_budget``
+    megapixels.
+    """
+    source = img.size
+    target = fit_within(source, max_dimension)
+    if target != source and img.format == 'JPEG':
+        # Decode at 1/2, 1/4 or 1/8 scale straight from the DCT coefficients
+        img.draft(None, target)
+    decoded = img.size
+
+    if pixel_budget and decoded[0] * decoded[1] > pixel_budget * 1_000_000:
+        raise ImageTooLarge(f"{decoded[0]}x{decoded[1]} decode exceeds the "
+                            f"{pixel_budget:g} MP pixel budget")
+
+    img.load()
+    if img.mode in ('P', '1'):
+        # Palette and bilevel images can only be resized with nearest-neighbour
+        img = normalize_mode(img)
+    if img.size != target:
+        img = img.reduce(max(1, min(img.size[0] // target[0], img.size[1] // target[1])))
+        if img.size != target:
+            from PIL import Image
+            img = img.resize(target, Image.Resampling.LANCZOS)
+    img = normalize_mode(img)
+    return img, {'source': list(source), 'decoded': list(decoded), 'output': list(img.size)}
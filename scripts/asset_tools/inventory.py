@@ -0,0 +1,90 @@
+"""
+File inventory of the repository from a single directory walk.
+
+``get_inventory()`` walks BASE_DIR once per process with ``os.scandir``,
+pruning node_modules, .git, dist, .astro (and the tooling caches) before
+descending, and buckets every file by top-level root (src, public,
+scripts, ...) and lower-cased extension. Scripts ask it for files instead
+of running one ``rglob`` per extension and root:
+
+    get_inventory().files(SRC_DIR, ('.astro', '.ts'))
+    get_inventory().files(CDN_ASSETS_DIR, {'.png', '.jpg'})
+
+The inventory is a snapshot: a script that creates or deletes files and
+needs to see the result calls ``get_inventory(refresh=True)``.
+"""
+
+import os
+from pathlib import Path
+
+from .paths import BASE_DIR, SKIP_DIRS
+
+INVENTORY_SKIP_DIRS = SKIP_DIRS | {'__pycache__', '.cache'}
+
+
+class Inventory:
+    """Files under ``base_dir``, bucketed as ``{(root, extension): [path, ...]}``."""
+
+    def __init__(self, base_dir=BASE_DIR, skip_dirs=INVENTORY_SKIP_DIRS):
+        self.base_dir = Path(base_dir)
+        self.skip_dirs = set(skip_dirs)
+        self.buckets = {}
+        self._walk()
+
+    def _walk(self):
+        base = str(self.base_dir)
+        stack = [(base, '')]
+        while stack:
+            directory, root = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.skip_dirs:
+                            stack.append((entry.path, root or entry.name))
+                    elif entry.is_file():
+                        extension = os.path.splitext(entry.name)[1].lower()
+                        self.buckets.setdefault((root, extension), []).append(entry.path)
+        for paths in self.buckets.values():
+            paths.sort()
+
+    def __len__(self):
+        return sum(len(paths) for paths in self.buckets.values())
+
+    def files(self, under=None, extensions=None):
+        """
+        Sorted files under a directory (default: everywhere), optionally
+        only those with the given extensions (``'.png'``, case-insensitive).
+        """
+        prefix = None
+        roots = None
+        if under is not None:
+            rel = Path(under).resolve().relative_to(self.base_dir.resolve())
+            if rel.parts:
+                roots = {rel.parts[0]}
+                if len(rel.parts) > 1:
+                    prefix = str(self.base_dir / rel) + os.sep
+        wanted = {extension.lower() for extension in extensions} if extensions is not None else None
+
+        found = []
+        for (root, extension), paths in self.buckets.items():
+            if roots is not None and root not in roots:
+                continue
+            if wanted is not None and extension not in wanted:
+                continue
+            found.extend(paths if prefix is None else [path for path in paths if path.startswith(prefix)])
+        return [Path(path) for path in sorted(found)]
+
+
+_inventory = None
+
+
+def get_inventory(refresh=False):
+    """The per-process inventory of BASE_DIR (walked on first use)."""
+    global _inventory
+    if _inventory is None or refresh:
+        _inventory = Inventory()
+    return _inventory
@@ -0,0 +1,317 @@
+"""
+Repeated-markup detection across templates.
+
+``parse_markup`` builds the element tree of an Astro/HTML template in one
+scan. ``hash_tree`` then gives every element a Merkle digest computed
+bottom-up from its tag, its sorted attributes and the digests of its
+children (text with whitespace collapsed), so identical subtrees anywhere
+in the site share a digest and the whole site is hashed in linear time.
+
+``find_repeated_blocks`` groups elements by digest, keeps the maximal blocks
+(not only part of a larger repeated block) and ranks them by
+bytes x occurrences. ``extract_components`` moves the top blocks into
+src/components/*.astro and rewrites the pages to use them.
+"""
+
+import hashlib
+import re
+from collections import defaultdict, namedtuple
+from pathlib import Path
+
+from .css import AtBlock, Rule, parse_stylesheet, selector_requirements, used_selectors_in
+from .paths import BASE_DIR, SRC_DIR
+from .tokenizer import FRONTMATTER, RAW_TEXT_TAGS, LineIndex, scan_start_tag
+
+COMPONENTS_DIR = SRC_DIR / "components"
+
+MARKUP_ITEM = re.compile(r'<!--.*?-->|</([A-Za-z][\w:.\-]*)\s*>|<([A-Za-z][\w:.\-]*)', re.DOTALL)
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+UNSCOPED_STYLE_ATTRIBUTES = {'is:inline', 'is:global'}
+COMPONENT_TAG = re.compile(r'<[A-Z]')
+IMPORT_LINE = re.compile(r'^import\s.*$', re.MULTILINE)
+
+Block = namedtuple('Block', 'digest label bytes occurrences files score extractable elements')
+
+
+class Element:
+    """One element of a parsed template; ``children`` holds Elements and text."""
+
+    __slots__ = ('tag', 'start', 'end', 'attrs', 'children', 'parent', 'closed', 'digest')
+
+    def __init__(self, tag, start, end, attrs, parent):
+        self.tag = tag
+        self.start = start
+        self.end = end
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+        self.closed = False
+        self.digest = None
+
+    def attr(self, name):
+        for token in self.attrs:
+            if token.name.lower() == name:
+                return token.value
+        return None
+
+    def iter(self):
+        """Yield this element and all its descendant elements."""
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(child for child in reversed(element.children) if isinstance(child, Element))
+
+
+class ParsedTemplate:
+    """
+    Element tree of one file plus what extraction needs to know about it:
+    ``scoped_selectors`` are the ``(kind, name)`` simple selectors of the
+    file's scoped ``<style>`` blocks, which stop applying to markup moved
+    into another component.
+    """
+
+    def __init__(self, path, content, root):
+        self.path = path
+        self.content = content
+        self.root = root
+        self.scoped_selectors = set()
+        for element in root.iter():
+            if element.tag == 'style' and element.children and not any(
+                    token.name in UNSCOPED_STYLE_ATTRIBUTES for token in element.attrs):
+                self.scoped_selectors.update(_requirements(parse_stylesheet(element.children[0])))
+
+    def styles(self, text):
+        """True when scoped styles of this file select anything in ``text``."""
+        if not self.scoped_selectors:
+            return False
+        used = used_selectors_in(text, self.path)
+        return any(used.has(kind, name) for kind, name in self.scoped_selectors)
+
+
+def _requirements(nodes):
+    requirements = set()
+    for node in nodes:
+        if isinstance(node, Rule):
+            for selector in node.selectors:
+                requirements.update(selector_requirements(selector))
+        elif isinstance(node, AtBlock):
+            requirements.update(_requirements(node.children))
+    return requirements
+
+
+def _normalize_text(text):
+    return ' '.join(text.split())
+
+
+def parse_markup(content, path=None):
+    """Return the root Element of a template; the frontmatter is skipped."""
+    lines = LineIndex(content)
+    root = Element(None, 0, len(content), (), None)
+    root.closed = True
+    stack = [root]
+    frontmatter = FRONTMATTER.match(content)
+    pos = frontmatter.end() if frontmatter else 0
+
+    def add_text(start, stop):
+        text = _normalize_text(content[start:stop])
+        if text:
+            stack[-1].children.append(text)
+
+    while True:
+        item = MARKUP_ITEM.search(content, pos)
+        if item is None:
+            add_text(pos, len(content))
+            break
+        add_text(pos, item.start())
+        pos = item.end()
+        closing, tag = item.group(1), item.group(2)
+        if closing is not None:
+            for depth in range(len(stack) - 1, 0, -1):
+                if stack[depth].tag == closing:
+                    # Elements left open inside it end where their parent does
+                    for unclosed in stack[depth + 1:]:
+                        unclosed.end = item.start()
+                    stack[depth].end = item.end()
+                    stack[depth].closed = True
+                    del stack[depth:]
+                    break
+            continue
+        if tag is None:
+            continue  # comment
+
+        attrs, end = scan_start_tag(content, item.end(), tag, item.start(), lines)
+        element = Element(tag, item.start(), end, attrs, stack[-1])
+        stack[-1].children.append(element)
+        pos = end
+        lower = tag.lower()
+        if content.startswith('/>', end - 2) or lower in VOID_TAGS:
+            element.closed = True
+        elif lower in RAW_TEXT_TAGS:
+            close = re.compile(r'</' + lower + r'\s*>', re.IGNORECASE).search(content, end)
+            raw = content[end:close.start() if close else len(content)]
+            if raw.strip():
+                element.children.append(raw.strip())
+            element.end = pos = close.end() if close else len(content)
+            element.closed = close is not None
+        else:
+            stack.append(element)
+
+    for unclosed in stack[1:]:
+        unclosed.end = len(content)
+    return root
+
+
+def hash_tree(root):
+    """Set ``digest`` on every element of the tree (post-order, one visit each)."""
+    order = list(root.iter())
+    for element in reversed(order):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update((element.tag or '').encode('utf-8', 'surrogateescape'))
+        for token in sorted(element.attrs, key=lambda t: t.name):
+            value = _normalize_text(token.value) if token.value is not None else ''
+            digest.update(f'\0{token.name}\1{token.quote == "{"}\1{value}'.encode('utf-8', 'surrogateescape'))
+        digest.update(b'\2')
+        for child in element.children:
+            if isinstance(child, Element):
+                digest.update(b'\3' + child.digest)
+            else:
+                digest.update(b'\4' + child.encode('utf-8', 'surrogateescape'))
+        element.digest = digest.digest()
+    return root
+
+
+def parse_templates(files):
+    """Parse and hash templates; returns ``[ParsedTemplate]``."""
+    templates = []
+    for file in files:
+        path = Path(file)
+        content = path.read_text(encoding='utf-8', errors='surrogateescape')
+        templates.append(ParsedTemplate(path, content, hash_tree(parse_markup(content, path))))
+    return templates
+
+
+def _label(element):
+    classes = (element.attr('class') or '').split()
+    return f"{element.tag}.{classes[0]}" if classes else element.tag
+
+
+def find_repeated_blocks(templates, min_bytes=512, min_count=2):
+    """
+    Return the repeated blocks across ``templates`` ranked by score
+    (bytes x occurrences), largest first.
+
+    ``elements`` holds ``(template, element)`` for every occurrence.
+    """
+    groups = defaultdict(list)
+    for template in templates:
+        for element in template.root.iter():
+            if element.tag is not None and element.closed and element.end - element.start >= min_bytes:
+                groups[element.digest].append((template, element))
+
+    blocks = []
+    for digest, occurrences in groups.items():
+        if len(occurrences) < min_count:
+            continue
+        parents = {element.parent.digest for _, element in occurrences}
+        if len(parents) == 1:
+            parent = parents.pop()
+            if len(groups.get(parent, ())) == len(occurrences):
+                continue  # always appears inside the same larger block
+        template, first = occurrences[0]
+        text = template.content[first.start:first.end]
+        size = len(text.encode('utf-8', 'surrogateescape'))
+        extractable = (
+            '{' not in text
+            and not COMPONENT_TAG.search(text)
+            and not any(t.styles(text) for t in {t for t, _ in occurrences})
+        )
+        files = sorted({t.path.relative_to(BASE_DIR).as_posix() for t, _ in occurrences})
+        blocks.append(Block(digest.hex(), _label(first), size, len(occurrences), files,
+                            size * len(occurrences), extractable, occurrences))
+    blocks.sort(key=lambda block: (-block.score, block.label))
+    return blocks
+
+
+def component_name(label, taken):
+    """PascalCase component name for a block label, unique among ``taken``."""
+    words = re.split(r'[^A-Za-z0-9]+', label.split('.', 1)[-1])
+    base = ''.join(word[:1].upper() + word[1:] for word in words if word) or 'Repeated'
+    if not base[0].isalpha():
+        base = 'Block' + base
+    name, counter = base, 2
+    while name in taken:
+        name, counter = f"{base}{counter}", counter + 1
+    taken.add(name)
+    return name
+
+
+def _dedent_block(content, start, end):
+    # The first line starts at the tag; the rest lose their common indentation
+    lines = content[start:end].split('\n')
+    indents = [len(line) - len(line.lstrip()) for line in lines[1:] if line.strip()]
+    strip = min(indents, default=0)
+    return '\n'.join([lines[0]] + [line[strip:] for line in lines[1:]])
+
+
+def _add_import(content, name):
+    statement = f"import {name} from '@components/{name}.astro';"
+    frontmatter = FRONTMATTER.match(content)
+    if not frontmatter:
+        return f"---\n{statement}\n---\n\n{content}"
+    imports = list(IMPORT_LINE.finditer(content, frontmatter.start(1), frontmatter.end(1)))
+    at = imports[-1].end() if imports else frontmatter.start(1)
+    prefix = '\n' if imports else ''
+    suffix = '' if imports else '\n'
+    return content[:at] + prefix + statement + suffix + content[at:]
+
+
+def plan_extraction(blocks, limit, components_dir=COMPONENTS_DIR):
+    """
+    Pick up to ``limit`` extractable blocks whose occurrences do not overlap
+    an already picked block; returns ``[(name, block)]``.
+    """
+    taken = {path.stem for path in Path(components_dir).glob('*.astro')}
+    used_spans = defaultdict(list)
+    plan = []
+    for block in blocks:
+        if len(plan) >= limit:
+            break
+        if not block.extractable:
+            continue
+        spans = [(template.path, element.start, element.end) for template, element in block.elements]
+        if any(start < e and s < end for path, start, end in spans for s, e in used_spans[path]):
+            continue
+        for path, start, end in spans:
+            used_spans[path].append((start, end))
+        plan.append((component_name(block.label, taken), block))
+    return plan
+
+
+def extract_components(plan, components_dir=COMPONENTS_DIR, dry_run=False):
+    """
+    Write one component per planned block and replace every occurrence with
+    ``<Name />``. Returns ``{page path: [component names]}``.
+    """
+    edits = defaultdict(list)
+    for name, block in plan:
+        template, first = block.elements[0]
+        if not dry_run:
+            component = Path(components_dir) / f"{name}.astro"
+            component.write_text(_dedent_block(template.content, first.start, first.end) + '\n', encoding='utf-8',
+                                 errors='surrogateescape')
+        for template, element in block.elements:
+            edits[template].append((element.start, element.end, name))
+
+    rewritten = {}
+    for template, replacements in edits.items():
+        content = template.content
+        for start, end, name in sorted(replacements, reverse=True):
+            content = content[:start] + f"<{name} />" + content[end:]
+        names = sorted({name for _, _, name in replacements})
+        for name in names:
+            content = _add_import(content, name)
+        if not dry_run:
+            template.path.write_text(content, encoding='utf-8', errors='surrogateescape')
+        rewritten[template.path.relative_to(BASE_DIR).as_posix()] = names
+    return rewritten
@@ -0,0 +1,109 @@
+"""
+Orphan analysis for public/cdn-assets.
+
+Joins the asset inventory (every file under public/cdn-assets) with the set
+of references extracted from src/ and public/, and reports the files nothing
+points at. Orphans can be moved into a quarantine directory outside public/
+together with a manifest, so a prune can always be undone.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from .inventory import get_inventory
+from .paths import BASE_DIR, PUBLIC_DIR, CDN_ASSETS_DIR
+from .references import collect_references
+
+QUARANTINE_DIR = BASE_DIR / ".asset-quarantine"
+MANIFEST_NAME = "manifest.json"
+
+# Files that are loaded without an explicit reference in the sources
+DEFAULT_KEEP = (
+    "/cdn-assets/favicons/",
+)
+
+
+def asset_inventory(cdn_dir=CDN_ASSETS_DIR):
+    """Return ``{url_path: size}`` for every file under public/cdn-assets (from the shared inventory)."""
+    inventory = {}
+    for full in get_inventory().files(cdn_dir):
+        url_path = "/" + full.relative_to(PUBLIC_DIR).as_posix()
+        inventory[url_path] = full.stat().st_size
+    return inventory
+
+
+def find_orphans(inventory=None, references=None, keep=DEFAULT_KEEP):
+    """
+    Return ``(orphans, referenced)`` where ``orphans`` maps unreferenced
+    asset paths to their size.
+
+    ``references`` is the ``(paths, prefixes)`` pair from collect_references;
+    a template prefix keeps everything below it.
+    """
+    if inventory is None:
+        inventory = asset_inventory()
+    if references is None:
+        paths, prefixes, _ = collect_references()
+    else:
+        paths, prefixes = references
+    keep_prefixes = tuple(prefixes) + tuple(keep)
+
+    orphans = {}
+    referenced = {}
+    for asset_path, size in inventory.items():
+        if asset_path in paths or asset_path.startswith(keep_prefixes):
+            referenced[asset_path] = size
+        else:
+            orphans[asset_path] = size
+    return orphans, referenced
+
+
+def quarantine(orphans, quarantine_root=QUARANTINE_DIR):
+    """
+    Move orphan files out of public/ into a timestamped quarantine folder.
+
+    Returns the quarantine folder; its manifest lists every moved file so
+    ``restore`` can put them back.
+    """
+    target_root = Path(quarantine_root) / time.strftime("%Y%m%d-%H%M%S")
+    moved = []
+    for asset_path, size in sorted(orphans.items()):
+        source = PUBLIC_DIR / asset_path.lstrip("/")
+        if not source.exists():
+            continue
+        destination = target_root / asset_path.lstrip("/")
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(destination))
+        moved.append({"path": asset_path, "size": size})
+
+    if moved:
+        with open(target_root / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "files": moved}, f, indent=2, ensure_ascii=False)
+        _remove_empty_dirs(CDN_ASSETS_DIR)
+    return target_root if moved else None
+
+
+def restore(quarantine_folder):
+    """Move every file listed in a quarantine manifest back into public/."""
+    quarantine_folder = Path(quarantine_folder)
+    with open(quarantine_folder / MANIFEST_NAME, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    restored = []
+    for item in manifest["files"]:
+        source = quarantine_folder / item["path"].lstrip("/")
+        destination = PUBLIC_DIR / item["path"].lstrip("/")
+        if not source.exists() or destination.exists():
+            continue
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(destination))
+        restored.append(item["path"])
+    return restored
+
+
+def _remove_empty_dirs(root):
+    for current, dirs, files in os.walk(root, topdown=False):
+        if current != str(root) and not os.listdir(current):
+            os.rmdir(current)
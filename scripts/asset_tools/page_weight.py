@@ -0,0 +1,226 @@
+"""
+Per-route page weight analysis.
+
+For every page in src/pages the analyzer follows frontmatter imports
+(layouts, components, stylesheets; tsconfig path aliases are honoured),
+collects the /cdn-assets/ files each of them references and totals the
+bytes by type. Parsed source files are cached by mtime and size in
+scripts/.cache so repeated runs only re-read what changed.
+"""
+
+import json
+import os
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+
+from .inventory import get_inventory
+from .paths import BASE_DIR, CACHE_DIR, PAGES_DIR, PUBLIC_DIR
+from .references import extract_asset_references
+from .routes import iter_pages, page_route
+
+SOURCE_CACHE_FILE = CACHE_DIR / "page-weight-sources.json"
+# Bump when the parsing or import resolution changes, to drop stale cache entries
+SOURCE_CACHE_VERSION = 2
+TSCONFIG_FILE = BASE_DIR / "tsconfig.json"
+
+FRONTMATTER = re.compile(r'\A\s*---\s*\n(.*?)\n---', re.DOTALL)
+IMPORT_PATTERN = re.compile(r'^\s*import\s+(?:[\w*{}\s,$]+?\s+from\s+)?["\']([^"\']+)["\']', re.MULTILINE)
+RESOLVE_EXTENSIONS = ('', '.astro', '.ts', '.tsx', '.js', '.mjs', '.css', '/index.astro', '/index.ts')
+
+TYPE_BY_EXTENSION = {
+    '.avif': 'images', '.webp': 'images', '.png': 'images', '.jpg': 'images', '.jpeg': 'images',
+    '.gif': 'images', '.svg': 'images', '.ico': 'images', '.bmp': 'images',
+    '.css': 'css',
+    '.js': 'js', '.mjs': 'js',
+    '.woff': 'fonts', '.woff2': 'fonts', '.ttf': 'fonts', '.otf': 'fonts', '.eot': 'fonts',
+}
+WEIGHT_TYPES = ('images', 'css', 'js', 'fonts', 'html', 'other')
+
+
+def load_aliases(tsconfig=TSCONFIG_FILE):
+    """Return ``[(prefix, target_dir)]`` from tsconfig compilerOptions.paths."""
+    try:
+        with open(tsconfig, 'r', encoding='utf-8') as f:
+            options = json.load(f).get('compilerOptions', {})
+    except (OSError, ValueError):
+        return []
+    base = BASE_DIR / options.get('baseUrl', '.')
+    aliases = []
+    for pattern, targets in options.get('paths', {}).items():
+        if pattern.endswith('/*') and targets:
+            aliases.append((pattern[:-1], base / targets[0].rstrip('*')))
+    # Longest prefix first so @components/ wins over @/
+    aliases.sort(key=lambda item: -len(item[0]))
+    return aliases
+
+
+def asset_type(path):
+    return TYPE_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), 'other')
+
+
+class SourceIndex:
+    """Parsed imports and asset references per source file, cached on disk."""
+
+    def __init__(self, cache_file=SOURCE_CACHE_FILE):
+        self.cache_file = Path(cache_file)
+        self.aliases = load_aliases()
+        self.entries = {}
+        self.dirty = False
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('version') == SOURCE_CACHE_VERSION:
+                    self.entries = cached['entries']
+            except (OSError, ValueError, AttributeError, KeyError):
+                self.entries = {}
+
+    def resolve_import(self, spec, from_file):
+        """Resolve an import specifier to a repo-relative source file, or None."""
+        # Vite import queries (?url, ?raw, ?inline) still ship the file
+        spec = spec.split('?', 1)[0]
+        if spec.startswith('.'):
+            base = (BASE_DIR / from_file).parent / spec
+        else:
+            for prefix, target in self.aliases:
+                if spec.startswith(prefix):
+                    base = target / spec[len(prefix):]
+                    break
+            else:
+                return None  # bare package import
+        for ext in RESOLVE_EXTENSIONS:
+            candidate = Path(os.path.normpath(f"{base}{ext}"))
+            if candidate.is_file():
+                return candidate.relative_to(BASE_DIR).as_posix()
+        return None
+
+    def get(self, rel_path):
+        """Return ``{size, imports, assets}`` for a source file."""
+        full = BASE_DIR / rel_path
+        st = full.stat()
+        entry = self.entries.get(rel_path)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return entry
+
+        content = full.read_text(encoding='utf-8', errors='replace')
+        imports = []
+        frontmatter = FRONTMATTER.match(content)
+        import_source = frontmatter.group(1) if frontmatter else (content if full.suffix != '.astro' else '')
+        for match in IMPORT_PATTERN.finditer(import_source):
+            resolved = self.resolve_import(match.group(1), rel_path)
+            if resolved and resolved not in imports:
+                imports.append(resolved)
+        assets = sorted({ref['path'] for ref in extract_asset_references(content, full) if not ref['prefix']})
+
+        entry = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'imports': imports, 'assets': assets}
+        self.entries[rel_path] = entry
+        self.dirty = True
+        return entry
+
+    def closure(self, rel_path):
+        """Return every source file reachable from ``rel_path`` through imports."""
+        seen = []
+        stack = [rel_path]
+        visited = set()
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            seen.append(current)
+            stack.extend(self.get(current)['imports'])
+        return seen
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': SOURCE_CACHE_VERSION, 'entries': self.entries}, f)
+        self.dirty = False
+
+
+def asset_sizes(public_dir=PUBLIC_DIR):
+    """Return ``{url_path: size}`` for every file under public/ (from the shared inventory)."""
+    sizes = {}
+    for entry in get_inventory().files(public_dir):
+        sizes["/" + entry.relative_to(public_dir).as_posix()] = entry.stat().st_size
+    return sizes
+
+
+def analyze_page(index, page_file, sizes):
+    """Return the weight breakdown for one page."""
+    rel_page = Path(page_file).relative_to(BASE_DIR).as_posix()
+    totals = {kind: 0 for kind in WEIGHT_TYPES}
+    items = {}
+    missing = set()
+
+    for source in index.closure(rel_page):
+        entry = index.get(source)
+        if source.endswith('.css'):
+            # Imported stylesheets are bundled into the page's CSS
+            items[source] = ('css', entry['size'])
+        elif source.endswith('.astro'):
+            items[source] = ('html', entry['size'])
+        for asset_path in entry['assets']:
+            if asset_path in sizes:
+                items[asset_path] = (asset_type(asset_path), sizes[asset_path])
+            else:
+                missing.add(asset_path)
+
+    for kind, size in items.values():
+        totals[kind] += size
+    totals['total'] = sum(totals[kind] for kind in WEIGHT_TYPES)
+    offenders = sorted(((path, kind, size) for path, (kind, size) in items.items()), key=lambda item: -item[2])
+    return {
+        'route': page_route(page_file),
+        'file': rel_page,
+        'totals': totals,
+        'offenders': [{'path': path, 'type': kind, 'size': size} for path, kind, size in offenders],
+        'missing': sorted(missing),
+    }
+
+
+def analyze_site(pages_dir=PAGES_DIR, cache_file=SOURCE_CACHE_FILE):
+    """Analyze every page; returns a list of page results."""
+    index = SourceIndex(cache_file)
+    sizes = asset_sizes()
+    results = [analyze_page(index, page, sizes) for page in iter_pages(pages_dir)]
+    index.save()
+    return results
+
+
+def budget_for(route, budgets):
+    """Pick the byte budget for a route: exact match, then glob patterns, then default."""
+    routes = budgets.get('routes', {})
+    if route in routes:
+        return routes[route]
+    for pattern, budget in routes.items():
+        if any(ch in pattern for ch in '*?[') and fnmatch(route, pattern):
+            return budget
+    return budgets.get('default', {})
+
+
+def check_budgets(results, budgets):
+    """Return a list of ``(route, type, actual, limit)`` budget violations."""
+    violations = []
+    for result in results:
+        budget = budget_for(result['route'], budgets)
+        for kind, limit in budget.items():
+            actual = result['totals'].get(kind)
+            if actual is not None and actual > limit:
+                violations.append((result['route'], kind, actual, limit))
+    return violations
+
+
+def budgets_from_results(results, headroom=0.05, previous=None):
+    """Build a budget document allowing ``headroom`` above the current weights."""
+    budgets = {'headroom': headroom, 'default': (previous or {}).get('default', {}), 'routes': {}}
+    for result in results:
+        budgets['routes'][result['route']] = {
+            kind: int(result['totals'][kind] * (1 + headroom)) + 1
+            for kind in ('total',) + WEIGHT_TYPES
+            if result['totals'][kind]
+        }
+    return budgets
@@ -0,0 +1,21 @@
+"""
+Common directory layout used by the asset scripts.
+"""
+
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+SRC_DIR = BASE_DIR / "src"
+PAGES_DIR = SRC_DIR / "pages"
+PUBLIC_DIR = BASE_DIR / "public"
+CDN_ASSETS_DIR = PUBLIC_DIR / "cdn-assets"
+LEGACY_DIR = BASE_DIR / "src-legacy"
+LEGACY_CDN_ASSETS_DIR = LEGACY_DIR / "cdn-assets"
+SCRIPTS_DIR = BASE_DIR / "scripts"
+CACHE_DIR = SCRIPTS_DIR / ".cache"
+
+# Build, vendor and VCS directories no scan descends into
+SKIP_DIRS = {'node_modules', '.git', 'dist', '.astro'}
+
+# Image extensions
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.avif', '.webp', '.svg'}
@@ -0,0 +1,230 @@
+"""
+Dependency-aware stage runner.
+
+A pipeline file (scripts/image-pipeline.json) declares stages, each with
+the script it runs, the stages it depends on and its ``inputs`` and
+``outputs`` as globs relative to the repo root:
+
+    {"stages": {"convert-avif": {"script": "convert-images-to-avif.py",
+                                 "deps": ["apply-mapping"],
+                                 "inputs": ["public/cdn-assets/**/*.png"],
+                                 "outputs": ["public/cdn-assets/**/*.avif"]}}}
+
+A stage's fingerprint covers its script, its arguments and the size and
+mtime of every input file; it is recorded after the stage ran, so stages
+that rewrite their own inputs settle. A stage is skipped when the
+fingerprint matches the last successful run, its outputs exist and no
+dependency reran. Ready stages run concurrently as subprocesses.
+"""
+
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from .paths import BASE_DIR, CACHE_DIR, SCRIPTS_DIR
+
+PIPELINE_FILE = SCRIPTS_DIR / "image-pipeline.json"
+STATE_FILE = CACHE_DIR / "pipeline-state.json"
+
+
+class PipelineError(Exception):
+    """Invalid pipeline definition (unknown dependency, cycle, ...)."""
+
+
+class Stage:
+    def __init__(self, name, script, deps=(), inputs=(), outputs=(), args=()):
+        self.name = name
+        self.script = script
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(name, data["script"], data.get("deps", ()), data.get("inputs", ()),
+                   data.get("outputs", ()), data.get("args", ()))
+
+
+def load_pipeline(path=PIPELINE_FILE):
+    """Read a pipeline file; returns the stages in dependency order."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    stages = {name: Stage.from_dict(name, stage) for name, stage in data["stages"].items()}
+    return topological_order(stages)
+
+
+def topological_order(stages):
+    order, state = [], {}
+
+    def visit(name, trail):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise PipelineError("dependency cycle: " + " -> ".join(trail + [name]))
+        if name not in stages:
+            raise PipelineError(f"unknown stage '{name}' (needed by {trail[-1]})")
+        state[name] = "visiting"
+        for dep in stages[name].deps:
+            visit(dep, trail + [name])
+        state[name] = "done"
+        order.append(stages[name])
+
+    for name in stages:
+        visit(name, [])
+    return order
+
+
+def expand_globs(patterns, base_dir=BASE_DIR):
+    """Files matching the globs, as sorted repo-relative paths."""
+    files = set()
+    for pattern in patterns:
+        for path in Path(base_dir).glob(pattern):
+            if path.is_file():
+                files.add(path.relative_to(base_dir).as_posix())
+    return sorted(files)
+
+
+def input_state(stage, base_dir=BASE_DIR):
+    """``{file: [size, mtime_ns]}`` for a stage's inputs."""
+    state = {}
+    for rel in expand_globs(stage.inputs, base_dir):
+        stat = (Path(base_dir) / rel).stat()
+        state[rel] = [stat.st_size, stat.st_mtime_ns]
+    return state
+
+
+def definition_hash(stage):
+    digest = hashlib.sha256()
+    script = SCRIPTS_DIR / stage.script
+    digest.update(script.read_bytes() if script.exists() else b"")
+    digest.update(json.dumps([stage.args, stage.inputs, stage.outputs]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def explain(stage, previous, inputs, rerun_deps, base_dir=BASE_DIR):
+    """Reasons a stage has to run; an empty list means it is up to date."""
+    if previous is None:
+        return ["never ran"]
+    reasons = []
+    if previous.get("status") != "ok":
+        reasons.append("last run failed")
+    if previous.get("definition") != definition_hash(stage):
+        reasons.append("script or stage definition changed")
+    for dep in rerun_deps:
+        reasons.append(f"dependency '{dep}' reran")
+    old = previous.get("inputs", {})
+    for label, files in (
+        ("added", sorted(inputs.keys() - old.keys())),
+        ("removed", sorted(old.keys() - inputs.keys())),
+        ("modified", sorted(f for f in inputs.keys() & old.keys() if inputs[f] != old[f])),
+    ):
+        if files:
+            shown = ", ".join(files[:3]) + (f" (+{len(files) - 3} more)" if len(files) > 3 else "")
+            reasons.append(f"inputs {label}: {shown}")
+    if stage.outputs and not expand_globs(stage.outputs, base_dir):
+        reasons.append("outputs missing")
+    return reasons
+
+
+class PipelineRunner:
+    """Run stages in dependency order, skipping the ones whose inputs are unchanged."""
+
+    def __init__(self, stages, state_file=STATE_FILE, jobs=4, force=(), python=sys.executable):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        self.state_file = Path(state_file)
+        self.jobs = jobs
+        self.force = set(force)
+        self.python = python
+        self.state = {}
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError):
+                self.state = {}
+
+    def reasons(self, name, rerun):
+        stage = self.stages[name]
+        reasons = explain(stage, self.state.get(name), input_state(stage),
+                          [dep for dep in stage.deps if dep in rerun])
+        if name in self.force:
+            reasons.insert(0, "forced")
+        return reasons
+
+    def plan(self):
+        """``[(stage name, reasons)]`` assuming every stage that has to run does."""
+        rerun, plan = set(), []
+        for name in self.order:
+            reasons = self.reasons(name, rerun)
+            if reasons:
+                rerun.add(name)
+            plan.append((name, reasons))
+        return plan
+
+    def _run_stage(self, stage):
+        started = time.perf_counter()
+        process = subprocess.run(
+            [self.python, str(SCRIPTS_DIR / stage.script)] + stage.args,
+            cwd=BASE_DIR, capture_output=True, text=True,
+        )
+        return process, time.perf_counter() - started
+
+    def run(self, report=print):
+        """
+        Run the pipeline; ``report(event, name, detail)`` is called with
+        ``skip``, ``start``, ``done``, ``fail`` and ``blocked`` events.
+        Returns ``{name: status}``.
+        """
+        status, rerun = {}, set()
+        pending = list(self.order)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    if any(dep not in status for dep in stage.deps):
+                        continue
+                    pending.remove(name)
+                    failed = [dep for dep in stage.deps if status[dep] in ("failed", "blocked")]
+                    if failed:
+                        status[name] = "blocked"
+                        report("blocked", name, [f"dependency '{dep}' did not finish" for dep in failed])
+                        continue
+                    reasons = self.reasons(name, rerun)
+                    if not reasons:
+                        status[name] = "skipped"
+                        report("skip", name, [])
+                        continue
+                    report("start", name, reasons)
+                    running[pool.submit(self._run_stage, stage)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    process, elapsed = future.result()
+                    ok = process.returncode == 0
+                    status[name] = "ran" if ok else "failed"
+                    rerun.add(name)
+                    self.state[name] = {
+                        "status": "ok" if ok else "failed",
+                        "definition": definition_hash(self.stages[name]),
+                        "inputs": input_state(self.stages[name]),
+                        "duration": round(elapsed, 3),
+                        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    }
+                    self.save()
+                    report("done" if ok else "fail", name, {"process": process, "elapsed": elapsed})
+        return status
+
+    def save(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
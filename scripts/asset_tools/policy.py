@@ -0,0 +1,154 @@
+"""
+Keep-smallest output policy for the image converters.
+
+Lossless WebP of an already-compressed JPEG photo is often larger than the
+JPEG itself. ``choose_output`` encodes an image as every candidate in
+memory (lossless WebP, lossy WebP at the target quality, AVIF), drops the
+lossy ones whose PSNR against the decoded source is below the quality
+floor, and keeps the smallest of the rest, but only if it is smaller
+than the source file. Otherwise the original is kept and nothing is
+written. The returned decision lists every candidate with its byte delta
+for the conversion log:
+
+    decision, data = choose_output(img, path.stat().st_size, candidates_for(path))
+    if data is not None:
+        path.with_suffix('.' + decision['format']).write_bytes(data)
+
+Each candidate takes only the encoder effort options its format
+understands (``method`` for WebP, ``speed`` for AVIF; see
+``candidate_options``).
+
+A candidate in the source's own format is never tried (``candidates_for``),
+so the output can never land on the source file. A candidate the Pillow
+build cannot encode (no AVIF support) is logged with its error and skipped.
+"""
+
+import io
+import math
+
+from .profiling import span
+
+# Converter policies: the always-lossless-WebP default, or keep-smallest
+POLICIES = ('lossless', 'smallest')
+DEFAULT_CANDIDATES = ('webp-lossless', 'webp-lossy', 'avif')
+DEFAULT_LOSSY_QUALITY = 85
+# Quality floor for lossy candidates, in dB of PSNR against the source
+DEFAULT_MIN_PSNR = 40.0
+# Encoder effort options per output format, and their slowest (default) values
+EFFORT_OPTIONS = {'webp': ('method',), 'avif': ('speed',)}
+DEFAULT_EFFORT = {'method': 6, 'speed': 6}
+
+
+def add_policy_arguments(parser):
+    parser.add_argument("--policy", choices=POLICIES, default='lossless',
+                        help="lossless (default): always lossless WebP; smallest: keep the smallest of lossless "
+                             "WebP, lossy WebP and AVIF that meets --min-psnr and is smaller than the source")
+    parser.add_argument("--lossy-quality", type=int, default=DEFAULT_LOSSY_QUALITY,
+                        help=f"Quality of the lossy candidates (default {DEFAULT_LOSSY_QUALITY})")
+    parser.add_argument("--min-psnr", type=float, default=DEFAULT_MIN_PSNR,
+                        help=f"Quality floor of the lossy candidates in dB (default {DEFAULT_MIN_PSNR:g})")
+
+
+def candidate_options(candidate, lossy_quality=DEFAULT_LOSSY_QUALITY, effort=None):
+    """
+    (output format, Pillow save options) of a candidate.
+
+    ``effort`` holds the effort options of every format (``{'method': 6,
+    'speed': 6}``, the default); the candidate takes only its own format's.
+    """
+    if candidate == 'webp-lossless':
+        fmt, options = 'webp', {'format': 'WEBP', 'lossless': True, 'quality': 100}
+    elif candidate == 'webp-lossy':
+        fmt, options = 'webp', {'format': 'WEBP', 'quality': lossy_quality}
+    elif candidate == 'avif':
+        fmt, options = 'avif', {'format': 'AVIF', 'quality': lossy_quality}
+    else:
+        raise ValueError(f"unknown candidate: {candidate}")
+    effort = DEFAULT_EFFORT if effort is None else effort
+    options.update((name, effort[name]) for name in EFFORT_OPTIONS[fmt] if name in effort)
+    return fmt, options
+
+
+def candidates_for(source_path, candidates=DEFAULT_CANDIDATES):
+    """The candidates whose output would not overwrite ``source_path`` (no AVIF for an AVIF source)."""
+    source_format = source_path.suffix.lower().lstrip('.')
+    return tuple(candidate for candidate in candidates if candidate_options(candidate)[0] != source_format)
+
+
+def candidate_outputs(source_path, candidates=DEFAULT_CANDIDATES):
+    """Output paths the candidates for ``source_path`` can write."""
+    formats = {candidate_options(candidate)[0] for candidate in candidates_for(source_path, candidates)}
+    return [source_path.with_suffix('.' + fmt) for fmt in sorted(formats)]
+
+
+def psnr(reference, data):
+    """PSNR in dB of encoded ``data`` against the image it was encoded from (None if identical)."""
+    from PIL import Image, ImageChops, ImageStat
+    with Image.open(io.BytesIO(data)) as decoded:
+        decoded = decoded.convert(reference.mode)
+        if decoded.size != reference.size:
+            return 0.0
+        squares = [rms * rms for rms in ImageStat.Stat(ImageChops.difference(reference, decoded)).rms]
+    mse = sum(squares) / len(squares)
+    if mse == 0:
+        return None
+    return round(10 * math.log10(255 * 255 / mse), 2)
+
+
+def choose_output(img, source_size, candidates=DEFAULT_CANDIDATES, lossy_quality=DEFAULT_LOSSY_QUALITY,
+                  min_psnr=DEFAULT_MIN_PSNR, effort=None, **options):
+    """
+    Pick the output of a decoded image (see ``imaging.prepare_image``).
+
+    ``effort`` is split per format (see ``candidate_options``); ``options``
+    are passed to every encoder (exif). Returns the
+    decision and the encoded bytes to write, or None for the bytes when
+    the original should be kept.
+    """
+    results = []
+    best, best_data = None, None
+    for candidate in candidates:
+        fmt, save_options = candidate_options(candidate, lossy_quality, effort)
+        buffer = io.BytesIO()
+        try:
+            with span(f"encode-{candidate}"):
+                img.save(buffer, **save_options, **options)
+        except (KeyError, OSError) as e:
+            # KeyError: format not supported by this Pillow build
+            results.append({'candidate': candidate, 'format': fmt, 'error': str(e) or type(e).__name__})
+            continue
+        data = buffer.getvalue()
+        lossless = save_options.get('lossless', False)
+        quality = None if lossless else psnr(img, data)
+        result = {
+            'candidate': candidate,
+            'format': fmt,
+            'bytes': len(data),
+            'delta': len(data) - source_size,
+            'psnr': quality,
+            'meets_floor': lossless or quality is None or quality >= min_psnr,
+        }
+        results.append(result)
+        if result['meets_floor'] and (best is None or len(data) < best['bytes']):
+            best, best_data = result, data
+
+    decision = {
+        'chosen': None,
+        'format': None,
+        'size_before': source_size,
+        'size_after': source_size,
+        'delta': 0,
+        'candidates': results,
+    }
+    if best is None and not any('bytes' in result for result in results):
+        decision['reason'] = "no candidate could be encoded"
+        return decision, None
+    if best is None:
+        decision['reason'] = f"no candidate meets the {min_psnr:g} dB floor"
+        return decision, None
+    if best['bytes'] >= source_size:
+        decision['reason'] = f"smallest candidate ({best['candidate']}) is not smaller than the source"
+        return decision, None
+    decision.update(chosen=best['candidate'], format=best['format'],
+                    size_after=best['bytes'], delta=best['delta'])
+    return decision, best_data
@@ -0,0 +1,242 @@
+"""
+Timing spans, counters and ``--profile`` support for the asset scripts.
+
+Scripts wrap their phases in nested spans and bump counters on the shared
+``PROFILER``:
+
+    with span("walk"):
+        images = find_images()
+    for path in images:
+        with span("convert"):
+            with span("decode"):
+                ...
+        count("files")
+        count("bytes_in", size)
+
+``PROFILER.summary()`` is the machine-readable timing summary the scripts
+append to their JSON logs (span paths like ``convert;decode`` with total
+seconds and calls, plus the counters). ``profiled()`` additionally runs
+cProfile and a stack sampler and writes, under scripts/.cache/profiles/:
+
+    <name>.pstats           cProfile output (python3 -m pstats <file>)
+    <name>.collapsed        sampled Python stacks, flamegraph.pl / speedscope input
+    <name>-spans.collapsed  the span tree with self time in microseconds
+
+``reset_peak_rss()`` / ``peak_rss()`` measure the peak memory of one item
+(the converters log it per image).
+
+Coverage: ``asset-tool.py --profile <group> <command>`` profiles every
+registered script. The scripts that parse their arguments and do
+measurable work also take ``--profile`` themselves and time their phases
+in spans: the converters, find-404-errors, find-orphan-assets,
+find-repeated-markup, analyze-page-weight, extract-critical-css,
+prune-css, build-asset-catalog, fetch-external-assets and crawl-site.
+The one-pass rewrite/organize/migrate scripts have no argument parser
+and a single phase, so asset-tool's profile is all they need;
+run-benchmarks and watch-audit time themselves.
+"""
+
+import cProfile
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from .paths import BASE_DIR, CACHE_DIR
+
+PROFILE_DIR = CACHE_DIR / "profiles"
+
+
+class Profiler:
+    """Aggregated nested timing spans and named counters."""
+
+    def __init__(self):
+        self.spans = {}  # (name, ...) -> [seconds, calls]
+        self.counters = Counter()
+        self.started = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name):
+        """Time the block as ``name``, nested under the enclosing span."""
+        stack = self._stack()
+        stack.append(name)
+        path = tuple(stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            with self._lock:
+                entry = self.spans.setdefault(path, [0.0, 0])
+                entry[0] += elapsed
+                entry[1] += 1
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _self_times(self):
+        children = Counter()
+        for path, (seconds, _) in self.spans.items():
+            if len(path) > 1:
+                children[path[:-1]] += seconds
+        return {path: max(seconds - children[path], 0.0) for path, (seconds, _) in self.spans.items()}
+
+    def summary(self):
+        """Timing summary for JSON logs."""
+        self_times = self._self_times()
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "spans": {
+                ";".join(path): {
+                    "seconds": round(seconds, 4),
+                    "self_seconds": round(self_times[path], 4),
+                    "calls": calls,
+                }
+                for path, (seconds, calls) in sorted(self.spans.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def collapsed(self):
+        """Collapsed-stack lines for the span tree (self time in microseconds)."""
+        return [f"{';'.join(path)} {int(seconds * 1_000_000)}"
+                for path, seconds in sorted(self._self_times().items()) if seconds > 0]
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"Timing ({summary['total_seconds']:.2f}s total):")
+        for path, entry in summary["spans"].items():
+            depth = path.count(";")
+            name = "  " * depth + path.rsplit(";", 1)[-1]
+            print(f"  {name:<30} {entry['seconds']:>9.3f}s {entry['calls']:>7} call(s)")
+        if summary["counters"]:
+            print("  " + ", ".join(f"{name}={value}" for name, value in summary["counters"].items()))
+
+
+PROFILER = Profiler()
+span = PROFILER.span
+count = PROFILER.count
+
+
+def reset_peak_rss():
+    """
+    Reset the process's peak RSS so ``peak_rss()`` measures from here on.
+
+    Uses /proc/self/clear_refs (Linux); returns False where the peak cannot
+    be reset, in which case ``peak_rss()`` is the peak of the whole run.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """Peak resident set size in bytes since start or the last ``reset_peak_rss()``."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class StackSampler(threading.Thread):
+    """Sample the Python stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def _frame_name(frame):
+        code = frame.f_code
+        filename = code.co_filename
+        try:
+            filename = str(Path(filename).resolve().relative_to(BASE_DIR))
+        except ValueError:
+            filename = filename.rsplit("/", 1)[-1]
+        return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+    def run(self):
+        names = {}
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code not in names:
+                    names[code] = self._frame_name(frame)
+                stack.append(names[code])
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return [f"{stack} {samples}" for stack, samples in sorted(self.samples.items())]
+
+
+def add_profile_argument(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Write cProfile and collapsed-stack output to {PROFILE_DIR.relative_to(BASE_DIR)}/")
+
+
+@contextmanager
+def profiled(name, enabled=True, out_dir=PROFILE_DIR, interval=0.005):
+    """Run the block under cProfile and the stack sampler when ``enabled``."""
+    if not enabled:
+        yield
+        return
+    profile = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), interval)
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler is active (e.g. --profile given to both asset-tool and the script)
+        profile = None
+    sampler.start()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.disable()
+        sampler.stop()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if profile is not None:
+            profile.dump_stats(out_dir / f"{name}.pstats")
+            written.append(out_dir / f"{name}.pstats")
+        for path, lines in ((out_dir / f"{name}.collapsed", sampler.collapsed()),
+                            (out_dir / f"{name}-spans.collapsed", PROFILER.collapsed())):
+            if lines:
+                path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+                written.append(path)
+        print()
+        for path in written:
+            print(f"Profile written to {path.relative_to(BASE_DIR)}")
@@ -0,0 +1,162 @@
+"""
+Extraction of /cdn-assets/ references from source files.
+
+Finds asset paths in quoted attribute values (src, href, srcset, ogImage,
+content, ...), in JS/TS string literals and in CSS ``url()`` values, splits
+srcset candidate lists, resolves relative CSS URLs and decodes URL-encoded
+names so the result can be compared with files on disk.
+"""
+
+import bisect
+import re
+from pathlib import Path, PurePosixPath
+from urllib.parse import unquote, urlsplit
+
+from .inventory import get_inventory
+from .paths import BASE_DIR, SRC_DIR, PUBLIC_DIR
+
+SOURCE_EXTENSIONS = ('.astro', '.ts', '.tsx', '.js', '.jsx', '.mjs', '.css', '.html', '.md', '.mdx')
+
+QUOTED_VALUE = re.compile(r'(["\'`])((?:(?!\1)[^\n])*?cdn-assets/(?:(?!\1)[^\n])*)\1')
+CSS_URL = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.IGNORECASE)
+SRCSET_DESCRIPTOR = re.compile(r'\s+\d+(?:\.\d+)?[wx]\s*$')
+TEMPLATE_MARKERS = ('${', '{')
+
+
+def iter_source_files(roots=(SRC_DIR, PUBLIC_DIR), extensions=SOURCE_EXTENSIONS):
+    """Yield source files under the roots (from the shared, pruned inventory)."""
+    inventory = get_inventory()
+    for root_dir in roots:
+        yield from inventory.files(root_dir, extensions)
+
+
+def public_url_for(file_path):
+    """URL path a file under public/ is served at (e.g. /cdn-assets/styles/x.css)."""
+    try:
+        return "/" + Path(file_path).resolve().relative_to(PUBLIC_DIR.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def split_srcset(value):
+    """Split a srcset value into URLs, tolerating spaces inside file names."""
+    parts = [part.strip() for part in re.split(r',\s+', value) if part.strip()]
+    if len(parts) > 1 or (parts and SRCSET_DESCRIPTOR.search(parts[0])):
+        return [SRCSET_DESCRIPTOR.sub('', part).strip() for part in parts]
+    return [value.strip()]
+
+
+def normalize_asset_url(value, base_url=None):
+    """
+    Turn a raw reference into a decoded ``/cdn-assets/...`` path.
+
+    Returns ``(path, is_prefix)``; ``is_prefix`` is set for template strings
+    such as ``/cdn-assets/images/${name}.avif`` where only the static prefix
+    is known. Returns ``(None, False)`` for anything that is not a local
+    cdn-assets reference.
+    """
+    value = value.strip()
+    if not value or value.startswith(('data:', 'http://', 'https://', '//', '#', 'mailto:')):
+        return None, False
+
+    is_prefix = False
+    for marker in TEMPLATE_MARKERS:
+        if marker in value:
+            value = value[:value.index(marker)]
+            is_prefix = True
+
+    value = urlsplit(value).path if not is_prefix else value.split('?')[0].split('#')[0]
+    if 'cdn-assets/' not in value and base_url is None:
+        return None, False
+
+    if value.startswith('/'):
+        path = value
+    elif base_url and not value.startswith('cdn-assets/') and '/cdn-assets/' not in value:
+        path = str(PurePosixPath(base_url).parent / value)
+    else:
+        path = '/' + value[value.index('cdn-assets/'):]
+
+    # Collapse ../ segments
+    parts = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if parts:
+                parts.pop()
+        elif segment not in ('', '.'):
+            parts.append(segment)
+    path = '/' + '/'.join(parts)
+    if is_prefix and value.endswith('/'):
+        path += '/'
+
+    if not path.startswith('/cdn-assets/'):
+        return None, False
+    return unquote(path), is_prefix
+
+
+def extract_asset_references(content, file_path=None):
+    """
+    Find every cdn-assets reference in a file's content.
+
+    Returns a list of dicts with ``path`` (decoded), ``raw``, ``line``,
+    ``kind`` (attr, srcset, url) and ``prefix`` (template string prefix).
+    """
+    # Relative URLs only resolve against the file itself in stylesheets
+    base_url = public_url_for(file_path) if file_path is not None and str(file_path).endswith('.css') else None
+    references = []
+
+    def add(raw, start, kind):
+        path, is_prefix = normalize_asset_url(raw, base_url)
+        if path:
+            references.append({
+                "path": path,
+                "raw": raw,
+                "line": content.count('\n', 0, start) + 1,
+                "kind": kind,
+                "prefix": is_prefix,
+            })
+
+    url_starts = []
+    url_ends = []
+    for match in CSS_URL.finditer(content):
+        url_starts.append(match.start())
+        url_ends.append(match.end())
+        add(match.group(2), match.start(), "url")
+
+    for match in QUOTED_VALUE.finditer(content):
+        # Skip quoted values already handled as part of a url(...)
+        i = bisect.bisect_right(url_starts, match.start()) - 1
+        if i >= 0 and match.start() < url_ends[i]:
+            continue
+        value = match.group(2)
+        candidates = split_srcset(value)
+        kind = "srcset" if len(candidates) > 1 else "attr"
+        for candidate in candidates:
+            add(candidate, match.start(), kind)
+
+    return references
+
+
+def collect_references(roots=(SRC_DIR, PUBLIC_DIR)):
+    """
+    Collect references across all source files.
+
+    Returns ``(paths, prefixes, by_file)`` where ``paths`` is the set of
+    referenced asset paths, ``prefixes`` the set of template prefixes and
+    ``by_file`` maps repo-relative files to their references.
+    """
+    paths = set()
+    prefixes = set()
+    by_file = {}
+    for file_path in iter_source_files(roots):
+        try:
+            # Webflow exports contain a few stray non-UTF-8 bytes
+            content = file_path.read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            continue
+        refs = extract_asset_references(content, file_path)
+        if not refs:
+            continue
+        by_file[file_path.relative_to(BASE_DIR).as_posix()] = refs
+        for ref in refs:
+            (prefixes if ref["prefix"] else paths).add(ref["path"])
+    return paths, prefixes, by_file
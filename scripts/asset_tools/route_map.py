@@ -0,0 +1,148 @@
+"""
+Data-driven rewriting of legacy routes.
+
+A route map is a JSON object ``{old route: new route}`` (e.g.
+scripts/jng-route-map.json). ``RouteRewriter`` applies it to a template
+with one compiled pattern matching every ``href`` value and a dict lookup
+per match, so a page is scanned once however large the map gets; query
+strings and fragments are kept.
+
+``generate_route_map`` derives the map for a legacy prefix from the route
+table, and ``write_redirects`` emits the same map as redirect rules for the
+server (src/data/legacy-redirects.json, loaded into ``redirects`` in
+astro.config.mjs), so links fixed in the templates also redirect inbound
+traffic.
+"""
+
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from .paths import SCRIPTS_DIR, SRC_DIR
+
+ROUTE_MAP_FILE = SCRIPTS_DIR / "jng-route-map.json"
+REDIRECTS_FILE = SRC_DIR / "data" / "legacy-redirects.json"
+
+HREF_VALUE = re.compile(r'''(\bhref\s*=\s*)(["'])([^"'?#]*)([^"']*)\2''')
+
+
+def load_route_map(path=ROUTE_MAP_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_route_map(route_map, path=ROUTE_MAP_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(route_map.items())), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+class RouteRewriter:
+    """Rewrite ``href`` values found in a route map, in one pass per file."""
+
+    def __init__(self, route_map):
+        self.route_map = dict(route_map)
+
+    def rewrite(self, content):
+        """Return ``(new content, number of links rewritten)``."""
+        count = 0
+
+        def replace(match):
+            nonlocal count
+            new_route = self.route_map.get(match.group(3))
+            if new_route is None:
+                return match.group(0)
+            count += 1
+            return f"{match.group(1)}{match.group(2)}{new_route}{match.group(4)}{match.group(2)}"
+
+        return HREF_VALUE.sub(replace, content), count
+
+
+def generate_route_map(table, prefix="/jng"):
+    """
+    Map ``{prefix}/<route>`` and ``{prefix}/<last segment>`` to every static
+    page route of the table that lives outside ``prefix``.
+
+    Short forms whose last segment names more than one page are left out, as
+    are legacy URLs that are still served by a page of their own.
+    """
+    pages = [route for route, page in table.static.items()
+             if page.startswith("src/pages/") and route != "/" and not route.startswith(prefix + "/")]
+    by_name = defaultdict(list)
+    for route in pages:
+        by_name[route.rsplit("/", 1)[-1]].append(route)
+
+    route_map = {}
+    for route in pages:
+        route_map[prefix + route] = route
+    for name, routes in by_name.items():
+        if len(routes) == 1:
+            route_map.setdefault(f"{prefix}/{name}", routes[0])
+    return {old: new for old, new in route_map.items() if not table.exists(old)}
+
+
+def verify_targets(route_map, table):
+    """Return the ``(old, new)`` entries whose target no page serves."""
+    return [(old, new) for old, new in sorted(route_map.items()) if not table.exists(new)]
+
+
+def write_redirects(route_map, path=REDIRECTS_FILE, status=301):
+    """Write ``{old: {"status", "destination"}}`` in the shape of Astro's ``redirects``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rules = {old: {"status": status, "destination": new} for old, new in sorted(route_map.items())}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rules, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return rules
+
+
+def legacy_urls(legacy_dir, prefix="/jng"):
+    """Every ``.html`` URL the legacy site served from ``legacy_dir`` (e.g. /jng/aulas/foo.html)."""
+    legacy_dir = Path(legacy_dir)
+    return sorted(f"{prefix}/{file.relative_to(legacy_dir).as_posix()}" for file in legacy_dir.rglob("*.html"))
+
+
+def legacy_target(url, table, route_map, prefix="/jng"):
+    """
+    New route for a legacy URL, or None.
+
+    Follows the link fixers: drop ``.html`` (and a trailing ``/index``), keep
+    the path if a page still serves it, else apply the route map, else drop
+    the legacy prefix.
+    """
+    path = url[:-len(".html")] if url.endswith(".html") else url
+    if path == "/index" or path.endswith("/index"):
+        path = path[:-len("/index")] or "/"
+    path = path.rstrip("/") or "/"
+    candidates = [path, route_map.get(path)]
+    if path == prefix or path.startswith(prefix + "/"):
+        candidates.append(path[len(prefix):] or "/")
+    for candidate in candidates:
+        if candidate and table.exists(candidate):
+            return candidate
+    return None
+
+
+def build_legacy_redirects(urls, table, route_map, prefix="/jng", skip=()):
+    """
+    Return ``(redirects, unmapped)`` for legacy URLs: ``redirects`` maps both
+    the ``.html`` URL, its extensionless form and, for index pages, the
+    directory (when no page serves them) to the new route; URLs in ``skip``
+    are left out.
+    """
+    redirects, unmapped = {}, []
+    for url in urls:
+        target = legacy_target(url, table, route_map, prefix)
+        if target is None:
+            unmapped.append(url)
+            continue
+        bare = url[:-len(".html")] if url.endswith(".html") else url
+        forms = [url, bare]
+        if bare.endswith("/index"):
+            forms.append(bare[:-len("/index")] or "/")
+        for old in forms:
+            if old != target and old not in skip and not (old == bare and table.exists(old)):
+                redirects[old] = target
+    return dict(sorted(redirects.items())), unmapped
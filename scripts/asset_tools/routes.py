@@ -0,0 +1,180 @@
+"""
+Helpers for mapping src/pages files to the routes Astro serves them at.
+
+``RouteTable`` is compiled once from src/pages (plus the files in public/)
+and resolves internal links without touching the filesystem: static routes
+live in a dict, dynamic (``[slug]``) and catch-all (``[...rest]``) segments
+in a segment trie that is walked once per link, static segments first, then
+params, then rest parameters, the same priority Astro uses.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from .paths import BASE_DIR, PAGES_DIR, PUBLIC_DIR
+
+PAGE_EXTENSIONS = ('.astro', '.md', '.mdx', '.html')
+ENDPOINT_EXTENSIONS = ('.ts', '.js')
+
+PARAM_SEGMENT = re.compile(r'^\[(\.\.\.)?([A-Za-z_$][\w$]*)\]$')
+PARTIAL_PARAM = re.compile(r'\[([A-Za-z_]\w*)\]')
+
+
+def iter_pages(pages_dir=PAGES_DIR, extensions=PAGE_EXTENSIONS):
+    """Yield every routable page file (files and folders starting with _ are skipped)."""
+    for page in sorted(Path(pages_dir).rglob("*")):
+        if not page.is_file() or page.suffix not in extensions:
+            continue
+        if any(part.startswith("_") for part in page.relative_to(pages_dir).parts):
+            continue
+        yield page
+
+
+def page_route(page_file, pages_dir=PAGES_DIR):
+    """Return the route for a page file, e.g. aulas/foo.astro -> /aulas/foo."""
+    rel = Path(page_file).relative_to(pages_dir).with_suffix("")
+    parts = list(rel.parts)
+    if parts and parts[-1] == "index":
+        parts = parts[:-1]
+    return "/" + "/".join(parts)
+
+
+def normalize_link(link):
+    """Strip query, fragment and trailing slash from an internal link and decode it."""
+    path = unquote(urlsplit(link).path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    return path
+
+
+class _Node:
+    __slots__ = ("static", "params", "rest", "page")
+
+    def __init__(self):
+        self.static = {}
+        self.params = []   # [(name, regex or None, node)]
+        self.rest = None   # (name, page)
+        self.page = None
+
+
+class RouteTable:
+    """Compiled route lookup for src/pages and public/ files."""
+
+    def __init__(self):
+        self.static = {}
+        self.root = _Node()
+        self.dynamic_routes = []
+
+    @classmethod
+    def from_directory(cls, pages_dir=PAGES_DIR, public_dir=PUBLIC_DIR):
+        table = cls()
+        for page in iter_pages(pages_dir, PAGE_EXTENSIONS + ENDPOINT_EXTENSIONS):
+            table.add(page_route(page, pages_dir), _relative(page))
+        if public_dir is not None and Path(public_dir).exists():
+            for file in Path(public_dir).rglob("*"):
+                if file.is_file():
+                    table.static.setdefault("/" + file.relative_to(public_dir).as_posix(), _relative(file))
+        return table
+
+    def add(self, route, page):
+        """Register a route pattern (``/profile/[...rest]``) for a page."""
+        if "[" not in route:
+            self.static[route] = page
+            return
+        self.dynamic_routes.append((route, page))
+        node = self.root
+        for segment in [s for s in route.split("/") if s]:
+            match = PARAM_SEGMENT.match(segment)
+            if match and match.group(1):
+                node.rest = (match.group(2), page)
+                return
+            if match:
+                regex = None
+            elif "[" in segment:
+                regex = _segment_regex(segment)
+            else:
+                node = node.static.setdefault(segment, _Node())
+                continue
+            name = match.group(2) if match else segment
+            for existing_name, existing_regex, child in node.params:
+                if existing_name == name and (existing_regex.pattern if existing_regex else None) == (regex.pattern if regex else None):
+                    node = child
+                    break
+            else:
+                child = _Node()
+                # Segments with a static part (post-[id]) outrank a bare [param]
+                node.params.insert(0 if regex else len(node.params), (name, regex, child))
+                node = child
+        node.page = page
+
+    def resolve(self, link):
+        """
+        Resolve an internal link.
+
+        Returns ``(page, params)`` for a matching page or public file, or
+        ``None`` when nothing serves the link.
+        """
+        path = normalize_link(link)
+        page = self.static.get(path)
+        if page is not None:
+            return page, {}
+        segments = [s for s in path.split("/") if s]
+        return self._walk(self.root, segments, 0, {})
+
+    def exists(self, link):
+        return self.resolve(link) is not None
+
+    def _walk(self, node, segments, i, params):
+        if i == len(segments):
+            if node.page is not None:
+                return node.page, params
+            if node.rest is not None:
+                # A rest parameter also matches zero segments
+                return node.rest[1], dict(params, **{node.rest[0]: ""})
+            return None
+
+        segment = segments[i]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, i + 1, params)
+            if found:
+                return found
+        for name, regex, child in node.params:
+            if regex is None:
+                found = self._walk(child, segments, i + 1, dict(params, **{name: segment}))
+            else:
+                match = regex.match(segment)
+                found = self._walk(child, segments, i + 1, dict(params, **match.groupdict())) if match else None
+            if found:
+                return found
+        if node.rest is not None:
+            return node.rest[1], dict(params, **{node.rest[0]: "/".join(segments[i:])})
+        return None
+
+    def routes(self):
+        """Every registered route pattern (static routes first)."""
+        return sorted(self.static) + sorted(route for route, _ in self.dynamic_routes)
+
+
+def _segment_regex(segment):
+    """Compile a segment such as ``post-[id]`` into a regex with named groups."""
+    pattern, last = "^", 0
+    for match in PARTIAL_PARAM.finditer(segment):
+        pattern += re.escape(segment[last:match.start()]) + f"(?P<{match.group(1)}>[^/]+?)"
+        last = match.end()
+    return re.compile(pattern + re.escape(segment[last:]) + "$")
+
+
+def _relative(path):
+    try:
+        return Path(path).relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
+
+
+@lru_cache(maxsize=None)
+def load_route_table():
+    """Route table for the current tree, built once per process."""
+    return RouteTable.from_directory()
@@ -0,0 +1,148 @@
+"""
+Append-only JSONL logs for long conversion runs.
+
+Every processed item is written and flushed as one line the moment it is
+done, so a crash or Ctrl-C loses at most the item in flight and memory
+does not grow with the corpus. A run looks like:
+
+    {"event": "start", "time": ..., "resume": false, "template": {...}}
+    {"event": "item", "section": "converted", "key": "images/a.png", "entry": {...}, "size_before": 1200}
+    ...
+    {"event": "end", "time": ..., "interrupted": false, "timing": {...}}
+
+``template`` is the empty aggregate the script used to build in memory
+(``{"converted": [], "errors": [], ...}``); ``summarize`` rebuilds that
+aggregate from the log, keeping the last record of every key, so a run
+resumed several times still summarizes to one entry per item.
+"""
+
+import copy
+import json
+from datetime import datetime
+
+FAILED_SECTIONS = {"errors"}
+
+
+def read_records(path):
+    """Yield the records of a log; a truncated last line (crash mid-write) is ignored."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def latest_items(path):
+    """``{key: last item record}`` of a log."""
+    items = {}
+    for record in read_records(path):
+        if record.get("event") == "item":
+            items[record["key"]] = record
+    return items
+
+
+class RunLog:
+    """
+    Streaming log of one run.
+
+    With ``resume`` the existing log is kept and appended to, and
+    ``is_done`` reports the keys a previous run already finished (anything
+    not recorded as an error); otherwise the log starts over.
+    """
+
+    def __init__(self, path, template, resume=False):
+        self.path = path
+        self.done = set()
+        if resume and path.exists():
+            self.done = {key for key, record in latest_items(path).items()
+                         if record["section"] not in FAILED_SECTIONS}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and _ends_mid_line(path):
+            # Terminate the half-written line of a crashed run
+            self.file.write("\n")
+        self._write({"event": "start", "time": _now(), "resume": resume, "template": template})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(interrupted=exc_type is not None)
+
+    def is_done(self, key):
+        return key in self.done
+
+    def record(self, section, key, entry, **fields):
+        """Log one item: ``entry`` goes to ``section`` of the aggregate."""
+        self._write({"event": "item", "section": section, "key": key, "entry": entry, **fields})
+
+    def close(self, **fields):
+        if self.file.closed:
+            return
+        self._write({"event": "end", "time": _now(), "interrupted": False, **fields})
+        self.file.close()
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+
+def summarize(path):
+    """
+    Rebuild the aggregate log from a JSONL log.
+
+    Sections are filled in log order with the last record of every key. A
+    ``stats`` section in the template is recomputed from the items'
+    ``size_before`` and ``size_after``; ``timing`` is the one of the last
+    completed run and ``runs`` counts the starts, resumes included.
+    """
+    template, timing, runs = None, None, 0
+    items = {}
+    for record in read_records(path):
+        event = record.get("event")
+        if event == "start":
+            runs += 1
+            if template is None:
+                template = record["template"]
+        elif event == "item":
+            items.pop(record["key"], None)
+            items[record["key"]] = record
+        elif event == "end" and record.get("timing"):
+            timing = record["timing"]
+    if template is None:
+        raise ValueError(f"{path} has no start record")
+
+    aggregate = copy.deepcopy(template)
+    for record in items.values():
+        aggregate.setdefault(record["section"], []).append(record["entry"])
+    if "stats" in aggregate:
+        stats = aggregate["stats"]
+        stats["total_size_before"] = sum(record.get("size_before") or 0 for record in items.values())
+        stats["total_size_after"] = sum(record.get("size_after") or 0 for record in items.values())
+        stats["files_converted"] = sum(1 for record in items.values() if record["section"] == "converted")
+    aggregate["runs"] = runs
+    if timing is not None:
+        aggregate["timing"] = timing
+    return aggregate
+
+
+def write_summary(log_path, output_path):
+    """Summarize a log into the aggregate JSON file; returns the aggregate."""
+    aggregate = summarize(log_path)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(aggregate, f, indent=2, ensure_ascii=False)
+    return aggregate
+
+
+def _ends_mid_line(path):
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, 2)
+        return f.read(1) != b"\n"
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
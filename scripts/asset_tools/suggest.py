@@ -0,0 +1,231 @@
+"""
+"Did you mean" suggestions for missing /cdn-assets/ references.
+
+Every asset under public/cdn-assets is indexed by its normalized stem
+(lowercase, ``_`` and spaces folded to ``-``, no extension) in a trigram
+index, together with the old names recorded in the catalog mappings (the renames
+done by organize-images.py and the GIF reorganization), so a reference to a
+renamed file still finds its new home. A lookup only computes the edit
+distance for names that share enough trigrams with the miss to be within
+the tolerance, which keeps queries fast with tens of thousands of assets.
+
+Candidates are ranked by a confidence in [0, 1] that combines the stem edit
+distance with how much of the directory path they share with the miss.
+"""
+
+import re
+from collections import Counter, defaultdict
+from pathlib import PurePosixPath
+from urllib.parse import unquote
+
+from .inventory import get_inventory
+from .paths import CDN_ASSETS_DIR, PUBLIC_DIR
+
+STEM_SEPARATORS = re.compile(r'[\s_.%]+|-{2,}')
+IMAGE_SUFFIXES = {'.avif', '.webp', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.bmp', '.tif', '.tiff'}
+
+# Weight of the stem distance vs the directory similarity in the confidence
+STEM_WEIGHT = 0.8
+# Penalty when the candidate is a different kind of file (e.g. .css for .png)
+KIND_PENALTY = 0.15
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+
+def _same_file(path, other):
+    """Same file name, or the same stem with both names image formats."""
+    a, b = PurePosixPath(path), PurePosixPath(other)
+    if a.name == b.name:
+        return True
+    return a.stem == b.stem and a.suffix.lower() in IMAGE_SUFFIXES and b.suffix.lower() in IMAGE_SUFFIXES
+
+
+def normalize_stem(path):
+    """Comparable stem for a path: ``/x/My_Logo 2.PNG`` -> ``my-logo-2``."""
+    stem = PurePosixPath(unquote(path)).stem.lower()
+    return STEM_SEPARATORS.sub('-', stem).strip('-')
+
+
+def levenshtein(a, b, limit=None):
+    """
+    Edit distance between two strings.
+
+    Uses the bit-parallel algorithm by Myers/Hyyrö (one pass over ``b`` with
+    ``a`` held in an integer bit vector), which is an order of magnitude
+    faster than the dynamic programming table in pure Python. Returns
+    ``limit + 1`` straight away when the lengths alone exceed ``limit``.
+    """
+    if a == b:
+        return 0
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a or not b:
+        return len(a) or len(b)
+    peq = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = full, 0, len(a)
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & full
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+    return score
+
+
+class NGramIndex:
+    """
+    Inverted trigram index over strings.
+
+    A string within edit distance ``k`` of the query shares at least
+    ``len + n - 1 - n * k`` of its padded n-grams with it, so only the words
+    reaching that count (and within ``k`` in length) are compared exactly.
+    """
+
+    def __init__(self, n=3):
+        self.n = n
+        self.words = []
+        self.values = []
+        self.ids = {}
+        self.postings = defaultdict(list)
+
+    def grams(self, word):
+        padded = "^" * (self.n - 1) + word + "$" * (self.n - 1)
+        return {padded[i:i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def add(self, word, value):
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = len(self.words)
+            self.words.append(word)
+            self.values.append([])
+            for gram in self.grams(word):
+                self.postings[gram].append(word_id)
+        if value not in self.values[word_id]:
+            self.values[word_id].append(value)
+
+    def search(self, word, tolerance):
+        """Return ``[(distance, word, values)]`` within ``tolerance`` of ``word``."""
+        counts = Counter()
+        for gram in self.grams(word):
+            counts.update(self.postings.get(gram, ()))
+        needed = len(word) + self.n - 1 - self.n * tolerance
+        found = []
+        for word_id, shared in counts.items():
+            candidate = self.words[word_id]
+            if shared < needed or abs(len(candidate) - len(word)) > tolerance:
+                continue
+            distance = levenshtein(word, candidate, tolerance)
+            if distance <= tolerance:
+                found.append((distance, candidate, self.values[word_id]))
+        return found
+
+    def __len__(self):
+        return len(self.words)
+
+
+def _dir_parts(path):
+    return [part for part in PurePosixPath(path).parent.parts if part not in ('/', 'cdn-assets')]
+
+
+def _dir_similarity(a, b):
+    parts_a, parts_b = set(_dir_parts(a)), set(_dir_parts(b))
+    if not parts_a:
+        # Top-level references predate the folder structure; no signal either way
+        return 1.0
+    return len(parts_a & parts_b) / len(parts_a | parts_b)
+
+
+def _same_kind(a, b):
+    ext_a, ext_b = PurePosixPath(a).suffix.lower(), PurePosixPath(b).suffix.lower()
+    return ext_a == ext_b or (ext_a in IMAGE_SUFFIXES and ext_b in IMAGE_SUFFIXES)
+
+
+class AssetSuggester:
+    """Suggest existing assets for a missing /cdn-assets/ path."""
+
+    def __init__(self, assets, aliases=None):
+        """
+        ``assets`` is an iterable of existing ``/cdn-assets/...`` paths;
+        ``aliases`` maps old paths or names to their current path.
+        """
+        self.assets = set(assets)
+        self.aliases = {}
+        self.index = NGramIndex()
+        for path in self.assets:
+            self.index.add(normalize_stem(path), path)
+        for old, new in (aliases or {}).items():
+            if new in self.assets:
+                self.aliases[old] = new
+                self.index.add(normalize_stem(old), new)
+
+    @classmethod
+    def from_public(cls, cdn_dir=CDN_ASSETS_DIR, catalog=None):
+        """Index public/cdn-assets plus the old names from the catalog mappings."""
+        assets = ["/" + full.relative_to(PUBLIC_DIR).as_posix() for full in get_inventory().files(cdn_dir)]
+        aliases = {}
+        if catalog is not None:
+            rows = catalog.conn.execute("SELECT old_path, new_path FROM mappings").fetchall()
+            aliases = {row["old_path"]: row["new_path"] for row in rows if row["new_path"]}
+        return cls(assets, aliases)
+
+    def suggest(self, missing_path, limit=5):
+        """Return ``[{"path", "confidence", "reason"}]`` best first."""
+        missing_path = unquote(missing_path)
+        alias = self.aliases.get(missing_path) or self.aliases.get(PurePosixPath(missing_path).name)
+        if alias and alias != missing_path:
+            return [{"path": alias, "confidence": 1.0, "reason": "renamed"}]
+
+        stem = normalize_stem(missing_path)
+        if not stem:
+            return []
+        tolerance = max(1, len(stem) // 4)
+        candidates = {}
+        for distance, word, paths in self.index.search(stem, tolerance):
+            stem_score = 1 - distance / max(len(stem), len(word))
+            for path in paths:
+                if path == missing_path:
+                    continue
+                confidence = STEM_WEIGHT * stem_score + (1 - STEM_WEIGHT) * _dir_similarity(missing_path, path)
+                if not _same_kind(missing_path, path):
+                    confidence -= KIND_PENALTY
+                if distance:
+                    reason = "similar name"
+                elif PurePosixPath(path).parent == PurePosixPath(missing_path).parent:
+                    reason = "different extension"
+                else:
+                    reason = "moved"
+                if confidence > candidates.get(path, {}).get("confidence", -1):
+                    candidates[path] = {"path": path, "confidence": round(max(confidence, 0.0), 3), "reason": reason}
+        ranked = sorted(candidates.values(), key=lambda c: (-c["confidence"], c["path"]))
+        return ranked[:limit]
+
+    def best(self, missing_path, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        """
+        The suggestion to apply automatically, or None.
+
+        A suggestion qualifies when it reaches ``min_confidence``, is not
+        tied with the runner-up and is a recorded rename or has the missing
+        file name, up to a converted image format (``foo.png`` ->
+        ``foo.avif``). A near name such as a hash-renamed copy can score high
+        on confidence and still be a different file.
+        """
+        ranked = self.suggest(missing_path, limit=2)
+        if not ranked or ranked[0]["confidence"] < min_confidence:
+            return None
+        if len(ranked) > 1 and ranked[1]["confidence"] == ranked[0]["confidence"]:
+            return None
+        top = ranked[0]
+        if top["reason"] != "renamed" and not _same_file(top["path"], unquote(missing_path)):
+            return None
+        return top
@@ -0,0 +1,261 @@
+"""
+Deterministic synthetic site for scale testing.
+
+``SyntheticSite`` generates a job-board-shaped ``src/pages`` tree and a
+``public/cdn-assets`` tree of any size from a seed: Webflow-style markup,
+images with ``-p-500/-p-800/-p-1080`` srcset variants, Webflow
+hash-prefixed legacy file names, URL-encoded names (spaces and accents),
+legacy ``/jng/*.html`` links, and broken links and asset references at
+configurable rates. The same parameters always produce the same bytes.
+
+Pages can be consumed in memory (``iter_pages``, used by the benchmarks)
+or written to disk with ``write``, which also writes a manifest.json
+listing the injected broken links and assets as ground truth. Asset files
+are small placeholders, not decodable images.
+"""
+
+import json
+import random
+from pathlib import Path
+from urllib.parse import quote
+
+WORDS = (
+    "vaga", "remoto", "backend", "frontend", "dados", "produto", "design", "senior", "pleno",
+    "junior", "empresa", "carreira", "entrevista", "salario", "contrato", "europa", "canada",
+    "portugal", "alemanha", "startup", "fintech", "saude", "logistica", "cloud", "mobile",
+    "seguranca", "plataforma", "estagio", "lideranca", "engenharia", "analista", "gestao",
+)
+ACCENTED = ("currículo", "promoção", "negociação", "ação", "área", "você", "código", "técnico")
+SECTIONS = (("vagas", 0.6), ("empresas", 0.15), ("blog", 0.15), ("aulas", 0.1))
+IMAGE_FOLDERS = ("images/photos", "images/logos/companies", "images/icons", "images/graphics",
+                 "images/screenshots")
+RASTER_EXTENSIONS = (".avif", ".png", ".jpg", ".webp")
+VARIANT_WIDTHS = (500, 800, 1080)
+LEGACY_PREFIX = "/jng"
+
+DEFAULTS = {
+    "pages": 1000,
+    "assets": 10000,
+    "seed": 1,
+    "broken_link_rate": 0.02,
+    "broken_asset_rate": 0.01,
+    "legacy_link_rate": 0.05,
+    "legacy_name_rate": 0.3,
+    "encoded_name_rate": 0.1,
+    "srcset_rate": 0.4,
+}
+
+
+class SyntheticAsset:
+    __slots__ = ("path", "variants")
+
+    def __init__(self, path, variants=()):
+        self.path = path          # relative to public/cdn-assets, unencoded
+        self.variants = variants  # [(width, path)]
+
+    @property
+    def url(self):
+        return asset_url(self.path)
+
+
+def asset_url(path):
+    return "/cdn-assets/" + quote(path)
+
+
+class SyntheticSite:
+    """A generated site; see the module docstring for the knobs."""
+
+    def __init__(self, **params):
+        unknown = set(params) - set(DEFAULTS)
+        if unknown:
+            raise TypeError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+        self.params = dict(DEFAULTS, **params)
+        self.assets = self._generate_assets()
+        self.routes = self._generate_routes()
+        # Legacy URL -> route, the shape of scripts/jng-route-map.json
+        self.route_map = {f"{LEGACY_PREFIX}/{route.rsplit('/', 1)[-1]}": route
+                          for route in self.routes if route.count("/") == 2}
+
+    # -- assets -------------------------------------------------------------
+
+    def _slug(self, rng, words=3):
+        return "-".join(rng.choice(WORDS) for _ in range(words))
+
+    def _asset_name(self, rng, i):
+        roll = rng.random()
+        if roll < self.params["legacy_name_rate"]:
+            # Webflow export: 24 hex chars, underscore, original (spaced) name
+            prefix = "".join(rng.choice("0123456789abcdef") for _ in range(24))
+            title = " ".join(word.capitalize() for word in self._slug(rng, 2).split("-"))
+            return f"{prefix}_{title} {i}"
+        if roll < self.params["legacy_name_rate"] + self.params["encoded_name_rate"]:
+            return f"{rng.choice(ACCENTED)} {self._slug(rng, 1)} {i}"
+        return f"{self._slug(rng, 2)}-{i}"
+
+    def _generate_assets(self):
+        rng = random.Random(f"{self.params['seed']}-assets")
+        assets, count, i = [], 0, 0
+        while count < self.params["assets"]:
+            folder = rng.choice(IMAGE_FOLDERS)
+            ext = ".svg" if folder == "images/icons" else rng.choice(RASTER_EXTENSIONS)
+            name = self._asset_name(rng, i)
+            variants = ()
+            if ext != ".svg" and rng.random() < self.params["srcset_rate"]:
+                variants = tuple((width, f"{folder}/{name}-p-{width}{ext}") for width in VARIANT_WIDTHS)
+            assets.append(SyntheticAsset(f"{folder}/{name}{ext}", variants))
+            count += 1 + len(variants)
+            i += 1
+        return assets
+
+    def iter_asset_paths(self):
+        """Every file of public/cdn-assets, relative to it."""
+        for asset in self.assets:
+            yield asset.path
+            for _, path in asset.variants:
+                yield path
+
+    # -- pages --------------------------------------------------------------
+
+    def _generate_routes(self):
+        rng = random.Random(f"{self.params['seed']}-routes")
+        routes = ["/"] + [f"/{section}" for section, _ in SECTIONS]
+        names = [section for section, _ in SECTIONS]
+        weights = [weight for _, weight in SECTIONS]
+        seen = set(routes)
+        i = 0
+        while len(routes) < self.params["pages"]:
+            route = f"/{rng.choices(names, weights)[0]}/{self._slug(rng)}-{i}"
+            i += 1
+            if route not in seen:
+                seen.add(route)
+                routes.append(route)
+        return routes
+
+    @staticmethod
+    def page_file(route):
+        """Page file of a route: / and section roots are index pages."""
+        if route.count("/") == 2:
+            return route[1:] + ".astro"
+        return (route[1:] + "/index.astro").lstrip("/")
+
+    def _generated_pages(self):
+        targets = [(self.page_file(route), route) for route in self.routes]
+        targets.append(("perfil/[...rest].astro", "/perfil"))
+        for n, (page, route) in enumerate(targets):
+            yield (page,) + self._page(route, n)
+
+    def iter_pages(self):
+        """Yield ``(path relative to src/pages, content)`` for every page."""
+        for page, content, _, _ in self._generated_pages():
+            yield page, content
+
+    def _page(self, route, n):
+        """Page content plus the broken links and asset references it contains."""
+        rng = random.Random(f"{self.params['seed']}-page-{n}")
+        broken_links, broken_assets = [], []
+        title = " ".join(word.capitalize() for word in route.rsplit("/", 1)[-1].split("-")[:3]) or "Início"
+        lines = [
+            "---",
+            "import BaseLayout from '@layouts/BaseLayout.astro';",
+            "import CommunityNavbar from '@components/CommunityNavbar.astro';",
+            "---",
+            "",
+            "<BaseLayout",
+            f"  title={{'{title} | #jobnagringa'}}",
+            "  description={''}",
+            f"  wfPage={{'{rng.getrandbits(96):024x}'}}",
+            ">",
+            '  <div class="nav_wrapper">',
+            "    <CommunityNavbar />",
+            "  </div>",
+            '  <div class="section-hero">',
+            '    <div class="padding-global">',
+            '      <div class="w-layout-blockcontainer container-large w-container">',
+            f'        <h1 class="heading-style-h2">{title}</h1>',
+        ]
+        for _ in range(rng.randint(3, 12)):
+            lines.extend(self._image(rng, broken_assets))
+        lines.append('        <div class="w-layout-grid grid-links">')
+        for _ in range(rng.randint(10, 30)):
+            href, label = self._link(rng, broken_links)
+            lines.append(f'          <a href="{href}" class="link-block w-inline-block">'
+                         f'<div class="text-size-small">{label}</div></a>')
+        lines.extend([
+            "        </div>",
+            "      </div>",
+            "    </div>",
+            "  </div>",
+            "</BaseLayout>",
+            "",
+        ])
+        return "\n".join(lines), broken_links, broken_assets
+
+    def _image(self, rng, broken_assets):
+        asset = rng.choice(self.assets)
+        if rng.random() < self.params["broken_asset_rate"]:
+            path = asset.path.rsplit("/", 1)[0] + f"/removida-{rng.getrandbits(32):08x}.png"
+            broken_assets.append(path)
+            return [f'        <img src="{asset_url(path)}" loading="lazy" alt="" class="image-cover"/>']
+        if asset.path.endswith(".svg"):
+            return [f'        <div class="icon-1x1-medium"><img src="{asset.url}" loading="lazy" alt=""/></div>']
+        attributes = f'src="{asset.url}" loading="lazy" alt="" class="image-cover"'
+        if asset.variants:
+            srcset = ", ".join(f"{asset_url(path)} {width}w" for width, path in asset.variants)
+            attributes += (f' sizes="(max-width: 479px) 92vw, (max-width: 991px) 45vw, 500px"'
+                           f' srcset="{srcset}, {asset.url} 1200w"')
+        return [f'        <div class="card_image-wrapper"><img {attributes}/></div>']
+
+    def _link(self, rng, broken_links):
+        target = rng.choice(self.routes)
+        label = target.rsplit("/", 1)[-1].replace("-", " ") or "início"
+        roll = rng.random()
+        if roll < self.params["broken_link_rate"]:
+            href = f"{target.rstrip('/')}/pagina-removida"
+            broken_links.append(href)
+        elif roll < self.params["broken_link_rate"] + self.params["legacy_link_rate"] and target.count("/") == 2:
+            href = f"{LEGACY_PREFIX}/{target.rsplit('/', 1)[-1]}.html"
+        else:
+            href = target
+        return href, label
+
+    # -- disk ---------------------------------------------------------------
+
+    def write(self, root):
+        """
+        Write src/pages, public/cdn-assets and manifest.json under ``root``;
+        returns the manifest.
+        """
+        root = Path(root)
+        pages_dir = root / "src" / "pages"
+        assets_dir = root / "public" / "cdn-assets"
+        made = set()
+
+        def write_file(path, data):
+            if path.parent not in made:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                made.add(path.parent)
+            path.write_bytes(data)
+
+        for path in self.iter_asset_paths():
+            write_file(assets_dir / path, f"synthetic asset {path}\n".encode("utf-8"))
+
+        broken_links, broken_assets, links = [], [], 0
+        for page, content, page_broken_links, page_broken_assets in self._generated_pages():
+            write_file(pages_dir / page, content.encode("utf-8"))
+            links += content.count(' href="')
+            broken_links.extend({"page": page, "href": href} for href in page_broken_links)
+            broken_assets.extend({"page": page, "path": path} for path in page_broken_assets)
+
+        manifest = {
+            "params": self.params,
+            "pages": len(self.routes) + 1,
+            "assets": sum(1 for _ in self.iter_asset_paths()),
+            "links": links,
+            "broken_links": broken_links,
+            "broken_assets": broken_assets,
+            "route_map": self.route_map,
+        }
+        with open(root / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        return manifest
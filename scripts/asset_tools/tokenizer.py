@@ -0,0 +1,227 @@
+"""
+Single-pass tokenizer for Astro templates (and the HTML, CSS and TS files
+around them).
+
+``tokenize`` walks a file once and yields a ``Token`` for every value the
+asset and link scripts care about, with offsets into the original text so
+fixers can rewrite values in place:
+
+- ``tag``: an element start tag, with ``name`` set to the tag name.
+- ``attr``: a tag attribute. Quoted, unquoted, multi-line and ``{expr}``
+  values are all handled; an expression that is a single string literal
+  (``ogImage={'/cdn-assets/x.avif'}``) is unwrapped to that literal.
+- ``url``: a CSS ``url()`` value inside ``<style>``, a ``style=`` attribute
+  or a stylesheet.
+- ``prop``: a string literal in the frontmatter, with ``name`` set to the
+  identifier it is assigned to (``ogImage = '...'`` / ``ogImage: '...'``).
+- ``string``: a string literal in a ``<script>``, in an attribute expression
+  or in a JS/TS file.
+
+Comments (HTML, JS and CSS) are skipped.
+"""
+
+import bisect
+import re
+from collections import namedtuple
+from pathlib import Path
+
+TEMPLATE_SUFFIXES = ('.astro', '.html', '.htm', '.md', '.mdx')
+CSS_SUFFIXES = ('.css',)
+SCRIPT_SUFFIXES = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs')
+
+Token = namedtuple('Token', 'kind name value start end line tag tag_start quote')
+
+FRONTMATTER = re.compile(r'\A\s*---[ \t]*\r?\n(.*?)\r?\n---', re.DOTALL)
+TEMPLATE_ITEM = re.compile(r'<!--.*?-->|<([A-Za-z][\w:.\-]*)', re.DOTALL)
+ATTRIBUTE = re.compile(
+    r'\s*(?:'
+    r'(\{)'                                   # spread / shorthand {...props}
+    r'|([^\s"\'<>/={}]+)'                     # attribute name
+    r'(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|(\{)|([^\s"\'=<>`{}]+)))?'
+    r')'
+)
+TAG_END = re.compile(r'\s*/?>')
+SCRIPT_ITEM = re.compile(
+    r'//[^\n]*|/\*.*?\*/'
+    r'|"((?:\\.|[^"\\\n])*)"|\'((?:\\.|[^\'\\\n])*)\'|`((?:\\.|[^`\\])*)`',
+    re.DOTALL,
+)
+BRACE_ITEM = re.compile(r'[{}]|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`|//[^\n]*|/\*.*?\*/', re.DOTALL)
+CSS_ITEM = re.compile(r'/\*.*?\*/|url\(\s*(["\']?)([^"\')]*)\1\s*\)', re.DOTALL | re.IGNORECASE)
+SINGLE_LITERAL = re.compile(r'\s*(["\'`])((?:\\.|(?!\1)[^\\])*)\1\s*\Z', re.DOTALL)
+ASSIGNED_NAME = re.compile(r'([A-Za-z_$][\w$]*)\??\s*[:=]\s*\Z')
+RAW_TEXT_TAGS = {'script', 'style', 'textarea', 'title'}
+
+
+class LineIndex:
+    """Offset -> 1-based line number lookups for one text."""
+
+    def __init__(self, content):
+        self.newlines = [m.start() for m in re.finditer('\n', content)]
+
+    def line(self, offset):
+        return bisect.bisect_left(self.newlines, offset) + 1
+
+
+def tokenize(content, path=None):
+    """Yield every Token in ``content``; the file suffix of ``path`` picks the mode."""
+    suffix = Path(path).suffix.lower() if path is not None else '.astro'
+    lines = LineIndex(content)
+    if suffix in CSS_SUFFIXES:
+        yield from _css_tokens(content, 0, len(content), lines, None, None)
+    elif suffix in SCRIPT_SUFFIXES:
+        yield from _script_tokens(content, 0, len(content), lines, 'string', None, None)
+    else:
+        yield from _template_tokens(content, lines)
+
+
+def tokenize_file(path):
+    """Read ``path`` (tolerating stray bytes) and return its tokens as a list."""
+    content = Path(path).read_text(encoding='utf-8', errors='replace')
+    return content, list(tokenize(content, path))
+
+
+def _template_tokens(content, lines):
+    pos = 0
+    frontmatter = FRONTMATTER.match(content)
+    if frontmatter:
+        yield from _script_tokens(content, frontmatter.start(1), frontmatter.end(1), lines, 'prop', None, None)
+        pos = frontmatter.end()
+
+    while True:
+        item = TEMPLATE_ITEM.search(content, pos)
+        if item is None:
+            return
+        tag = item.group(1)
+        if tag is None:
+            pos = item.end()  # comment
+            continue
+        tag_start = item.start()
+        yield Token('tag', tag, None, tag_start, item.end(), lines.line(tag_start), tag, tag_start, None)
+        pos = yield from _attributes(content, item.end(), tag, tag_start, lines)
+        lower = tag.lower()
+        if lower in RAW_TEXT_TAGS and not content.startswith('/>', pos - 2):
+            close = _find_close(content, pos, lower)
+            if lower == 'style':
+                yield from _css_tokens(content, pos, close, lines, tag, tag_start)
+            elif lower == 'script':
+                yield from _script_tokens(content, pos, close, lines, 'string', tag, tag_start)
+            pos = close
+
+
+def _attributes(content, pos, tag, tag_start, lines):
+    """Yield the attribute tokens of one start tag; returns the offset after ``>``."""
+    length = len(content)
+    while pos < length:
+        end = TAG_END.match(content, pos)
+        if end:
+            return end.end()
+        match = ATTRIBUTE.match(content, pos)
+        if match is None or match.end() == pos:
+            # Not a well-formed tag (e.g. "a < b" in text); resume after the name
+            return pos + 1
+        if match.group(1):
+            pos = _match_brace(content, match.start(1))
+            continue
+        name = match.group(2)
+        if match.group(5):
+            brace = match.start(5)
+            pos = _match_brace(content, brace)
+            yield from _expression(content, brace + 1, pos - 1, name, lines, tag, tag_start)
+            continue
+        for group, quote in ((3, '"'), (4, "'"), (6, '')):
+            if match.group(group) is not None:
+                start, stop = match.span(group)
+                yield Token('attr', name, match.group(group), start, stop, lines.line(start), tag, tag_start, quote)
+                if name.lower() == 'style':
+                    yield from _css_tokens(content, start, stop, lines, tag, tag_start)
+                break
+        else:
+            yield Token('attr', name, None, match.end(2), match.end(2), lines.line(match.start(2)), tag, tag_start, None)
+        pos = match.end()
+    return pos
+
+
+def scan_start_tag(content, pos, tag, tag_start, lines):
+    """
+    Return ``(attr tokens, end)`` for the start tag whose name ends at ``pos``;
+    ``end`` is the offset after its ``>``.
+    """
+    tokens = []
+    scanner = _attributes(content, pos, tag, tag_start, lines)
+    while True:
+        try:
+            token = next(scanner)
+        except StopIteration as stop:
+            return tokens, stop.value
+        if token.kind == 'attr':
+            tokens.append(token)
+
+
+def _expression(content, start, stop, name, lines, tag, tag_start):
+    literal = SINGLE_LITERAL.match(content, start, stop)
+    if literal and '${' not in literal.group(2):
+        s, e = literal.span(2)
+        yield Token('attr', name, literal.group(2), s, e, lines.line(s), tag, tag_start, literal.group(1))
+        return
+    yield Token('attr', name, content[start:stop], start, stop, lines.line(start), tag, tag_start, '{')
+    for token in _script_tokens(content, start, stop, lines, 'string', tag, tag_start):
+        yield token._replace(name=name)
+
+
+def _script_tokens(content, start, stop, lines, kind, tag, tag_start):
+    for match in SCRIPT_ITEM.finditer(content, start, stop):
+        for group, quote in ((1, '"'), (2, "'"), (3, '`')):
+            if match.group(group) is not None:
+                s, e = match.span(group)
+                name = None
+                if kind == 'prop':
+                    assigned = ASSIGNED_NAME.search(content, max(start, s - 81), s - 1)
+                    name = assigned.group(1) if assigned else None
+                yield Token(kind, name, match.group(group), s, e, lines.line(s), tag, tag_start, quote)
+                break
+
+
+def _css_tokens(content, start, stop, lines, tag, tag_start):
+    for match in CSS_ITEM.finditer(content, start, stop):
+        if match.group(2) is not None:
+            s, e = match.span(2)
+            value = match.group(2).strip()
+            yield Token('url', 'url', value, s, e, lines.line(s), tag, tag_start, match.group(1))
+
+
+def _match_brace(content, pos):
+    """Return the offset just after the ``}`` closing the brace at ``pos``."""
+    depth = 0
+    for match in BRACE_ITEM.finditer(content, pos):
+        text = match.group()
+        if text == '{':
+            depth += 1
+        elif text == '}':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return len(content)
+
+
+def _find_close(content, pos, tag):
+    """Offset of the closing ``</tag`` of a raw-text element (or end of file)."""
+    match = re.compile(r'</' + tag + r'\s*>', re.IGNORECASE).search(content, pos)
+    return match.start() if match else len(content)
+
+
+def attribute_values(tokens, *names):
+    """Yield attr tokens whose (case-insensitive) name is one of ``names``."""
+    wanted = {name.lower() for name in names}
+    for token in tokens:
+        if token.kind == 'attr' and token.value is not None and token.name.lower() in wanted:
+            yield token
+
+
+def tag_attributes(tokens):
+    """Group attr tokens by the tag they belong to: ``{tag_start: {name: token}}``."""
+    tags = {}
+    for token in tokens:
+        if token.kind == 'attr':
+            tags.setdefault(token.tag_start, {})[token.name.lower()] = token
+    return tags
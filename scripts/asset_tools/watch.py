@@ -0,0 +1,180 @@
+"""
+Incremental broken-reference audit for watch mode.
+
+``AuditIndex`` keeps the public/ inventory, the references of every source
+file (from one tokenizer pass each) and the route table in memory.
+``refresh`` compares a cheap ``os.scandir`` snapshot (mtime and size) of
+src/ and public/ with the previous one and only re-tokenizes the files that
+changed. The route table is rebuilt only when pages or public files are
+added or removed, and the broken set is recomputed in memory, so a save
+is reflected in a few milliseconds.
+"""
+
+import os
+import time
+from collections import Counter, namedtuple
+from pathlib import Path
+from urllib.parse import unquote
+
+from .paths import BASE_DIR, PAGES_DIR, PUBLIC_DIR, SKIP_DIRS, SRC_DIR
+from .references import split_srcset
+from .routes import RouteTable
+from .tokenizer import attribute_values, tokenize
+
+WATCH_EXTENSIONS = ('.astro', '.ts', '.tsx', '.js', '.jsx', '.mjs', '.css', '.md', '.mdx', '.html')
+
+Reference = namedtuple('Reference', 'file kind path line')
+Change = namedtuple('Change', 'broken fixed files elapsed')
+
+
+def extract_references(content, path, rel_path):
+    """Asset (``/cdn-assets/``) and internal link references of one file."""
+    references = []
+    tokens = list(tokenize(content, path))
+    for token in tokens:
+        if not token.value or '/cdn-assets/' not in token.value or token.quote == '{':
+            continue
+        candidates = split_srcset(token.value) if token.name and token.name.lower() == 'srcset' else [token.value]
+        for candidate in candidates:
+            if candidate.startswith('/cdn-assets/') and '${' not in candidate:
+                references.append(Reference(rel_path, 'asset', unquote(candidate.split('?')[0].split('#')[0]),
+                                            token.line))
+    for token in attribute_values(tokens, 'href'):
+        link = token.value
+        if link.startswith('/') and not link.startswith(('//', '/cdn-assets')) and token.quote != '{':
+            references.append(Reference(rel_path, 'link', link, token.line))
+    return references
+
+
+def snapshot(root, extensions=None):
+    """``{path: (mtime_ns, size)}`` for the files under ``root``."""
+    files = {}
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                elif extensions is None or entry.name.endswith(extensions):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def _diff(old, new):
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    changed = {path for path in new.keys() & old.keys() if new[path] != old[path]}
+    return added, removed, changed
+
+
+class AuditIndex:
+    """In-memory inventory, reference index and route table for src/ and public/."""
+
+    def __init__(self, src_dir=SRC_DIR, public_dir=PUBLIC_DIR, pages_dir=PAGES_DIR):
+        self.src_dir = Path(src_dir)
+        self.public_dir = Path(public_dir)
+        self.pages_dir = str(Path(pages_dir)) + os.sep
+        self.references = {}
+        self.src_files = {}
+        self.public_files = {}
+        self.assets = set()
+        self.routes = None
+        self.broken = Counter()
+
+    def build(self):
+        """Index everything once; returns the number of broken references."""
+        self.src_files = snapshot(self.src_dir, WATCH_EXTENSIONS)
+        self.public_files = snapshot(self.public_dir)
+        self.assets = {self._public_url(path) for path in self.public_files}
+        self.routes = RouteTable.from_directory(self.pages_dir, self.public_dir)
+        for path in self.src_files:
+            self._extract(path)
+        self.broken = self._broken_keys(self.references)
+        return sum(self.broken.values())
+
+    def _public_url(self, path):
+        return "/" + Path(path).relative_to(self.public_dir).as_posix()
+
+    def _rel(self, path):
+        try:
+            return Path(path).relative_to(BASE_DIR).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def _extract(self, path):
+        try:
+            content = Path(path).read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            self.references.pop(self._rel(path), None)
+            return
+        self.references[self._rel(path)] = extract_references(content, path, self._rel(path))
+
+    def is_broken(self, reference):
+        if reference.kind == 'asset':
+            return reference.path not in self.assets
+        return not self.routes.exists(reference.path)
+
+    def _broken_keys(self, references):
+        return Counter((ref.file, ref.kind, ref.path)
+                       for refs in references.values() for ref in refs if self.is_broken(ref))
+
+    def broken_references(self, keys=None):
+        """Current broken references (optionally only those with the given keys)."""
+        found = []
+        for refs in self.references.values():
+            for ref in refs:
+                if (keys is None or (ref.file, ref.kind, ref.path) in keys) and self.is_broken(ref):
+                    found.append(ref)
+        return sorted(found)
+
+    def refresh(self):
+        """
+        Pick up changes since the last call.
+
+        Returns a Change with the newly ``broken`` and ``fixed`` reference
+        keys ``(file, kind, path)``, the changed ``files`` and the
+        ``elapsed`` seconds.
+        """
+        started = time.perf_counter()
+        src_files = snapshot(self.src_dir, WATCH_EXTENSIONS)
+        public_files = snapshot(self.public_dir)
+        src_added, src_removed, src_changed = _diff(self.src_files, src_files)
+        public_added, public_removed, public_changed = _diff(self.public_files, public_files)
+        self.src_files, self.public_files = src_files, public_files
+        changed_files = sorted(self._rel(path) for path in
+                               src_added | src_removed | src_changed | public_added | public_removed | public_changed)
+        if not changed_files:
+            return Change([], [], [], time.perf_counter() - started)
+
+        for path in src_removed:
+            self.references.pop(self._rel(path), None)
+        for path in src_added | src_changed:
+            self._extract(path)
+
+        pages_moved = any(path.startswith(self.pages_dir) for path in src_added | src_removed)
+        if public_added or public_removed:
+            self.assets -= {self._public_url(path) for path in public_removed}
+            self.assets |= {self._public_url(path) for path in public_added}
+        if pages_moved or public_added or public_removed:
+            self.routes = RouteTable.from_directory(self.pages_dir, self.public_dir)
+            broken = self._broken_keys(self.references)
+        else:
+            # Only the edited files can have changed state
+            touched = {self._rel(path) for path in src_added | src_removed | src_changed}
+            broken = Counter({key: count for key, count in self.broken.items() if key[0] not in touched})
+            broken.update(self._broken_keys({file: self.references[file]
+                                             for file in touched if file in self.references}))
+
+        new = sorted(key for key in broken if key not in self.broken)
+        fixed = sorted(key for key in self.broken if key not in broken)
+        self.broken = broken
+        return Change(new, fixed, changed_files, time.perf_counter() - started)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Build or refresh the SQLite asset catalog (scripts/asset-catalog.db).
+
+This script:
+1. Imports the legacy JSON state files (mappings and conversion logs)
+2. Indexes every file under public/cdn-assets with its size and SHA-256
+3. Indexes /cdn-assets/ references found in src/
+
+Re-running is incremental: hashes are only recomputed for files whose
+size or mtime changed, and references are replaced per source file.
+
+Usage:
+    python3 scripts/build-asset-catalog.py [--db PATH] [--skip-json] [--skip-files] [--skip-references]
+    python3 scripts/build-asset-catalog.py --profile   # also write cProfile/collapsed stacks
+"""
+
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from urllib.parse import unquote
+
+from asset_tools.paths import SRC_DIR, CDN_ASSETS_DIR
+from asset_tools.catalog import DEFAULT_DB, AssetCatalog, import_legacy_json, repo_relative
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+REFERENCE_PATTERN = re.compile(r'/cdn-assets/[^"\'\s\),]+')
+SOURCE_EXTENSIONS = ('.astro', '.ts', '.tsx', '.js', '.jsx', '.css', '.html')
+
+
+def index_files(catalog):
+    """Record every CDN asset and its hash."""
+    paths = []
+    for root, dirs, files in os.walk(CDN_ASSETS_DIR):
+        for file in files:
+            paths.append(Path(root) / file)
+
+    catalog.upsert_files(paths)
+    known = {repo_relative(p) for p in paths}
+    stale = [row[0] for row in catalog.conn.execute(
+        "SELECT path FROM files WHERE path LIKE 'public/cdn-assets/%'") if row[0] not in known]
+    catalog.remove_files(stale)
+
+    for path in paths:
+        catalog.file_hash(path)
+    return len(paths), len(stale)
+
+
+def index_references(catalog):
+    """Record /cdn-assets/ references per source file."""
+    total = 0
+    for root, dirs, files in os.walk(SRC_DIR):
+        dirs[:] = [d for d in dirs if d != 'node_modules']
+        for file in files:
+            if not file.endswith(SOURCE_EXTENSIONS):
+                continue
+            file_path = Path(root) / file
+            try:
+                content = file_path.read_text(encoding='utf-8')
+            except Exception:
+                continue
+            refs = []
+            for match in REFERENCE_PATTERN.finditer(content):
+                line = content.count('\n', 0, match.start()) + 1
+                refs.append((unquote(match.group(0)), line, None))
+            catalog.replace_references(file_path, refs)
+            total += len(refs)
+    return total
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Build the SQLite asset catalog")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Catalog database path")
+    parser.add_argument("--skip-json", action="store_true", help="Do not import legacy JSON files")
+    parser.add_argument("--skip-files", action="store_true", help="Do not index public/cdn-assets")
+    parser.add_argument("--skip-references", action="store_true", help="Do not index src/ references")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("build-asset-catalog", args.profile):
+        return build_catalog(args)
+
+
+def build_catalog(args):
+    """Import, index and save the catalog."""
+    print("=" * 70)
+    print("Build Asset Catalog")
+    print("=" * 70)
+    print(f"Database: {args.db}")
+    print()
+
+    with AssetCatalog(args.db) as catalog:
+        if not args.skip_json:
+            print("Importing legacy JSON state...")
+            with span("import-json"):
+                for name, count in import_legacy_json(catalog).items():
+                    print(f"  {name}: {count} rows")
+            print()
+
+        if not args.skip_files:
+            print("Indexing public/cdn-assets...")
+            with span("index-files"):
+                indexed, removed = index_files(catalog)
+            catalog.commit()
+            print(f"  Indexed {indexed} files, removed {removed} stale entries")
+            print()
+
+        if not args.skip_references:
+            print("Indexing references in src/...")
+            with span("index-references"):
+                total = index_references(catalog)
+            catalog.commit()
+            print(f"  Indexed {total} references")
+            print()
+
+    print(f"✓ Catalog saved to: {repo_relative(args.db) if args.db.is_absolute() else args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
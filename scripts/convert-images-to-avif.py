@@ -1,36 +1,64 @@
 #!/usr/bin/env python3
 """
 Convert all raster images to AVIF format.
+
+Every image is appended to scripts/.cache/avif-conversion-log.jsonl as soon
+as it is done; scripts/avif-conversion-log.json is rebuilt from it at the
+end (or with summarize-conversion-log.py after an interrupted run).
+
+Sources are decoded within a memory bound (see asset_tools.imaging):
+decodes above --pixel-budget are refused, anything larger than
+--max-dimension (if given) is downscaled before the RGBA conversion, and
+the peak RSS of every image is logged. Pillow encodes at speed 6; with --time-budget the
+speed is picked per image by asset_tools.effort to fit the budget. An
+AVIF that is not smaller than its source is deleted again and the
+original kept (logged under kept_original with the byte delta).
+
+Usage:
+    python3 scripts/convert-images-to-avif.py
+    python3 scripts/convert-images-to-avif.py --resume    # skip images the last run finished
+    python3 scripts/convert-images-to-avif.py --max-dimension 2560 --pixel-budget 40
+    python3 scripts/convert-images-to-avif.py --time-budget 900 --size-tolerance 1
+    python3 scripts/convert-images-to-avif.py --profile   # also write cProfile/collapsed stacks
 """
 
 import os
 import sys
-import json
+import argparse
 import subprocess
-from pathlib import Path
 from collections import defaultdict
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    print("WARNING: Pillow (PIL) is not installed. Will use ffmpeg instead.")
+from asset_tools.catalog import open_catalog
+from asset_tools.effort import DEFAULT_TOLERANCE, add_effort_arguments, effort_label, schedule
+from asset_tools.imaging import (
+    DEFAULT_MAX_DIMENSION,
+    DEFAULT_PIXEL_BUDGET,
+    add_decode_arguments,
+    pillow_available,
+    prepare_image,
+)
+from asset_tools.inventory import get_inventory
+from asset_tools.paths import BASE_DIR, CACHE_DIR, CDN_ASSETS_DIR, SCRIPTS_DIR
+from asset_tools.runlog import RunLog, write_summary
+from asset_tools.profiling import PROFILER, add_profile_argument, count, peak_rss, profiled, reset_peak_rss, span
 
-BASE_DIR = Path(__file__).parent.parent
-PUBLIC_DIR = BASE_DIR / "public"
-CDN_ASSETS_DIR = PUBLIC_DIR / "cdn-assets"
+# Checked without importing Pillow; it is imported when an image is encoded
+PIL_AVAILABLE = pillow_available()
 
 # Image extensions to convert
 RASTER_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp'}
 SVG_EXTENSIONS = {'.svg'}
 
-# Conversion log
-conversion_log = {
+LOG_FILE = SCRIPTS_DIR / "avif-conversion-log.json"
+JSONL_LOG_FILE = CACHE_DIR / "avif-conversion-log.jsonl"
+
+# Shape of the aggregate conversion log
+LOG_TEMPLATE = {
     'converted': [],
     'skipped': [],
     'errors': [],
     'already_exists': [],
+    'kept_original': [],
     'stats': {
         'total_size_before': 0,
         'total_size_after': 0,
@@ -45,29 +73,23 @@ def get_file_size(file_path):
     except:
         return 0
 
-def convert_with_pillow(input_path, output_path, quality=85):
-    """Convert image to AVIF using Pillow."""
+def convert_with_pillow(input_path, output_path, quality=85,
+                        max_dimension=DEFAULT_MAX_DIMENSION, pixel_budget=DEFAULT_PIXEL_BUDGET, speed=6):
+    """Convert image to AVIF using Pillow; returns (success, error, decode info)."""
+    from PIL import Image
     try:
         with Image.open(input_path) as img:
-            # Handle different modes
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Preserve transparency
-                if img.mode == 'P' and 'transparency' in img.info:
-                    img = img.convert('RGBA')
-                elif img.mode == 'LA':
-                    img = img.convert('RGBA')
-                elif img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-            elif img.mode not in ('RGB', 'RGBA'):
-                img = img.convert('RGB')
+            with span("decode"):
+                img, decode = prepare_image(img, max_dimension, pixel_budget)
             
             # Save as AVIF
-            img.save(output_path, 'AVIF', quality=quality, method=6)
-            return True, None
+            with span("encode"):
+                img.save(output_path, 'AVIF', quality=quality, speed=speed)
+            return True, None, decode
     except Exception as e:
-        return False, str(e)
+        return False, str(e), None
 
-def convert_with_ffmpeg(input_path, output_path, quality=85):
+def convert_with_ffmpeg(input_path, output_path, quality=85, max_dimension=DEFAULT_MAX_DIMENSION):
     """Convert image to AVIF using ffmpeg."""
     try:
         # ffmpeg -i input.png -c:v libaom-av1 -crf 30 -b:v 0 output.avif
@@ -80,16 +102,23 @@ def convert_with_ffmpeg(input_path, output_path, quality=85):
             '-c:v', 'libaom-av1',
             '-crf', str(crf),
             '-b:v', '0',
+        ]
+        if max_dimension:
+            # Fit within max_dimension; smaller images are left as they are
+            cmd += ['-vf', f"scale='min(iw,{max_dimension})':'min(ih,{max_dimension})':"
+                           "force_original_aspect_ratio=decrease"]
+        cmd += [
             '-y',  # Overwrite output file
             str(output_path)
         ]
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        with span("ffmpeg"):
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
         
         if result.returncode == 0 and output_path.exists():
             return True, None
@@ -98,40 +127,56 @@ def convert_with_ffmpeg(input_path, output_path, quality=85):
     except Exception as e:
         return False, str(e)
 
-def convert_image(input_path, output_path, quality=85):
-    """Convert an image to AVIF format."""
+def convert_image(input_path, output_path, quality=85,
+                  max_dimension=DEFAULT_MAX_DIMENSION, pixel_budget=DEFAULT_PIXEL_BUDGET, speed=6):
+    """Convert an image to AVIF format; returns (success, error, decode info)."""
     # Check if output already exists
     if output_path.exists():
-        return True, "already_exists"
+        return True, "already_exists", None
     
     # Try Pillow first
     if PIL_AVAILABLE:
-        success, error = convert_with_pillow(input_path, output_path, quality)
+        success, error, decode = convert_with_pillow(input_path, output_path, quality, max_dimension, pixel_budget,
+                                                     speed)
         if success:
-            return True, None
+            return True, None, decode
+        # Over the pixel budget: ffmpeg would decode it at full size too
+        if error and 'pixel budget' in error:
+            return False, error, None
         # If Pillow fails, try ffmpeg
         if error and 'AVIF' in error:
             print(f"  Pillow AVIF not available, trying ffmpeg...")
     
     # Try ffmpeg
-    success, error = convert_with_ffmpeg(input_path, output_path, quality)
+    success, error = convert_with_ffmpeg(input_path, output_path, quality, max_dimension)
     if success:
-        return True, None
+        return True, None, None
     
-    return False, error or "Unknown error"
+    return False, error or "Unknown error", None
 
 def main():
     """Main conversion function."""
+    parser = argparse.ArgumentParser(description="Convert raster images in public/cdn-assets to AVIF")
+    parser.add_argument("--resume", action="store_true",
+                        help="Append to the existing log and skip images it records as done")
+    add_decode_arguments(parser)
+    add_effort_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
+    with profiled("convert-images-to-avif", args.profile):
+        convert_all(args.resume, args.max_dimension, args.pixel_budget, args.time_budget, args.size_tolerance / 100)
+
+def convert_all(resume=False, max_dimension=DEFAULT_MAX_DIMENSION, pixel_budget=DEFAULT_PIXEL_BUDGET,
+                time_budget=None, size_tolerance=DEFAULT_TOLERANCE):
+    """Convert every raster image and write the conversion log."""
     print("Converting images to AVIF format...\n")
+    if not PIL_AVAILABLE:
+        print("WARNING: Pillow (PIL) is not installed. Will use ffmpeg instead.\n")
     
     # Find all images
-    images_to_convert = []
-    for ext in RASTER_EXTENSIONS:
-        for img_path in CDN_ASSETS_DIR.rglob(f"*{ext}"):
-            # Skip if already AVIF
-            if img_path.suffix.lower() == '.avif':
-                continue
-            images_to_convert.append(img_path)
+    with span("walk"):
+        images_to_convert = get_inventory().files(CDN_ASSETS_DIR, RASTER_EXTENSIONS)
     
     print(f"Found {len(images_to_convert)} images to convert\n")
     
@@ -139,54 +184,146 @@ def main():
         print("No images to convert!")
         return
     
+    catalog = open_catalog()
+    log = RunLog(JSONL_LOG_FILE, LOG_TEMPLATE, resume=resume)
+    resumed = 0
+    
+    scheduler = None
+    if time_budget and not PIL_AVAILABLE:
+        print("WARNING: --time-budget needs Pillow; the ffmpeg fallback ignores it\n")
+    elif time_budget:
+        with span("plan"):
+            pending = {str(img_path.relative_to(CDN_ASSETS_DIR)): img_path for img_path in images_to_convert
+                       if not img_path.with_suffix('.avif').exists()}
+            pending = {key: path for key, path in pending.items() if not log.is_done(key)}
+            scheduler = schedule('avif', time_budget, pending, max_dimension, size_tolerance)
+        plan = ", ".join(f"{images_at} at {label}" for label, images_at in sorted(scheduler.level_counts().items()))
+        print(f"Effort plan: {plan or 'nothing to encode'} "
+              f"(predicted {scheduler.predicted:.0f}s of {time_budget:.0f}s)\n")
+    
     # Convert each image
-    for i, img_path in enumerate(images_to_convert, 1):
-        rel_path = img_path.relative_to(CDN_ASSETS_DIR)
-        print(f"[{i}/{len(images_to_convert)}] {rel_path}")
-        
-        # Create output path
-        output_path = img_path.with_suffix('.avif')
-        
-        # Get original size
-        original_size = get_file_size(img_path)
-        conversion_log['stats']['total_size_before'] += original_size
-        
-        # Convert
-        success, error_msg = convert_image(img_path, output_path, quality=85)
-        
-        if success:
-            if error_msg == "already_exists":
-                conversion_log['already_exists'].append(str(rel_path))
-                print(f"  ✓ Already exists")
+    try:
+        for i, img_path in enumerate(images_to_convert, 1):
+            rel_path = img_path.relative_to(CDN_ASSETS_DIR)
+            if log.is_done(str(rel_path)):
+                resumed += 1
+                continue
+            print(f"[{i}/{len(images_to_convert)}] {rel_path}")
+            
+            # Create output path
+            output_path = img_path.with_suffix('.avif')
+            
+            # Get original size
+            original_size = get_file_size(img_path)
+            
+            # Convert
+            reset_peak_rss()
+            with span("convert"):
+                if scheduler and not output_path.exists():
+                    success, error_msg, decode, effort = scheduler.encode(
+                        str(rel_path),
+                        lambda params, path: convert_image(img_path, path, quality=85, max_dimension=max_dimension,
+                                                           pixel_budget=pixel_budget, **params),
+                        output_path)
+                else:
+                    effort = {'speed': 6}
+                    success, error_msg, decode = convert_image(img_path, output_path, quality=85,
+                                                               max_dimension=max_dimension, pixel_budget=pixel_budget,
+                                                               **effort)
+            rss = peak_rss()
+            count("files")
+            
+            if success:
+                if error_msg == "already_exists":
+                    log.record('already_exists', str(rel_path), str(rel_path), size_before=original_size)
+                    catalog.record_conversion(img_path, 'avif', 'already_exists', output_path)
+                    print(f"  ✓ Already exists")
+                elif get_file_size(output_path) >= original_size:
+                    # Never make a file larger: drop the AVIF, keep the original
+                    new_size = get_file_size(output_path)
+                    output_path.unlink()
+                    count("bytes_in", original_size)
+                    count("bytes_out", original_size)
+                    print(f"  = Kept original (AVIF {new_size - original_size:+d} bytes)")
+                    log.record('kept_original', str(rel_path), {
+                        'input': str(rel_path),
+                        'decision': {
+                            'chosen': None,
+                            'size_before': original_size,
+                            'size_after': original_size,
+                            'delta': 0,
+                            'candidates': [{'candidate': 'avif', 'format': 'avif', 'bytes': new_size,
+                                            'delta': new_size - original_size}],
+                            'reason': 'AVIF is not smaller than the source'
+                        },
+                        'peak_rss': rss
+                    }, size_before=original_size, size_after=original_size)
+                    catalog.record_conversion(img_path, 'avif', 'kept_original', None, original_size, original_size,
+                                              'AVIF is not smaller than the source')
+                else:
+                    new_size = get_file_size(output_path)
+                    count("bytes_in", original_size)
+                    count("bytes_out", new_size)
+                    
+                    size_reduction = ((original_size - new_size) / original_size * 100) if original_size > 0 else 0
+                    print(f"  ✓ Converted ({original_size/1024:.1f}KB → {new_size/1024:.1f}KB, -{size_reduction:.1f}%)")
+                    if decode and decode['output'] != decode['source']:
+                        print(f"    Downscaled {decode['source'][0]}x{decode['source'][1]} → "
+                              f"{decode['output'][0]}x{decode['output'][1]}")
+                    log.record('converted', str(rel_path), {
+                        'input': str(rel_path),
+                        'output': str(output_path.relative_to(CDN_ASSETS_DIR)),
+                        'size_before': original_size,
+                        'size_after': new_size,
+                        'reduction': size_reduction,
+                        'effort': effort_label(effort),
+                        'decode': decode,
+                        'peak_rss': rss
+                    }, size_before=original_size, size_after=new_size)
+                    catalog.record_conversion(img_path, 'avif', 'converted', output_path, original_size, new_size)
             else:
-                new_size = get_file_size(output_path)
-                conversion_log['stats']['total_size_after'] += new_size
-                conversion_log['stats']['files_converted'] += 1
-                
-                size_reduction = ((original_size - new_size) / original_size * 100) if original_size > 0 else 0
-                print(f"  ✓ Converted ({original_size/1024:.1f}KB → {new_size/1024:.1f}KB, -{size_reduction:.1f}%)")
-                conversion_log['converted'].append({
-                    'input': str(rel_path),
-                    'output': str(output_path.relative_to(CDN_ASSETS_DIR)),
-                    'size_before': original_size,
-                    'size_after': new_size,
-                    'reduction': size_reduction
-                })
-        else:
-            print(f"  ✗ Error: {error_msg}")
-            conversion_log['errors'].append({
-                'file': str(rel_path),
-                'error': error_msg
-            })
+                print(f"  ✗ Error: {error_msg}")
+                log.record('errors', str(rel_path), {
+                    'file': str(rel_path),
+                    'error': error_msg,
+                    'peak_rss': rss
+                }, size_before=original_size)
+                catalog.record_conversion(img_path, 'avif', 'error', message=error_msg)
+            
+            if i % 25 == 0:
+                with span("catalog"):
+                    catalog.commit()
+    except KeyboardInterrupt:
+        log.close(interrupted=True, timing=PROFILER.summary())
+        catalog.commit()
+        catalog.close()
+        if scheduler:
+            scheduler.model.save()
+        print(f"\nInterrupted; rerun with --resume to continue ({JSONL_LOG_FILE.relative_to(BASE_DIR)})")
+        raise
+    
+    with span("catalog"):
+        catalog.commit()
+    catalog.close()
+    log.close(timing=PROFILER.summary())
+    if scheduler:
+        scheduler.model.save()
+    conversion_log = write_summary(JSONL_LOG_FILE, LOG_FILE)
     
     # Print summary
     print("\n" + "="*60)
     print("CONVERSION SUMMARY")
     print("="*60)
     print(f"Total images: {len(images_to_convert)}")
+    if resumed:
+        print(f"Done in a previous run: {resumed}")
     print(f"Converted: {len(conversion_log['converted'])}")
     print(f"Already existed: {len(conversion_log['already_exists'])}")
+    if conversion_log.get('kept_original'):
+        print(f"Kept original (AVIF not smaller): {len(conversion_log['kept_original'])}")
     print(f"Errors: {len(conversion_log['errors'])}")
+    if scheduler:
+        print(f"Time: {scheduler.elapsed():.0f}s of the {time_budget:.0f}s budget")
     
     if conversion_log['stats']['files_converted'] > 0:
         total_reduction = ((conversion_log['stats']['total_size_before'] - conversion_log['stats']['total_size_after']) / 
@@ -195,11 +332,9 @@ def main():
         print(f"Total size before: {conversion_log['stats']['total_size_before'] / 1024 / 1024:.1f} MB")
         print(f"Total size after: {conversion_log['stats']['total_size_after'] / 1024 / 1024:.1f} MB")
     
-    # Save log
-    log_file = BASE_DIR / "scripts" / "avif-conversion-log.json"
-    with open(log_file, 'w', encoding='utf-8') as f:
-        json.dump(conversion_log, f, indent=2, ensure_ascii=False)
-    print(f"\nConversion log saved to: {log_file}")
+    print()
+    PROFILER.print_summary()
+    print(f"\nConversion log saved to: {LOG_FILE}")
 
 if __name__ == "__main__":
     main()
@@ -1,139 +1,202 @@
 #!/usr/bin/env python3
 """
-Convert all raster images to WebP format while maintaining 100% quality and aspect ratio.
+Convert all raster images to WebP (or AVIF, when smaller) while keeping aspect ratio.
 
 This script:
 - Scans public/cdn-assets/images/ recursively
-- Converts PNG, JPEG, GIF, BMP, TIFF to WebP
-- Preserves quality (lossless), aspect ratio, and metadata
+- Converts PNG, JPEG, GIF, BMP, TIFF to lossless WebP; with --policy
+  smallest every image is encoded as lossless WebP, lossy WebP and AVIF,
+  and the smallest that meets the --min-psnr floor is written, only if it
+  is smaller than the original (see asset_tools.policy)
+- Preserves aspect ratio and metadata
 - Handles responsive variants (-p-500, -p-800, -p-1080)
-- Generates conversion log
+- Encodes at method 6 (AVIF candidate: speed 6), or with --time-budget at
+  a per-image effort picked by asset_tools.effort (largest images first,
+  total size within --size-tolerance of the slowest effort); under
+  --policy smallest the budget steps the AVIF speed along with the method
+- Decodes within a memory bound: decodes above --pixel-budget are
+  refused, sources larger than --max-dimension (if given) are downscaled
+  before the RGBA conversion, and the peak RSS of every image is logged
+- Appends every image to scripts/.cache/webp-conversion-log.jsonl as it is
+  done and rebuilds scripts/webp-conversion-log.json (with a timing
+  summary) from it at the end
+
+Usage:
+    python3 scripts/convert-images-to-webp.py
+    python3 scripts/convert-images-to-webp.py --resume    # skip images the last run finished
+    python3 scripts/convert-images-to-webp.py --max-dimension 4096   # downscale larger sources
+    python3 scripts/convert-images-to-webp.py --time-budget 600   # faster effort for large images to fit 10 min
+    python3 scripts/convert-images-to-webp.py --policy smallest   # keep the smallest of WebP/AVIF
+    python3 scripts/convert-images-to-webp.py --policy smallest --lossy-quality 80 --min-psnr 38
+    python3 scripts/convert-images-to-webp.py --profile   # also write cProfile/collapsed stacks
 """
 
-import os
 import sys
-import json
-from pathlib import Path
+import argparse
 from collections import defaultdict
 
-try:
-    from PIL import Image
-except ImportError:
-    print("ERROR: Pillow (PIL) is not installed.")
-    print("Please install it using: pip install Pillow")
-    print("Or: python3 -m pip install --user Pillow")
-    sys.exit(1)
+from asset_tools.catalog import open_catalog
+from asset_tools.effort import DEFAULT_TOLERANCE, add_effort_arguments, effort_label, schedule
+from asset_tools.imaging import (
+    DEFAULT_MAX_DIMENSION,
+    DEFAULT_PIXEL_BUDGET,
+    add_decode_arguments,
+    pillow_available,
+    prepare_image,
+)
+from asset_tools.inventory import get_inventory
+from asset_tools.paths import BASE_DIR, CACHE_DIR, CDN_ASSETS_DIR, SCRIPTS_DIR
+from asset_tools.policy import (
+    DEFAULT_EFFORT,
+    DEFAULT_LOSSY_QUALITY,
+    DEFAULT_MIN_PSNR,
+    add_policy_arguments,
+    candidate_outputs,
+    candidates_for,
+    choose_output,
+)
+from asset_tools.runlog import RunLog, write_summary
+from asset_tools.profiling import PROFILER, add_profile_argument, count, peak_rss, profiled, reset_peak_rss, span
 
-# Base directory
-BASE_DIR = Path(__file__).parent.parent
-PUBLIC_DIR = BASE_DIR / "public"
-CDN_ASSETS_DIR = PUBLIC_DIR / "cdn-assets"
 IMAGES_DIR = CDN_ASSETS_DIR / "images"
 
 # Image extensions to convert
 RASTER_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif', '.avif'}
 SVG_EXTENSIONS = {'.svg'}
 
-# Conversion log
-conversion_log = {
+LOG_FILE = SCRIPTS_DIR / "webp-conversion-log.json"
+JSONL_LOG_FILE = CACHE_DIR / "webp-conversion-log.jsonl"
+
+# Shape of the aggregate conversion log
+LOG_TEMPLATE = {
     'converted': [],
     'skipped': [],
     'errors': [],
-    'warnings': []
+    'warnings': [],
+    'kept_original': []
 }
 
 def is_animated_gif(image_path):
     """Check if a GIF file is animated."""
+    from PIL import Image
     try:
         with Image.open(image_path) as img:
             return hasattr(img, 'is_animated') and img.is_animated
     except Exception:
         return False
 
-def convert_image_to_webp(input_path, output_path, quality=100, method=6):
+def convert_image_to_webp(input_path, output_path, quality=100, method=6, speed=6,
+                          max_dimension=DEFAULT_MAX_DIMENSION, pixel_budget=DEFAULT_PIXEL_BUDGET,
+                          policy='lossless', lossy_quality=DEFAULT_LOSSY_QUALITY, min_psnr=DEFAULT_MIN_PSNR):
     """
     Convert an image to WebP format.
     
     Args:
         input_path: Path to input image
-        output_path: Path to output WebP file
+        output_path: Path to output WebP file (the suffix becomes .avif when AVIF is kept;
+            the input file itself is never written)
         quality: WebP quality (100 = lossless)
         method: WebP compression method (0-6, 6 = best)
+        speed: AVIF encoder speed of the 'smallest' AVIF candidate (0-10, lower = smaller)
+        max_dimension: Longest output side; larger images are downscaled (0 = never)
+        pixel_budget: Largest decode in megapixels; larger images are refused
+        policy: 'lossless' always writes lossless WebP; 'smallest' writes the
+            smallest candidate that meets min_psnr, if smaller than the input
+        lossy_quality: Quality of the lossy candidates
+        min_psnr: Quality floor of the lossy candidates in dB
     
     Returns:
-        tuple: (success: bool, message: str)
+        tuple: (success: bool, message: str, info: dict with 'decode', 'decision' and 'output')
     """
+    # Imported here so --help and argument errors work without Pillow
+    from PIL import Image
     try:
         # Open image
         with Image.open(input_path) as img:
-            # Check if animated GIF
-            if input_path.suffix.lower() == '.gif' and is_animated_gif(input_path):
-                # Convert first frame only
+            # Check if animated GIF (only the first frame is converted)
+            animated = input_path.suffix.lower() == '.gif' and is_animated_gif(input_path)
+            if animated:
                 img.seek(0)
-                img.save(output_path, 'WEBP', quality=quality, method=method, lossless=True)
-                return True, "Converted first frame of animated GIF"
-            
-            # Preserve mode (RGB, RGBA, etc.)
-            # Convert to RGB if necessary (WebP supports RGB/RGBA)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Preserve transparency
-                if img.mode == 'P' and 'transparency' in img.info:
-                    img = img.convert('RGBA')
-                elif img.mode == 'LA':
-                    img = img.convert('RGBA')
-                elif img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-            elif img.mode not in ('RGB', 'RGBA'):
-                img = img.convert('RGB')
             
-            # Save as WebP with lossless quality
-            save_kwargs = {
-                'format': 'WEBP',
-                'quality': quality,
-                'method': method,
-                'lossless': True  # Use lossless compression
-            }
+            with span("decode"):
+                # Preserve mode (RGB, RGBA, etc.)
+                # Convert to RGB if necessary (WebP supports RGB/RGBA)
+                img, decode = prepare_image(img, max_dimension, pixel_budget)
+            info = {'decode': decode, 'decision': None, 'output': output_path}
             
             # Preserve metadata if possible
-            if hasattr(img, 'info'):
-                # Try to preserve EXIF data
-                exif = img.info.get('exif')
-                if exif:
-                    save_kwargs['exif'] = exif
+            metadata = {}
+            exif = img.info.get('exif')
+            if exif:
+                metadata['exif'] = exif
             
-            img.save(output_path, **save_kwargs)
+            if policy == 'smallest':
+                decision, data = choose_output(img, input_path.stat().st_size, candidates_for(input_path),
+                                               lossy_quality=lossy_quality, min_psnr=min_psnr,
+                                               effort={'method': method, 'speed': speed}, **metadata)
+                info['decision'] = decision
+                if data is None:
+                    info['output'] = None
+                    return True, f"Kept original: {decision['reason']}", info
+                info['output'] = output_path.with_suffix('.' + decision['format'])
+                if info['output'].resolve() == input_path.resolve():
+                    raise ValueError(f"refusing to overwrite the source with {decision['chosen']}")
+                with span("write"):
+                    info['output'].write_bytes(data)
+                message = f"Kept {decision['chosen']} ({decision['delta']:+d} bytes)"
+            else:
+                # Save as WebP with lossless quality
+                with span("encode"):
+                    img.save(output_path, 'WEBP', quality=quality, lossless=True, method=method, **metadata)
+                message = "Converted successfully"
             
-            return True, "Converted successfully"
+            if animated:
+                return True, f"{message} (first frame of animated GIF)", info
+            return True, message, info
             
     except Exception as e:
-        return False, f"Error: {str(e)}"
+        return False, f"Error: {str(e)}", None
+
+def planned_outputs(img_path, policy):
+    """Files the conversion of an image may write (never the image itself)."""
+    if policy == 'smallest':
+        return candidate_outputs(img_path)
+    return [img_path.with_suffix('.webp')]
 
 def find_images_to_convert(base_dir):
     """Find all raster images to convert."""
-    images = []
-    
     if not base_dir.exists():
         print(f"ERROR: Images directory not found: {base_dir}")
-        return images
+        return []
     
-    # Walk through all subdirectories
-    for root, dirs, files in os.walk(base_dir):
-        for file in files:
-            file_path = Path(root) / file
-            ext = file_path.suffix.lower()
-            
-            # Skip SVGs (vector graphics)
-            if ext in SVG_EXTENSIONS:
-                continue
-            
-            # Check if it's a raster image
-            if ext in RASTER_EXTENSIONS:
-                images.append(file_path)
-    
-    return images
+    # SVGs (vector graphics) are not in RASTER_EXTENSIONS
+    return get_inventory().files(base_dir, RASTER_EXTENSIONS)
 
 def main():
     """Main conversion function."""
+    parser = argparse.ArgumentParser(description="Convert raster images in public/cdn-assets/images to WebP")
+    parser.add_argument("--resume", action="store_true",
+                        help="Append to the existing log and skip images it records as done")
+    add_decode_arguments(parser)
+    add_effort_arguments(parser)
+    add_policy_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
+    if not pillow_available():
+        print("ERROR: Pillow (PIL) is not installed.")
+        print("Please install it using: pip install Pillow")
+        print("Or: python3 -m pip install --user Pillow")
+        sys.exit(1)
+    
+    with profiled("convert-images-to-webp", args.profile):
+        convert_all(args.resume, args.max_dimension, args.pixel_budget, args.time_budget, args.size_tolerance / 100,
+                    policy=args.policy, lossy_quality=args.lossy_quality, min_psnr=args.min_psnr)
+
+def convert_all(resume=False, max_dimension=DEFAULT_MAX_DIMENSION, pixel_budget=DEFAULT_PIXEL_BUDGET,
+                time_budget=None, size_tolerance=DEFAULT_TOLERANCE,
+                policy='lossless', lossy_quality=DEFAULT_LOSSY_QUALITY, min_psnr=DEFAULT_MIN_PSNR):
+    """Convert every raster image and write the conversion log."""
     print("=" * 70)
     print("Image to WebP Conversion Script")
     print("=" * 70)
@@ -147,7 +210,8 @@ def main():
     
     # Find all images
     print("Scanning for images...")
-    images = find_images_to_convert(IMAGES_DIR)
+    with span("walk"):
+        images = find_images_to_convert(IMAGES_DIR)
     print(f"Found {len(images)} images to convert")
     print()
     
@@ -155,70 +219,162 @@ def main():
         print("No images found to convert.")
         return
     
+    catalog = open_catalog()
+    log = RunLog(JSONL_LOG_FILE, LOG_TEMPLATE, resume=resume)
+    
+    scheduler = None
+    if time_budget:
+        with span("plan"):
+            pending = {str(img_path.relative_to(BASE_DIR)): img_path for img_path in images
+                       if img_path.suffix.lower() != '.webp'
+                       and not any(path.exists() for path in planned_outputs(img_path, policy))}
+            pending = {key: path for key, path in pending.items() if not log.is_done(key)}
+            # Under keep-smallest the written file varies, so the size ratios cannot be calibrated
+            scheduler = schedule('smallest' if policy == 'smallest' else 'webp-lossless', time_budget, pending,
+                                 max_dimension, size_tolerance, calibrate=policy == 'lossless')
+        plan = ", ".join(f"{images_at} at {label}" for label, images_at in sorted(scheduler.level_counts().items()))
+        print(f"Effort plan: {plan or 'nothing to encode'} "
+              f"(predicted {scheduler.predicted:.0f}s of {time_budget:.0f}s)")
+        print()
+    
     # Convert each image
     converted_count = 0
+    kept_count = 0
     skipped_count = 0
     error_count = 0
+    resumed_count = 0
     
-    for img_path in sorted(images):
-        # Create output path (same location, .webp extension)
-        output_path = img_path.with_suffix('.webp')
-        
-        # Skip if already WebP
-        if img_path.suffix.lower() == '.webp':
-            conversion_log['skipped'].append({
-                'path': str(img_path.relative_to(BASE_DIR)),
-                'reason': 'Already WebP'
-            })
-            skipped_count += 1
-            continue
-        
-        # Skip if output already exists (avoid re-conversion)
-        if output_path.exists():
-            print(f"SKIP: {img_path.name} -> {output_path.name} (already exists)")
-            conversion_log['skipped'].append({
-                'path': str(img_path.relative_to(BASE_DIR)),
-                'reason': 'Output already exists'
-            })
-            skipped_count += 1
-            continue
-        
-        # Convert
-        print(f"Converting: {img_path.name} -> {output_path.name}...", end=' ')
-        success, message = convert_image_to_webp(img_path, output_path)
-        
-        if success:
-            print("✓")
-            converted_count += 1
-            conversion_log['converted'].append({
-                'original': str(img_path.relative_to(BASE_DIR)),
-                'webp': str(output_path.relative_to(BASE_DIR)),
-                'message': message
-            })
-        else:
-            print(f"✗ {message}")
-            error_count += 1
-            conversion_log['errors'].append({
-                'path': str(img_path.relative_to(BASE_DIR)),
-                'error': message
-            })
+    try:
+        for img_path in sorted(images):
+            key = str(img_path.relative_to(BASE_DIR))
+            if log.is_done(key):
+                resumed_count += 1
+                continue
+            
+            # Create output path (same location, .webp extension)
+            output_path = img_path.with_suffix('.webp')
+            
+            # Skip if already WebP
+            if img_path.suffix.lower() == '.webp':
+                log.record('skipped', key, {
+                    'path': key,
+                    'reason': 'Already WebP'
+                })
+                catalog.record_conversion(img_path, 'webp', 'skipped', message='Already WebP')
+                skipped_count += 1
+                continue
+            
+            # Skip if output already exists (avoid re-conversion)
+            existing = [path for path in planned_outputs(img_path, policy) if path.exists()]
+            if existing:
+                output_path = existing[0]
+                print(f"SKIP: {img_path.name} -> {output_path.name} (already exists)")
+                log.record('skipped', key, {
+                    'path': key,
+                    'reason': 'Output already exists'
+                })
+                catalog.record_conversion(img_path, 'webp', 'already_exists', output_path)
+                skipped_count += 1
+                continue
+            
+            # Convert
+            print(f"Converting: {img_path.name} -> {output_path.name}...", end=' ')
+            reset_peak_rss()
+            with span("convert"):
+                if scheduler:
+                    success, message, info, effort = scheduler.encode(
+                        key,
+                        lambda params, path: convert_image_to_webp(img_path, path, max_dimension=max_dimension,
+                                                                   pixel_budget=pixel_budget, policy=policy,
+                                                                   lossy_quality=lossy_quality, min_psnr=min_psnr,
+                                                                   **params),
+                        output_path)
+                else:
+                    effort = dict(DEFAULT_EFFORT) if policy == 'smallest' else {'method': 6}
+                    success, message, info = convert_image_to_webp(img_path, output_path, max_dimension=max_dimension,
+                                                                   pixel_budget=pixel_budget, policy=policy,
+                                                                   lossy_quality=lossy_quality, min_psnr=min_psnr,
+                                                                   **effort)
+            rss = peak_rss()
+            count("files")
+            
+            if success and info['output'] is None:
+                print(f"= {message}")
+                kept_count += 1
+                size_before = img_path.stat().st_size
+                count("bytes_in", size_before)
+                count("bytes_out", size_before)
+                log.record('kept_original', key, {
+                    'original': key,
+                    'message': message,
+                    'decision': info['decision'],
+                    'peak_rss': rss
+                }, size_before=size_before, size_after=size_before)
+                catalog.record_conversion(img_path, 'webp', 'kept_original', None,
+                                          size_before, size_before, message)
+            elif success:
+                output = info['output']
+                print(f"✓ {message}" if info['decision'] else "✓")
+                converted_count += 1
+                size_before, size_after = img_path.stat().st_size, output.stat().st_size
+                count("bytes_in", size_before)
+                count("bytes_out", size_after)
+                log.record('converted', key, {
+                    'original': key,
+                    'webp': str(output.relative_to(BASE_DIR)),
+                    'message': message,
+                    'effort': effort_label(effort),
+                    'decision': info['decision'],
+                    'decode': info['decode'],
+                    'peak_rss': rss
+                }, size_before=size_before, size_after=size_after)
+                catalog.record_conversion(img_path, 'webp', 'converted', output,
+                                          size_before, size_after, message)
+            else:
+                print(f"✗ {message}")
+                error_count += 1
+                log.record('errors', key, {
+                    'path': key,
+                    'error': message,
+                    'peak_rss': rss
+                })
+                catalog.record_conversion(img_path, 'webp', 'error', message=message)
+            with span("catalog"):
+                catalog.commit()
+    except KeyboardInterrupt:
+        log.close(interrupted=True, timing=PROFILER.summary())
+        catalog.close()
+        if scheduler:
+            scheduler.model.save()
+        print(f"\nInterrupted; rerun with --resume to continue ({JSONL_LOG_FILE.relative_to(BASE_DIR)})")
+        raise
+    
+    catalog.close()
+    log.close(timing=PROFILER.summary())
+    if scheduler:
+        scheduler.model.save()
     
     # Print summary
     print()
     print("=" * 70)
     print("Conversion Summary")
     print("=" * 70)
+    if resumed_count:
+        print(f"Done in a previous run: {resumed_count}")
     print(f"Converted: {converted_count}")
+    if kept_count:
+        print(f"Kept original (no smaller output): {kept_count}")
     print(f"Skipped: {skipped_count}")
     print(f"Errors: {error_count}")
+    if scheduler:
+        print(f"Time: {scheduler.elapsed():.0f}s of the {time_budget:.0f}s budget")
+    print()
+    PROFILER.print_summary()
     print()
     
     # Save conversion log
-    log_path = BASE_DIR / "scripts" / "webp-conversion-log.json"
-    with open(log_path, 'w', encoding='utf-8') as f:
-        json.dump(conversion_log, f, indent=2, ensure_ascii=False)
-    
-    print(f"Conversion log saved to: {log_path.relative_to(BASE_DIR)}")
+    conversion_log = write_summary(JSONL_LOG_FILE, LOG_FILE)
+    print(f"Conversion log saved to: {LOG_FILE.relative_to(BASE_DIR)}")
     
     # Print warnings if any
     if conversion_log['warnings']:
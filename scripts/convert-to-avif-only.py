@@ -4,15 +4,28 @@ Convert entire codebase to use only AVIF images.
 
 This script:
 1. Finds all image references in source files
-2. Updates them to use AVIF format
-3. Deletes all non-AVIF image files from public/cdn-assets
+2. Updates them to use AVIF format where the .avif exists
+3. Deletes the non-AVIF image files from public/cdn-assets that have an
+   .avif next to them
+
+Images without an .avif (the converters keep the original when no
+output is smaller) keep their references and files.
+
+Usage:
+    python3 scripts/convert-to-avif-only.py
+    python3 scripts/convert-to-avif-only.py --profile   # also write cProfile/collapsed stacks
 """
 
 import re
 import json
 import os
+import argparse
 from pathlib import Path
 from collections import defaultdict
+from urllib.parse import unquote
+
+from asset_tools.inventory import get_inventory
+from asset_tools.profiling import PROFILER, add_profile_argument, count, profiled, span
 
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
@@ -45,6 +58,15 @@ IMAGE_PATTERNS = [
 # Pattern for srcset attributes (handles multiple images)
 SRCSET_PATTERN = r'srcset=["\']([^"\']+)["\']'
 
+def avif_exists(path):
+    """Whether the .avif of a referenced cdn-assets path (without extension) exists."""
+    rel = path.split('cdn-assets/', 1)[1]
+    return (CDN_ASSETS_DIR / unquote(rel + NEW_EXTENSION)).exists()
+
+def to_avif(replacement):
+    """re.sub replacement that only rewrites references whose .avif exists."""
+    return lambda match: match.expand(replacement) if avif_exists(match.group(1)) else match.group(0)
+
 def update_image_references(content, file_path):
     """Update image references in content."""
     original_content = content
@@ -52,14 +74,15 @@ def update_image_references(content, file_path):
     
     # Apply each pattern
     for pattern, replacement in IMAGE_PATTERNS:
-        new_content = re.sub(pattern, replacement, new_content, flags=re.IGNORECASE)
+        new_content, matches = re.subn(pattern, to_avif(replacement), new_content, flags=re.IGNORECASE)
+        count("matches", matches)
     
     # Handle srcset attributes separately (they contain multiple image paths)
     def replace_srcset(match):
         srcset_value = match.group(1)
         # Replace each image path in srcset
         for pattern, replacement in IMAGE_PATTERNS:
-            srcset_value = re.sub(pattern, replacement, srcset_value, flags=re.IGNORECASE)
+            srcset_value = re.sub(pattern, to_avif(replacement), srcset_value, flags=re.IGNORECASE)
         return f'srcset="{srcset_value}"'
     
     new_content = re.sub(SRCSET_PATTERN, replace_srcset, new_content)
@@ -69,11 +92,16 @@ def update_image_references(content, file_path):
 def process_file(file_path):
     """Process a single file."""
     try:
-        content = file_path.read_text(encoding='utf-8')
-        new_content, changed = update_image_references(content, file_path)
+        with span("read"):
+            content = file_path.read_text(encoding='utf-8')
+        count("files")
+        count("bytes", len(content))
+        with span("regex"):
+            new_content, changed = update_image_references(content, file_path)
         
         if changed:
-            file_path.write_text(new_content, encoding='utf-8')
+            with span("write"):
+                file_path.write_text(new_content, encoding='utf-8')
             return True
         return False
     except Exception as e:
@@ -82,31 +110,40 @@ def process_file(file_path):
 
 def find_non_avif_images():
     """Find all non-AVIF image files."""
-    non_avif_files = []
-    
-    for ext in OLD_EXTENSIONS:
-        for file_path in CDN_ASSETS_DIR.rglob(f"*{ext}"):
-            non_avif_files.append(file_path)
-    
-    return non_avif_files
+    return get_inventory().files(CDN_ASSETS_DIR, OLD_EXTENSIONS)
 
 def delete_non_avif_files():
-    """Delete all non-AVIF image files."""
-    non_avif_files = find_non_avif_images()
+    """Delete the non-AVIF image files that have an .avif next to them."""
+    with span("walk"):
+        non_avif_files = find_non_avif_images()
     deleted = []
     errors = []
+    kept = []
     
     for file_path in non_avif_files:
+        if not file_path.with_suffix(NEW_EXTENSION).exists():
+            kept.append(str(file_path.relative_to(BASE_DIR)))
+            continue
         try:
-            file_path.unlink()
+            with span("delete"):
+                file_path.unlink()
             deleted.append(str(file_path.relative_to(BASE_DIR)))
         except Exception as e:
             errors.append((str(file_path.relative_to(BASE_DIR)), str(e)))
     
-    return deleted, errors
+    return deleted, errors, kept
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Switch every image reference to AVIF and delete the other formats")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
+    with profiled("convert-to-avif-only", args.profile):
+        convert_codebase()
+
+def convert_codebase():
+    """Rewrite the references, delete non-AVIF files and print the summary."""
     print("="*60)
     print("CONVERTING CODEBASE TO AVIF-ONLY")
     print("="*60)
@@ -117,33 +154,37 @@ def main():
     files_updated = []
     files_processed = 0
     
-    for ext in SOURCE_EXTENSIONS:
-        for file_path in SRC_DIR.rglob(f"*{ext}"):
+    with span("walk"):
+        inventory = get_inventory()
+        src_files = inventory.files(SRC_DIR, SOURCE_EXTENSIONS)
+        public_files = inventory.files(PUBLIC_DIR, SOURCE_EXTENSIONS)
+    
+    for file_path in src_files:
+        files_processed += 1
+        if process_file(file_path):
+            rel_path = file_path.relative_to(BASE_DIR)
+            files_updated.append(str(rel_path))
+            print(f"  Updated: {rel_path}")
+    
+    # Also check public directory for any HTML/CSS files
+    for file_path in public_files:
+        if file_path.is_file():
             files_processed += 1
             if process_file(file_path):
                 rel_path = file_path.relative_to(BASE_DIR)
                 files_updated.append(str(rel_path))
                 print(f"  Updated: {rel_path}")
     
-    # Also check public directory for any HTML/CSS files
-    for ext in SOURCE_EXTENSIONS:
-        for file_path in PUBLIC_DIR.rglob(f"*{ext}"):
-            if file_path.is_file():
-                files_processed += 1
-                if process_file(file_path):
-                    rel_path = file_path.relative_to(BASE_DIR)
-                    files_updated.append(str(rel_path))
-                    print(f"  Updated: {rel_path}")
-    
     print(f"\n  Files processed: {files_processed}")
     print(f"  Files updated: {len(files_updated)}")
     print()
     
     # Step 2: Delete non-AVIF image files
     print("Step 2: Deleting non-AVIF image files...")
-    deleted, errors = delete_non_avif_files()
+    deleted, errors, kept = delete_non_avif_files()
     
     print(f"  Files deleted: {len(deleted)}")
+    print(f"  Files kept (no .avif): {len(kept)}")
     if errors:
         print(f"  Errors: {len(errors)}")
         for file_path, error in errors[:10]:
@@ -159,7 +200,10 @@ def main():
     print(f"Source files processed: {files_processed}")
     print(f"Source files updated: {len(files_updated)}")
     print(f"Image files deleted: {len(deleted)}")
+    print(f"Image files kept: {len(kept)}")
     print(f"Errors: {len(errors)}")
+    print()
+    PROFILER.print_summary()
     
     if files_updated:
         print(f"\nUpdated files (first 20):")
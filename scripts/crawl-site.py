@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Crawl the built site and report broken links and slow resources.
+
+Unlike find-404-errors.py, which reads the sources, this follows the HTML
+that was actually rendered, so links produced by components, middleware or
+CMS data are checked too. Every page and subresource is requested once;
+status, bytes and time to first byte are recorded for each.
+
+Usage:
+    python3 scripts/crawl-site.py --url http://localhost:4321   # crawl a running preview server
+    python3 scripts/crawl-site.py                       # serve a prerendered dist/ locally and crawl it
+    python3 scripts/crawl-site.py --external            # also check links to other origins
+    python3 scripts/crawl-site.py --profile                     # also write cProfile/collapsed stacks
+
+The site renders on the server (output: 'server'), so its pages only exist
+behind `PLAYWRIGHT=1 npm run preview:raw`; without --url the crawl stops
+with an error unless dist/ holds a prerendered index.html.
+
+Exit code 1 when any broken link is found.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from asset_tools.paths import BASE_DIR, SCRIPTS_DIR
+from asset_tools.crawler import DIST_DIR, broken_links, crawl_site, serve_dist, slowest
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+REPORT_FILE = SCRIPTS_DIR / "crawl-report.json"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Crawl the built site for broken links")
+    parser.add_argument("--url", help="Base URL of a running server, e.g. astro preview "
+                                      "(default: serve a prerendered dist/ locally)")
+    parser.add_argument("--dist", type=Path, default=DIST_DIR, help="Build output directory")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests")
+    parser.add_argument("--timeout", type=float, default=15, help="Per-request timeout in seconds")
+    parser.add_argument("--max-urls", type=int, default=20000, help="Stop queueing after this many URLs")
+    parser.add_argument("--start", action="append", help="Start path (repeatable, default /)")
+    parser.add_argument("--external", action="store_true", help="Also request links to other origins")
+    parser.add_argument("--top", type=int, default=20, help="Slowest resources to list")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("crawl-site", args.profile):
+        return crawl(args)
+
+
+def crawl(args):
+    """Serve or reach the site, crawl it and write the report."""
+    server = None
+    base_url = args.url
+    if not base_url:
+        try:
+            server, base_url = serve_dist(args.dist)
+        except FileNotFoundError as e:
+            print(f"✗ {e}")
+            return 2
+
+    print("=" * 70)
+    print(f"CRAWLING {base_url}")
+    print("=" * 70)
+    started = time.perf_counter()
+    try:
+        with span("crawl"):
+            results = crawl_site(base_url, start_paths=args.start or ("/",), concurrency=args.concurrency,
+                                 timeout=args.timeout, max_urls=args.max_urls, check_external=args.external)
+    finally:
+        if server:
+            server.shutdown()
+    elapsed = time.perf_counter() - started
+
+    broken = broken_links(results)
+    pages = sum(1 for r in results.values() if r["status"] == 200 and r["content_type"] == "text/html")
+    total_bytes = sum(r["bytes"] for r in results.values())
+
+    if broken:
+        print(f"\n✗ {len(broken)} broken link(s):")
+        for url, result in sorted(broken.items()):
+            print(f"  [{result['status'] or 'ERR'}] {url}" + (f" ({result['error']})" if result["error"] else ""))
+            for referrer in sorted(result["referrers"])[:5]:
+                print(f"      ← {referrer}")
+
+    print("\nSlowest resources:")
+    for url, result in slowest(results, args.top):
+        print(f"  {result['elapsed'] * 1000:8.1f} ms  ttfb {result['ttfb'] * 1000 if result['ttfb'] else 0:6.1f} ms"
+              f"  {result['bytes'] / 1024:8.1f} KB  {url}")
+
+    report = {
+        "base_url": base_url,
+        "elapsed": elapsed,
+        "urls": len(results),
+        "pages": pages,
+        "bytes": total_bytes,
+        "broken": {url: {**r, "referrers": sorted(r["referrers"])} for url, r in sorted(broken.items())},
+        "slowest": [{"url": url, "elapsed": r["elapsed"], "ttfb": r["ttfb"], "bytes": r["bytes"]}
+                    for url, r in slowest(results, args.top)],
+        "results": {url: {**r, "referrers": sorted(r["referrers"])} for url, r in sorted(results.items())},
+    }
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print()
+    print("=" * 70)
+    print(f"Crawled {len(results)} URLs ({pages} pages, {total_bytes / 1024 / 1024:.1f} MB) in {elapsed:.2f}s")
+    print(f"Report saved to: {REPORT_FILE.relative_to(BASE_DIR)}")
+    if broken:
+        return 1
+    print("✓ No broken links")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,12 +12,12 @@ import re
 import shutil
 import json
 import hashlib
-import urllib.request
-import urllib.parse
 from pathlib import Path
 from urllib.parse import unquote, urlparse
 from collections import defaultdict
 
+from asset_tools.fetcher import fetch_assets
+
 # Base directories
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
@@ -118,15 +118,18 @@ def find_external_gif_references():
     
     return unique_gifs
 
+def download_gifs(jobs):
+    """Download GIFs concurrently; jobs is a list of (url, target_path)."""
+    results, _ = fetch_assets(jobs)
+    for result in results:
+        if result["status"] == "error":
+            print(f"  Error downloading {result['url']}: {result['error']}")
+    return results
+
 def download_gif(url, target_path):
     """Download a GIF from URL."""
-    try:
-        print(f"  Downloading: {url}")
-        urllib.request.urlretrieve(url, target_path)
-        return True
-    except Exception as e:
-        print(f"  Error downloading {url}: {e}")
-        return False
+    print(f"  Downloading: {url}")
+    return download_gifs([(url, target_path)])[0]["status"] != "error"
 
 def generate_gif_name(url_or_path):
     """Generate a clean name for a GIF file."""
@@ -269,14 +272,11 @@ def main():
         temp_dir = BASE_DIR / "scripts" / "temp_gifs"
         temp_dir.mkdir(exist_ok=True)
         
-        for gif_info in external_gifs:
-            url = gif_info["url"]
-            filename = generate_gif_name(url)
-            temp_path = temp_dir / filename
-            
-            if download_gif(url, temp_path):
+        jobs = [(gif_info["url"], temp_dir / generate_gif_name(gif_info["url"])) for gif_info in external_gifs]
+        for (url, temp_path), result in zip(jobs, download_gifs(jobs)):
+            if result["status"] != "error":
                 downloaded_gifs.append(temp_path)
-                print(f"    ✓ Downloaded: {filename}")
+                print(f"    ✓ Downloaded: {temp_path.name}")
             else:
                 print(f"    ✗ Failed to download: {url}")
         print()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Extract per-route critical CSS.
+
+For every page in src/pages, prunes webflow.css and global.css against the
+classes, ids and tags of the page and the components it imports, and writes
+the result to src/generated/critical-css/<route>.css. BaseLayout inlines
+that file and loads the full stylesheets without blocking rendering; routes
+without a generated file keep the regular blocking stylesheets. Font faces
+stay in the full stylesheets, and routes whose critical CSS is above
+--max-inline-kb are not inlined.
+
+Vite ships `?url` imports without running PostCSS, so the full stylesheets
+BaseLayout links are pruned against the whole site (with the PurgeCSS
+safelist of postcss.config.mjs) and minified into src/generated/styles/.
+
+Results are cached in scripts/.cache/critical-css.json, so only routes whose
+import closure or stylesheets changed are recomputed. `npm run build` (and
+so the Docker build) runs it before `astro build`.
+
+Usage:
+    python3 scripts/extract-critical-css.py
+    python3 scripts/extract-critical-css.py --max-inline-kb 24
+    python3 scripts/extract-critical-css.py --profile   # also write cProfile/collapsed stacks
+"""
+
+import sys
+import json
+import time
+import argparse
+from statistics import median
+
+from asset_tools.paths import BASE_DIR, SCRIPTS_DIR
+from asset_tools.critical_css import MAX_INLINE_BYTES, CriticalCssBuilder, full_stylesheet_bytes
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+REPORT_FILE = SCRIPTS_DIR / "critical-css-report.json"
+
+
+def format_kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Per-route critical CSS")
+    parser.add_argument("--max-inline-kb", type=float, default=MAX_INLINE_BYTES / 1024,
+                        help="Largest critical CSS to inline; bigger routes keep blocking stylesheets "
+                             "(default: %(default)g)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("extract-critical-css", args.profile):
+        return extract(args)
+
+
+def extract(args):
+    """Build the critical CSS and write the report."""
+    started = time.perf_counter()
+    builder = CriticalCssBuilder(max_inline_bytes=int(args.max_inline_kb * 1024))
+    with span("build"):
+        results = builder.build()
+    elapsed = time.perf_counter() - started
+    full = full_stylesheet_bytes(builder.stylesheets)
+
+    print("=" * 70)
+    print("CRITICAL CSS REPORT")
+    print("=" * 70)
+    print(f"{'Route':<50} {'Critical':>10} {'Saved':>6}  Inlined")
+    for result in sorted(results, key=lambda r: r["route"]):
+        saved = (1 - result["bytes"] / full) * 100
+        mark = "✓" if result["inlined"] else "✗"
+        print(f"{result['route'][:50]:<50} {format_kb(result['bytes']):>10} {saved:>5.0f}%  {mark}")
+
+    sizes = [result["bytes"] for result in results if result["inlined"]]
+    cached = sum(1 for result in results if result["cached"])
+    report = {
+        "stylesheets": [sheet.relative_to(BASE_DIR).as_posix() for sheet in builder.stylesheets],
+        "full_bytes": full,
+        "deferred_bytes": builder.stylesheet_bytes,
+        "max_inline_bytes": builder.max_inline_bytes,
+        "routes": {result["route"]: {"file": result["file"], "bytes": result["bytes"], "inlined": result["inlined"]}
+                   for result in sorted(results, key=lambda r: r["route"])},
+    }
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print()
+    print("=" * 70)
+    print(f"Full stylesheets: {format_kb(full)} -> {format_kb(sum(builder.stylesheet_bytes.values()))} deferred "
+          f"({builder.deferred_dir.relative_to(BASE_DIR)})")
+    if sizes:
+        print(f"Critical CSS: {format_kb(min(sizes))} - {format_kb(max(sizes))} (median {format_kb(median(sizes))})")
+    print(f"✓ {len(results)} routes ({cached} cached) in {elapsed * 1000:.0f} ms; "
+          f"{len(sizes)} inlined, {len(results) - len(sizes)} above {format_kb(builder.max_inline_bytes)}")
+    print(f"Output: {builder.output_dir.relative_to(BASE_DIR)}")
+    print(f"Report saved to: {REPORT_FILE.relative_to(BASE_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Download every external image referenced in the codebase.
+
+Uses the asyncio fetcher in asset_tools.fetcher:
+- bounded concurrency with keep-alive connections per host
+- on-disk cache with ETag/Last-Modified conditional requests
+- bodies streamed to disk and verified with SHA-256
+
+Usage:
+    python3 scripts/fetch-external-assets.py [--dest DIR] [--concurrency N] [--dry-run]
+    python3 scripts/fetch-external-assets.py --profile   # also write cProfile/collapsed stacks
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from asset_tools.paths import BASE_DIR, SRC_DIR, PUBLIC_DIR, SCRIPTS_DIR, IMAGE_EXTENSIONS
+from asset_tools.fetcher import DEFAULT_CACHE_DIR, fetch_assets
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+SOURCE_EXTENSIONS = ('.astro', '.ts', '.tsx', '.js', '.jsx', '.html', '.css')
+DEFAULT_DEST = SCRIPTS_DIR / "temp_external_assets"
+REPORT_FILE = SCRIPTS_DIR / "external-assets-report.json"
+
+_EXT_GROUP = '|'.join(sorted(ext.lstrip('.') for ext in IMAGE_EXTENSIONS))
+EXTERNAL_IMAGE_PATTERN = re.compile(
+    r'(https?://[^\s"\'()<>,]+?\.(?:' + _EXT_GROUP + r'))(?=[\s"\'()<>,?#]|$)',
+    re.IGNORECASE,
+)
+
+
+def find_external_image_references(roots=(SRC_DIR, PUBLIC_DIR)):
+    """Find all external image URLs referenced in source files, deduplicated by URL."""
+    references = {}
+
+    for root_dir in roots:
+        for root, dirs, files in os.walk(root_dir):
+            dirs[:] = [d for d in dirs if d not in ('node_modules', '.git', 'dist', '.astro')]
+            for file in files:
+                if not file.endswith(SOURCE_EXTENSIONS):
+                    continue
+                file_path = Path(root) / file
+                try:
+                    content = file_path.read_text(encoding='utf-8')
+                except Exception:
+                    continue
+
+                for match in EXTERNAL_IMAGE_PATTERN.finditer(content):
+                    url = match.group(1)
+                    entry = references.setdefault(url, {"url": url, "files": []})
+                    rel_file = str(file_path.relative_to(BASE_DIR))
+                    if rel_file not in entry["files"]:
+                        entry["files"].append(rel_file)
+
+    return list(references.values())
+
+
+def target_name_for(url):
+    """Local filename for a URL: host plus the decoded path basename."""
+    parsed = urlparse(url)
+    name = os.path.basename(unquote(parsed.path)) or "index"
+    name = re.sub(r'[^\w\-\.]+', '-', name).strip('-')
+    return f"{parsed.hostname}/{name}"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Download external images referenced in the codebase")
+    parser.add_argument("--dest", type=Path, default=DEFAULT_DEST, help="Directory to place downloaded files in")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Conditional-request cache directory")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum downloads in flight")
+    parser.add_argument("--per-host", type=int, default=4, help="Maximum connections per host")
+    parser.add_argument("--timeout", type=float, default=30, help="Socket timeout in seconds")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the external URLs")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("fetch-external-assets", args.profile):
+        return fetch(args)
+
+
+def fetch(args):
+    """Find external image references and download them."""
+    print("=" * 70)
+    print("Fetch External Assets")
+    print("=" * 70)
+    print()
+
+    print("Finding external image references...")
+    with span("references"):
+        references = find_external_image_references()
+    print(f"Found {len(references)} external image URL(s)")
+    for ref in references:
+        print(f"  - {ref['url']} (in {', '.join(ref['files'][:3])})")
+    print()
+
+    if args.dry_run or not references:
+        return 0
+
+    jobs = [(ref["url"], args.dest / target_name_for(ref["url"])) for ref in references]
+    print(f"Downloading with concurrency={args.concurrency}, per-host={args.per_host}...")
+    with span("fetch"):
+        results, pool_stats = fetch_assets(
+            jobs,
+            cache_dir=args.cache_dir,
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            timeout=args.timeout,
+        )
+
+    counts = {"downloaded": 0, "not_modified": 0, "error": 0}
+    for result in results:
+        counts[result["status"]] += 1
+        if result["status"] == "error":
+            print(f"  ✗ {result['url']}: {result['error']}")
+        elif result["status"] == "not_modified":
+            print(f"  ✓ Not modified: {result['url']}")
+        else:
+            print(f"  ✓ Downloaded: {result['url']} ({result['size']:,} bytes, {result['elapsed']:.2f}s)")
+
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"references": references, "results": results, "connections": pool_stats},
+                  f, indent=2, ensure_ascii=False)
+
+    print()
+    print("=" * 70)
+    print("Summary")
+    print("=" * 70)
+    print(f"Downloaded: {counts['downloaded']}")
+    print(f"Not modified (cached): {counts['not_modified']}")
+    print(f"Errors: {counts['error']}")
+    print(f"Connections opened: {pool_stats['opened']}, reused: {pool_stats['reused']}")
+    print(f"Report saved to: {REPORT_FILE.relative_to(BASE_DIR)}")
+
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
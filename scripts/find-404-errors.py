@@ -1,14 +1,27 @@
 #!/usr/bin/env python3
 """
 Find all 404 errors by analyzing source files and checking if referenced assets exist.
+
+Usage:
+    python3 scripts/find-404-errors.py
+    python3 scripts/find-404-errors.py --fix
+    python3 scripts/find-404-errors.py --profile   # also write cProfile/collapsed stacks
 """
 
-import re
 import json
+import argparse
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import unquote
+from urllib.parse import quote, unquote
 from collections import defaultdict
 
+from asset_tools.catalog import open_catalog
+from asset_tools.profiling import PROFILER, add_profile_argument, profiled, span
+from asset_tools.references import split_srcset
+from asset_tools.routes import load_route_table
+from asset_tools.suggest import DEFAULT_MIN_CONFIDENCE, AssetSuggester
+from asset_tools.tokenizer import attribute_values, tokenize
+
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src" / "pages"
 PUBLIC_DIR = BASE_DIR / "public"
@@ -16,30 +29,34 @@ LEGACY_DIR = BASE_DIR / "src-legacy" / "cdn-assets"
 
 # Collect all potential 404 errors
 errors_404 = defaultdict(list)
+applied_fixes = []
 
-def find_asset_references(content, file_path):
-    """Find all asset references in content."""
+def find_asset_references(tokens, content):
+    """Find all /cdn-assets/ references among a file's tokens."""
     references = []
     
-    # Pattern for /cdn-assets/ paths
-    patterns = [
-        r'src=["\'](/cdn-assets/[^"\']+)["\']',
-        r'href=["\'](/cdn-assets/[^"\']+)["\']',
-        r'url\(["\']?(/cdn-assets/[^"\']+)["\']?\)',
-        r'background-image:\s*url\(["\']?(/cdn-assets/[^"\']+)["\']?\)',
-    ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.IGNORECASE)
-        for match in matches:
-            ref_path = match.group(1)
+    for token in tokens:
+        if not token.value or '/cdn-assets/' not in token.value or token.quote == '{':
+            continue
+        candidates = split_srcset(token.value) if token.name and token.name.lower() == 'srcset' else [token.value]
+        cursor = token.start
+        for ref_path in candidates:
+            # Offsets of this candidate in the file, so --fix rewrites only this span
+            start = content.find(ref_path, cursor, token.end)
+            if start == -1:
+                continue
+            cursor = start + len(ref_path)
+            if not ref_path.startswith("/cdn-assets/") or '${' in ref_path:
+                continue
             # Decode URL encoding
             decoded = unquote(ref_path)
             references.append({
                 "path": decoded,
                 "original": ref_path,
-                "line": content[:match.start()].count('\n') + 1,
-                "context": content[max(0, match.start()-50):match.end()+50]
+                "start": start,
+                "end": cursor,
+                "line": token.line,
+                "context": content[max(0, token.start-50):token.end+50]
             })
     
     return references
@@ -62,81 +79,102 @@ def check_asset_exists(asset_path):
     if legacy_path.exists():
         return False, "legacy"
     
-    # Try with different extensions
-    base_name = Path(rel_path).stem
+    # Try with different extensions in the same directory
     for ext in ['.avif', '.webp', '.png', '.jpg', '.jpeg', '.svg']:
-        test_path = PUBLIC_DIR / "cdn-assets" / f"{base_name}{ext}"
+        test_path = PUBLIC_DIR / "cdn-assets" / Path(rel_path).with_suffix(ext)
         if test_path.exists():
             return False, f"public (different extension: {ext})"
         
-        test_path = LEGACY_DIR / f"{base_name}{ext}"
+        test_path = LEGACY_DIR / Path(rel_path).with_suffix(ext)
         if test_path.exists():
             return False, f"legacy (different extension: {ext})"
     
     return False, "not_found"
 
-def check_page_references(content, file_path):
+@lru_cache(maxsize=None)
+def get_suggester():
+    """Fuzzy index over public/cdn-assets and the recorded renames, built on first use."""
+    with open_catalog() as catalog:
+        return AssetSuggester.from_public(catalog=catalog)
+
+def apply_suggestions(content, edits):
+    """Rewrite the ``(start, end, original, new_path)`` spans of broken references to their suggestions."""
+    # Apply from the end so earlier offsets stay valid
+    for start, end, original, new_path in sorted(edits, reverse=True):
+        replacement = quote(new_path) if '%' in original else new_path
+        content = content[:start] + replacement + content[end:]
+    return content
+
+def check_page_references(tokens):
     """Check for internal page references that might be broken."""
     broken_links = []
+    routes = load_route_table()
     
-    # Pattern for internal links
-    patterns = [
-        r'href=["\'](/[^"\']+)["\']',
-    ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.IGNORECASE)
-        for match in matches:
-            link_path = match.group(1)
-            # Skip external links, assets, anchors
-            if link_path.startswith("http") or link_path.startswith("#") or link_path.startswith("/cdn-assets"):
-                continue
-            
-            # Check if page exists
-            page_path = SRC_DIR / link_path.lstrip("/")
-            if link_path.endswith("/"):
-                page_path = page_path / "index.astro"
-            else:
-                page_path = page_path.with_suffix(".astro")
-            
-            # Also check parent directory for index
-            if not page_path.exists():
-                parent_index = page_path.parent / "index.astro"
-                if not parent_index.exists():
-                    broken_links.append({
-                        "path": link_path,
-                        "line": content[:match.start()].count('\n') + 1,
-                    })
+    for token in attribute_values(tokens, "href"):
+        link_path = token.value
+        # Skip external links, assets, anchors and template expressions
+        if not link_path.startswith("/") or link_path.startswith(("//", "/cdn-assets")) or token.quote == '{':
+            continue
+        
+        # Resolve against the compiled route table (static, dynamic and catch-all routes)
+        if not routes.exists(link_path):
+            broken_links.append({
+                "path": link_path,
+                "line": token.line,
+            })
     
     return broken_links
 
-def analyze_file(file_path):
-    """Analyze a single file for 404 errors."""
+def analyze_file(file_path, fix=False, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """Analyze a single file for 404 errors (and apply confident suggestions with ``fix``)."""
     try:
-        content = file_path.read_text(encoding='utf-8')
+        with span("read"):
+            content = file_path.read_text(encoding='utf-8')
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
         return
+    PROFILER.count("files")
+    PROFILER.count("bytes", len(content))
     
     rel_path = file_path.relative_to(SRC_DIR)
     page_url = f"/{rel_path.parent / rel_path.stem}" if rel_path.stem != "index" else f"/{rel_path.parent}" if rel_path.parent != Path('.') else "/"
     
+    # One tokenizer pass feeds both checks
+    with span("tokenize"):
+        tokens = list(tokenize(content, file_path))
+    
     # Find asset references
-    asset_refs = find_asset_references(content, file_path)
+    asset_refs = find_asset_references(tokens, content)
+    PROFILER.count("asset_references", len(asset_refs))
+    edits = []
     for ref in asset_refs:
-        exists, location = check_asset_exists(ref["path"])
+        with span("assets"):
+            exists, location = check_asset_exists(ref["path"])
         if not exists:
+            suggester = get_suggester()
+            with span("suggest"):
+                best = suggester.best(ref["path"], min_confidence)
+            if fix and best:
+                edits.append((ref["start"], ref["end"], ref["original"], best["path"]))
+                applied_fixes.append((str(file_path.relative_to(BASE_DIR)), ref["path"], best))
+                continue
+            with span("suggest"):
+                suggestions = suggester.suggest(ref["path"], limit=3)
             errors_404[page_url].append({
                 "type": "asset",
                 "path": ref["path"],
                 "original": ref["original"],
                 "line": ref["line"],
                 "location": location,
+                "suggestions": suggestions,
                 "context": ref["context"][:100]
             })
+    if edits:
+        file_path.write_text(apply_suggestions(content, edits), encoding='utf-8')
     
     # Check page references
-    broken_links = check_page_references(content, file_path)
+    with span("routes"):
+        broken_links = check_page_references(tokens)
     for link in broken_links:
         errors_404[page_url].append({
             "type": "route",
@@ -146,14 +184,30 @@ def analyze_file(file_path):
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Find 404s in asset references and internal links")
+    parser.add_argument("--fix", action="store_true",
+                        help="Rewrite missing assets to their suggestion when it is confident enough "
+                             "and a recorded rename or the same file name (image formats may differ)")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help=f"Confidence needed for --fix (default {DEFAULT_MIN_CONFIDENCE})")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
+    with profiled("find-404-errors", args.profile):
+        find_errors(args)
+
+def find_errors(args):
+    """Analyze every page, save the report and print the summary."""
     print("Analyzing files for 404 errors...\n")
     
     # Analyze all .astro files
-    astro_files = list(SRC_DIR.rglob("*.astro"))
+    with span("walk"):
+        astro_files = list(SRC_DIR.rglob("*.astro"))
     print(f"Found {len(astro_files)} files to analyze\n")
     
     for astro_file in astro_files:
-        analyze_file(astro_file)
+        with span("analyze"):
+            analyze_file(astro_file, fix=args.fix, min_confidence=args.min_confidence)
         if len(errors_404) % 10 == 0 and errors_404:
             print(f"Processed {len(astro_files)} files, found errors in {len(errors_404)} pages...")
     
@@ -199,7 +253,18 @@ def main():
                     print(f"  [{error['type']}] {error.get('path', error.get('original', 'Unknown'))}")
                     if error.get('location') and error.get('location') != 'not_found':
                         print(f"    → Found in: {error['location']}")
+                    if error.get('suggestions'):
+                        top = error['suggestions'][0]
+                        print(f"    → Did you mean: {top['path']} ({top['confidence']:.0%}, {top['reason']})")
                     count += 1
+    
+    if applied_fixes:
+        print(f"\n✓ Applied {len(applied_fixes)} suggestion(s):")
+        for file, old_path, suggestion in applied_fixes:
+            print(f"  {file}: {old_path} -> {suggestion['path']} ({suggestion['confidence']:.0%})")
+    
+    print()
+    PROFILER.print_summary()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Find (and optionally quarantine) files in public/cdn-assets that nothing references.
+
+References are collected from src/ (pages, components, layouts, Strapi
+helpers) and from public/ CSS/JS, including srcset candidates, CSS url()
+values, ogImage props and URL-encoded names.
+
+Usage:
+    python3 scripts/find-orphan-assets.py                 # report only
+    python3 scripts/find-orphan-assets.py --prune         # move orphans to .asset-quarantine/
+    python3 scripts/find-orphan-assets.py --restore DIR   # undo a prune
+    python3 scripts/find-orphan-assets.py --profile       # also write cProfile/collapsed stacks
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from asset_tools.paths import BASE_DIR, SCRIPTS_DIR
+from asset_tools.orphans import DEFAULT_KEEP, QUARANTINE_DIR, asset_inventory, find_orphans, quarantine, restore
+from asset_tools.references import collect_references
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+REPORT_FILE = SCRIPTS_DIR / "orphan-assets-report.json"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Report unreferenced files in public/cdn-assets")
+    parser.add_argument("--prune", action="store_true", help="Move orphans into the quarantine directory")
+    parser.add_argument("--quarantine-dir", type=Path, default=QUARANTINE_DIR, help="Where pruned files are moved")
+    parser.add_argument("--restore", type=Path, metavar="DIR", help="Restore a previous quarantine folder")
+    parser.add_argument("--keep", action="append", default=[], metavar="PREFIX",
+                        help="Asset path prefix to always keep (repeatable)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("find-orphan-assets", args.profile):
+        return find_orphan_assets(args)
+
+
+def find_orphan_assets(args):
+    """Report (and optionally quarantine) orphaned assets."""
+    print("=" * 70)
+    print("Orphan Asset Detector")
+    print("=" * 70)
+    print()
+
+    if args.restore:
+        restored = restore(args.restore)
+        print(f"✓ Restored {len(restored)} file(s) from {args.restore}")
+        return 0
+
+    print("Building asset inventory...")
+    with span("inventory"):
+        inventory = asset_inventory()
+    total_bytes = sum(inventory.values())
+    print(f"  {len(inventory)} files, {total_bytes / 1024 / 1024:.1f} MB")
+
+    print("Collecting references from src/ and public/...")
+    with span("references"):
+        paths, prefixes, by_file = collect_references()
+    print(f"  {len(paths)} referenced paths in {len(by_file)} files")
+    if prefixes:
+        print(f"  {len(prefixes)} dynamic prefix(es) kept: {', '.join(sorted(prefixes))}")
+    print()
+
+    with span("match"):
+        orphans, referenced = find_orphans(inventory, (paths, prefixes), keep=DEFAULT_KEEP + tuple(args.keep))
+    orphan_bytes = sum(orphans.values())
+    missing = sorted(path for path in paths if path not in inventory)
+
+    report = {
+        "total_files": len(inventory),
+        "total_bytes": total_bytes,
+        "referenced_files": len(referenced),
+        "orphan_files": len(orphans),
+        "orphan_bytes": orphan_bytes,
+        "orphans": [{"path": path, "size": size}
+                    for path, size in sorted(orphans.items(), key=lambda item: -item[1])],
+        "missing_references": missing,
+    }
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("=" * 70)
+    print("ORPHAN REPORT")
+    print("=" * 70)
+    print(f"Referenced: {len(referenced)} files")
+    print(f"Orphans: {len(orphans)} files, {orphan_bytes / 1024:.1f} KB "
+          f"({(orphan_bytes / total_bytes * 100) if total_bytes else 0:.1f}% of cdn-assets)")
+    print(f"References to missing files: {len(missing)}")
+    print()
+    print("Largest orphans (first 20):")
+    for item in report["orphans"][:20]:
+        print(f"  {item['size'] / 1024:8.1f} KB  {item['path']}")
+    if len(orphans) > 20:
+        print(f"  ... and {len(orphans) - 20} more")
+    print(f"\nDetailed report saved to: {REPORT_FILE.relative_to(BASE_DIR)}")
+
+    if args.prune and orphans:
+        folder = quarantine(orphans, args.quarantine_dir)
+        print(f"\n✓ Moved {len(orphans)} orphan(s) to {folder}")
+        print(f"  Undo with: python3 scripts/find-orphan-assets.py --restore {folder}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Find markup repeated verbatim across pages and factor it into components.
+
+The migrated Webflow pages carry the full page body, so lesson sidebars,
+dialogs and footers are duplicated in every aulas/modulo page. Every element
+in src/pages and src/components gets a Merkle hash of its normalized subtree
+(tag, sorted attributes, collapsed text, child hashes), identical hashes are
+grouped and the maximal repeated blocks are ranked by bytes x occurrences.
+
+With --extract N the top N blocks that can move safely (no Astro
+expressions or components inside, not targeted by a page's scoped <style>)
+are written to src/components/<Name>.astro and every occurrence is replaced
+with <Name />.
+
+Usage:
+    python3 scripts/find-repeated-markup.py                    # report
+    python3 scripts/find-repeated-markup.py --min-bytes 1024   # only larger blocks
+    python3 scripts/find-repeated-markup.py --extract 5        # extract the top 5 blocks
+    python3 scripts/find-repeated-markup.py --extract 5 --dry-run
+    python3 scripts/find-repeated-markup.py --profile          # also write cProfile/collapsed stacks
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from asset_tools.paths import BASE_DIR, SCRIPTS_DIR, SRC_DIR
+from asset_tools.markup import extract_components, find_repeated_blocks, parse_templates, plan_extraction
+from asset_tools.references import iter_source_files
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+REPORT_FILE = SCRIPTS_DIR / "repeated-markup-report.json"
+SCAN_DIRS = (SRC_DIR / "pages", SRC_DIR / "components")
+
+
+def format_kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Repeated markup detector")
+    parser.add_argument("--min-bytes", type=int, default=512, help="Smallest block to report")
+    parser.add_argument("--min-count", type=int, default=2, help="Minimum occurrences")
+    parser.add_argument("--top", type=int, default=20, help="Blocks to print")
+    parser.add_argument("--extract", type=int, default=0, metavar="N", help="Extract the top N blocks into components")
+    parser.add_argument("--dry-run", action="store_true", help="With --extract, only show what would change")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("find-repeated-markup", args.profile):
+        return find_markup(args)
+
+
+def find_markup(args):
+    """Find repeated blocks, optionally extract them, and write the report."""
+    started = time.perf_counter()
+    files = list(iter_source_files(SCAN_DIRS, ('.astro',)))
+    with span("parse"):
+        templates = parse_templates(files)
+    with span("find"):
+        blocks = find_repeated_blocks(templates, args.min_bytes, args.min_count)
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(template.content.encode("utf-8", "surrogateescape")) for template in templates)
+    print("=" * 70)
+    print("REPEATED MARKUP REPORT")
+    print("=" * 70)
+    print(f"Scanned {len(templates)} templates ({format_kb(total)}) in {elapsed * 1000:.0f} ms")
+    print(f"Repeated blocks: {len(blocks)}")
+    print()
+    print(f"{'Block':<42} {'Size':>9} {'Count':>6} {'Pages':>6} {'Total':>10}")
+    for block in blocks[:args.top]:
+        mark = "" if block.extractable else " *"
+        print(f"{(block.label + mark)[:42]:<42} {format_kb(block.bytes):>9} {block.occurrences:>6} "
+              f"{len(block.files):>6} {format_kb(block.score):>10}")
+    print()
+    print("* not extractable (Astro expressions/components or scoped styles)")
+
+    report = {
+        "templates": len(templates),
+        "bytes": total,
+        "blocks": [
+            {
+                "digest": block.digest,
+                "label": block.label,
+                "bytes": block.bytes,
+                "occurrences": block.occurrences,
+                "score": block.score,
+                "extractable": block.extractable,
+                "files": block.files,
+            }
+            for block in blocks
+        ],
+    }
+
+    if args.extract:
+        plan = plan_extraction(blocks, args.extract)
+        with span("extract"):
+            rewritten = extract_components(plan, dry_run=args.dry_run)
+        print()
+        print("=" * 70)
+        print("EXTRACTION" + (" (dry run)" if args.dry_run else ""))
+        print("=" * 70)
+        for name, block in plan:
+            saved = block.score - block.bytes
+            print(f"✓ {name}.astro <- {block.label} ({block.occurrences}x, ~{format_kb(saved)} saved)")
+        print(f"Pages rewritten: {len(rewritten)}")
+        report["extracted"] = {name: block.digest for name, block in plan}
+
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Report saved to: {REPORT_FILE.relative_to(BASE_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 """
 Fix broken .html route references to .astro routes.
+
+Only links whose extensionless route exists in the route table of
+src/pages are rewritten; the others are listed.
 """
 
 import re
 from pathlib import Path
 
+from asset_tools.routes import load_route_table
+
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src" / "pages"
 
-def fix_html_routes(content, file_path):
+def fix_html_routes(content, file_path, missing=None):
     """Replace .html routes with .astro routes."""
     original_content = content
+    routes = load_route_table()
     
     # Pattern to match /jng/...html routes
     pattern = r'(href=["\'])(/jng/[^"\']+)\.html(["\'])'
@@ -21,8 +27,12 @@ def fix_html_routes(content, file_path):
         route = match.group(2)
         suffix = match.group(3)
         
-        # Remove .html extension
+        # Remove .html extension, if a page serves the result
         new_route = route
+        if not routes.exists(new_route):
+            if missing is not None:
+                missing.append(f"{route}.html")
+            return match.group(0)
         return f"{prefix}{new_route}{suffix}"
     
     new_content = re.sub(pattern, replace_func, content)
@@ -35,12 +45,13 @@ def main():
     
     fixed_count = 0
     files_updated = []
+    missing = []
     
     # Process all .astro files in jng directory
     for astro_file in (SRC_DIR / "jng").rglob("*.astro"):
         try:
             content = astro_file.read_text(encoding='utf-8')
-            new_content, changed = fix_html_routes(content, astro_file)
+            new_content, changed = fix_html_routes(content, astro_file, missing)
             
             if changed:
                 astro_file.write_text(new_content, encoding='utf-8')
@@ -52,6 +63,8 @@ def main():
     
     print(f"\nFixed {fixed_count} file(s)")
     print(f"Updated {len(files_updated)} file(s)")
+    for route in sorted(set(missing)):
+        print(f"✗ {route}: no route without the extension, left as is")
 
 if __name__ == "__main__":
     main()
@@ -9,19 +9,13 @@ Find and fix missing image references.
 """
 
 import os
-import re
 import shutil
 import json
 from pathlib import Path
-from urllib.parse import unquote
+from urllib.parse import unquote, urlsplit
 
-try:
-    from PIL import Image
-except ImportError:
-    print("ERROR: Pillow (PIL) is not installed.")
-    print("Please install it using: pip install Pillow")
-    import sys
-    sys.exit(1)
+from asset_tools.references import split_srcset
+from asset_tools.tokenizer import tokenize
 
 # Base directories
 BASE_DIR = Path(__file__).parent.parent
@@ -44,19 +38,18 @@ def extract_image_paths_from_file(file_path):
     
     paths = set()
     
-    # Pattern for /cdn-assets/ paths
-    patterns = [
-        r'/cdn-assets/([^"\'\s\)]+\.(?:jpg|jpeg|png|gif|bmp|tiff|tif|avif|webp))',
-        r'cdn-assets/([^"\'\s\)]+\.(?:jpg|jpeg|png|gif|bmp|tiff|tif|avif|webp))',
-        r'\.\./cdn-assets/([^"\'\s\)]+\.(?:jpg|jpeg|png|gif|bmp|tiff|tif|avif|webp))',
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE)
-        for match in matches:
-            # Decode URL encoding
-            decoded = unquote(match)
-            paths.add(decoded)
+    for token in tokenize(content, file_path):
+        if not token.value or 'cdn-assets/' not in token.value or token.quote == '{':
+            continue
+        candidates = split_srcset(token.value) if token.name and token.name.lower() == 'srcset' else [token.value]
+        for candidate in candidates:
+            if 'cdn-assets/' not in candidate or '${' in candidate:
+                continue
+            # Path below cdn-assets/, also for relative ../cdn-assets/ references
+            path_in_cdn = urlsplit(candidate).path.split('cdn-assets/', 1)[-1]
+            if Path(path_in_cdn).suffix.lower() in IMAGE_EXTENSIONS:
+                # Decode URL encoding
+                paths.add(unquote(path_in_cdn))
     
     return list(paths)
 
@@ -117,6 +110,12 @@ def find_in_legacy(path_in_cdn):
 
 def convert_to_webp(input_path, output_path):
     """Convert image to WebP."""
+    # Imported here so finding missing images works without Pillow
+    try:
+        from PIL import Image
+    except ImportError:
+        print(f"  Error converting {input_path}: Pillow (PIL) is not installed (pip install Pillow)")
+        return False
     try:
         with Image.open(input_path) as img:
             # Handle different modes
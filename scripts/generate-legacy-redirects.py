@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Generate the redirect table for legacy .html URLs.
+
+Walks src-legacy/jng and maps every page the Webflow export served
+(/jng/aulas/foo.html, /jng/course.html, ...) to its new route with the same
+rules as the link fixers: drop .html, keep routes that still exist, apply
+scripts/jng-route-map.json plus the mappings derived from src/pages, and
+finally drop the /jng prefix. Every target is checked against the route
+table before anything is written.
+
+The table is written to src/data/legacy-html-redirects.json as a flat
+{old path: new route} object; src/middleware.ts answers those paths with a
+301 before authentication runs. Paths already covered by
+src/data/legacy-redirects.json (Astro redirects) are left out.
+
+When src-legacy/ is not checked out, the legacy URLs are derived from the
+pages (/jng/<route>.html), which is how the migration laid them out.
+
+Usage:
+    python3 scripts/generate-legacy-redirects.py
+    python3 scripts/generate-legacy-redirects.py --dry-run
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from asset_tools.paths import BASE_DIR, LEGACY_DIR, SRC_DIR
+from asset_tools.routes import PAGE_EXTENSIONS, load_route_table
+from asset_tools.route_map import (
+    REDIRECTS_FILE,
+    ROUTE_MAP_FILE,
+    build_legacy_redirects,
+    generate_route_map,
+    legacy_urls,
+    load_route_map,
+    verify_targets,
+)
+
+OUTPUT_FILE = SRC_DIR / "data" / "legacy-html-redirects.json"
+LEGACY_PREFIX = "/jng"
+ERROR_ROUTES = {"/404", "/500"}
+
+
+def derived_legacy_url(route):
+    """Legacy URL of a page when src-legacy/ is missing: /course -> /jng/course.html."""
+    if route == "/":
+        return LEGACY_PREFIX + "/index.html"
+    if route.startswith(LEGACY_PREFIX + "/"):
+        return route + ".html"
+    return LEGACY_PREFIX + route + ".html"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Legacy .html redirect table generator")
+    parser.add_argument("--legacy-dir", type=Path, default=LEGACY_DIR / "jng", help="Legacy Webflow export")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="Redirect table to write")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing the table")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("LEGACY REDIRECT TABLE")
+    print("=" * 70)
+
+    table = load_route_table()
+    route_map = generate_route_map(table, LEGACY_PREFIX)
+    if ROUTE_MAP_FILE.exists():
+        route_map.update(load_route_map(ROUTE_MAP_FILE))
+
+    if args.legacy_dir.exists():
+        urls = legacy_urls(args.legacy_dir, LEGACY_PREFIX)
+        print(f"Legacy pages in {args.legacy_dir}: {len(urls)}")
+    else:
+        urls = sorted(derived_legacy_url(route) for route, page in table.static.items()
+                      if page.startswith("src/pages/") and page.endswith(PAGE_EXTENSIONS)
+                      and route not in ERROR_ROUTES)
+        print(f"{args.legacy_dir} not found; derived {len(urls)} legacy URLs from src/pages")
+
+    skip = set()
+    if REDIRECTS_FILE.exists():
+        with open(REDIRECTS_FILE, "r", encoding="utf-8") as f:
+            skip = set(json.load(f))
+    redirects, unmapped = build_legacy_redirects(urls, table, route_map, LEGACY_PREFIX, skip)
+
+    missing = verify_targets(redirects, table)
+    for old, new in missing:
+        print(f"✗ {old} -> {new}: target does not exist")
+    for url in unmapped:
+        print(f"  No route for {url}")
+
+    print()
+    print(f"Redirects: {len(redirects)}")
+    print(f"Unmapped legacy URLs: {len(unmapped)}")
+    if missing:
+        return 1
+    if not args.dry_run:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(redirects, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"✓ Table written to {args.output.relative_to(BASE_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Generate a deterministic synthetic site for scale testing.
+
+Writes <out>/src/pages, <out>/public/cdn-assets and <out>/manifest.json
+(the injected broken links and asset references, for checking audit
+results). The same options always produce the same files. The audit
+scripts only read the repo's own src/ and public/, so audit the output
+through the library instead: ``asset_tools.watch.AuditIndex(src_dir=<out>/src,
+public_dir=<out>/public, pages_dir=<out>/src/pages).build()`` finds
+every manifest entry (plus the legacy /jng/*.html links, which are
+generated without targets). Or benchmark with
+`run-benchmarks.py --synthetic PAGES`.
+
+Usage:
+    python3 scripts/generate-synthetic-corpus.py                          # 1k pages, 10k assets
+    python3 scripts/generate-synthetic-corpus.py --pages 10000 --assets 100000
+    python3 scripts/generate-synthetic-corpus.py --seed 7 --broken-link-rate 0.05 --out /tmp/site
+"""
+
+import sys
+import time
+import shutil
+import argparse
+from pathlib import Path
+
+from asset_tools.paths import CACHE_DIR
+from asset_tools.synthetic import DEFAULTS, SyntheticSite
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Deterministic synthetic site generator")
+    parser.add_argument("--out", type=Path, help="Output directory (default scripts/.cache/synthetic/<pages>-<assets>-<seed>)")
+    parser.add_argument("--force", action="store_true", help="Replace the output directory if it exists")
+    for name, default in DEFAULTS.items():
+        option = "--" + name.replace("_", "-")
+        if isinstance(default, int):
+            parser.add_argument(option, type=int, default=default, help=f"default {default}")
+        else:
+            parser.add_argument(option, type=float, default=default, help=f"default {default}")
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) for name in DEFAULTS}
+    out = args.out or CACHE_DIR / "synthetic" / f"{args.pages}-{args.assets}-{args.seed}"
+
+    print("=" * 70)
+    print("SYNTHETIC CORPUS")
+    print("=" * 70)
+    if out.exists():
+        if not args.force:
+            print(f"✗ {out} exists; use --force to replace it")
+            return 1
+        shutil.rmtree(out)
+
+    started = time.perf_counter()
+    manifest = SyntheticSite(**params).write(out)
+    print(f"Pages: {manifest['pages']}")
+    print(f"Assets: {manifest['assets']}")
+    print(f"Links: {manifest['links']}")
+    print(f"Broken links: {len(manifest['broken_links'])}")
+    print(f"Broken asset references: {len(manifest['broken_assets'])}")
+    print(f"✓ Written to {out} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
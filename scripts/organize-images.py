@@ -16,6 +16,10 @@ from pathlib import Path
 from collections import defaultdict
 from urllib.parse import unquote
 
+from asset_tools.catalog import open_catalog
+from asset_tools.references import split_srcset
+from asset_tools.tokenizer import tag_attributes, tokenize
+
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
 PUBLIC_DIR = BASE_DIR / "public"
@@ -25,16 +29,6 @@ MAPPING_FILE = BASE_DIR / "scripts" / "image-mapping.json"
 # Image extensions
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.avif', '.webp', '.svg'}
 
-# Patterns to find image references
-IMAGE_REF_PATTERNS = [
-    r'src=["\'](/cdn-assets/[^"\']+)["\']',
-    r'href=["\'](/cdn-assets/[^"\']+)["\']',
-    r'url\(["\']?(/cdn-assets/[^"\']+)["\']?\)',
-    r'background-image:\s*url\(["\']?(/cdn-assets/[^"\']+)["\']?\)',
-    r'ogImage=["\'](/cdn-assets/[^"\']+)["\']',
-    r"ogImage=['\"](/cdn-assets/[^\"']+)['\"]",
-]
-
 def find_all_images():
     """Find all image files in cdn-assets."""
     images = {}
@@ -88,23 +82,29 @@ def find_image_references():
         except Exception:
             continue
         
-        for pattern in IMAGE_REF_PATTERNS:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                ref_path = match.group(1)
-                decoded = unquote(ref_path)
-                
-                # Extract context
-                start = max(0, match.start() - 100)
-                end = min(len(content), match.end() + 100)
-                context = content[start:end]
-                
-                # Try to extract alt text or nearby text
-                alt_match = re.search(r'alt=["\']([^"\']+)["\']', context, re.IGNORECASE)
-                alt_text = alt_match.group(1) if alt_match else None
-                
-                references[decoded].append({
+        tokens = list(tokenize(content, file_path))
+        tags = tag_attributes(tokens)
+        for token in tokens:
+            if not token.value or '/cdn-assets/' not in token.value or token.quote == '{':
+                continue
+            candidates = split_srcset(token.value) if token.name and token.name.lower() == 'srcset' else [token.value]
+            
+            # Alt text from the same tag, when the reference is an attribute
+            attrs = tags.get(token.tag_start, {}) if token.tag_start is not None else {}
+            alt = attrs.get('alt')
+            alt_text = alt.value if alt is not None and alt.value and alt.quote != '{' else None
+            
+            # Extract context
+            start = max(0, token.start - 100)
+            end = min(len(content), token.end + 100)
+            context = content[start:end]
+            
+            for ref_path in candidates:
+                if not ref_path.startswith('/cdn-assets/') or '${' in ref_path:
+                    continue
+                references[unquote(ref_path)].append({
                     "file": str(file_path.relative_to(BASE_DIR)),
-                    "line": content[:match.start()].count('\n') + 1,
+                    "line": token.line,
                     "context": context,
                     "alt": alt_text,
                 })
@@ -327,6 +327,13 @@ def main():
     with open(MAPPING_FILE, "w", encoding="utf-8") as f:
         json.dump(mapping, f, indent=2, ensure_ascii=False)
     print(f"   Saved to: {MAPPING_FILE}")
+    with open_catalog() as catalog:
+        catalog.upsert_mappings("image-mapping", [
+            (item["old_path"], item["new_path"], item["category"],
+             {"old_relative": item["old_relative"], "new_relative": item["new_relative"], "new_name": item["new_name"]})
+            for item in mapping.values()
+        ])
+    print("   Updated asset catalog")
     
     # Print summary
     print("\n" + "=" * 70)
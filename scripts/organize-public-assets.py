@@ -11,6 +11,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+from asset_tools.classifier import load_classifier
+
 # Base directory
 BASE_DIR = Path(__file__).parent.parent
 PUBLIC_DIR = BASE_DIR / "public"
@@ -29,88 +31,16 @@ NEW_STRUCTURE = {
     "other": "misc"
 }
 
-# File type mappings
-FILE_CATEGORIES = {
-    "favicon": ["favicon", "retina"],
-    "logo": ["logo", "brand", "wells-fargo", "higlobe", "revelo", "braintrust", "cambly", 
-             "vanhack", "strider", "mercord", "flatirons", "techfx", "adaflow", "langate",
-             "planner", "very-good-ventures", "yougov", "axonius", "webfxinc", "mobiz",
-             "propel", "bwisemedia", "intersec", "decentralized", "itscout", "pix4d",
-             "airalocom", "truelogic", "whiz1", "brokerkit", "open-english", "vicarius",
-             "goto", "onfleet", "thales", "partner"],
-    "icon": ["icon", "x-icon", "linkedin", "google", "bing", "duckduckgo", "yahoo"],
-    "screenshot": ["screenshot", "untitled", "image", "frame"],
-    "graphic": ["vector", "wrapper", "mesh", "gemini", "currency", "usdbrl"],
-    "photo": ["husky", "channels4", "profile"],
-    "css": ["css"],
-    "js": ["js", "webflow"]
-}
+# Classification rules (exact names, keywords, extension fallbacks) live in
+# scripts/asset-categories.json so new partner logos need no code change
+CLASSIFIER = load_classifier()
 
 # Name mappings for common files
-KNOWN_NAMES = {
-    "642aa9b6129f71848c627af5_favicon.jpg": "favicon.jpg",
-    "642aa9ba69d01ce76135f2d0_retina.jpg": "apple-touch-icon.jpg",
-    "64823ad1f11f6a5ee085b6c1_Vectors-Wrapper.svg": "logo-vectors-wrapper.svg",
-    "64823ad2f11f6a5ee085b6d9_Vectors-Wrapper.svg": "logo-vectors-wrapper-alt.svg",
-    "64a93447a4d8d06ce540f5fc_wells-fargo.svg": "logo-wells-fargo.svg",
-    "657cb98d8f25b29d4ddda87a_usdbrl_cur (1).svg": "currency-usdbrl.svg",
-    "66fa20663b706c601554155b_og-image-jng.jpg": "og-image.jpg",
-    "67563aa17278edf4cf79c3cb_logo-small_white.svg": "logo-small-white.svg",
-    "68838c5bc52c45d16d1c8bec_logo-techfx 1.svg": "logo-techfx.svg",
-    "jobnagringa.webflow.shared.aca489c6b.min.css": "webflow-shared.min.css",
-    "webflow.d94da6a8.ea62f8e5992eb517.js": "webflow-main.js",
-    "webflow.schunk.59c6248219f37ae8.js": "webflow-chunk-1.js",
-    "webflow.schunk.85d4c368d7c8f770.js": "webflow-chunk-2.js",
-}
+KNOWN_NAMES = CLASSIFIER.known_names
 
 def categorize_file(filename):
     """Categorize a file based on its name."""
-    filename_lower = filename.lower()
-    
-    # Check known names first
-    if filename in KNOWN_NAMES:
-        new_name = KNOWN_NAMES[filename]
-        if "favicon" in new_name or "apple-touch" in new_name:
-            return "favicons", new_name
-        elif "logo" in new_name:
-            return "logos", new_name
-        elif "icon" in new_name:
-            return "icons", new_name
-        elif "og-image" in new_name:
-            return "graphics", new_name
-    
-    # Check file categories
-    for category, keywords in FILE_CATEGORIES.items():
-        if any(keyword in filename_lower for keyword in keywords):
-            if category == "favicon":
-                return "favicons", None
-            elif category == "logo":
-                return "logos", None
-            elif category == "icon":
-                return "icons", None
-            elif category == "screenshot":
-                return "screenshots", None
-            elif category == "graphic":
-                return "graphics", None
-            elif category == "photo":
-                return "photos", None
-            elif category == "css":
-                return "css", None
-            elif category == "js":
-                return "js", None
-    
-    # Default categorization by extension
-    ext = Path(filename).suffix.lower()
-    if ext in [".css"]:
-        return "css", None
-    elif ext in [".js"]:
-        return "js", None
-    elif ext in [".svg"]:
-        return "icons", None
-    elif ext in [".jpg", ".jpeg", ".png", ".avif", ".webp", ".gif"]:
-        return "graphics", None
-    
-    return "other", None
+    return CLASSIFIER.classify(filename)
 
 def clean_filename(filename, original_filename=None):
     """Clean and standardize a filename."""
@@ -252,9 +182,12 @@ def organize_files():
     migration_map = {}
     category_counts = defaultdict(int)
     
-    for rel_path, file_info in files_map.items():
+    # Classify the whole listing in one pass
+    categories = CLASSIFIER.classify_many(info["name"] for info in files_map.values())
+    used_names = set()
+    
+    for (rel_path, file_info), (category, known_name) in zip(files_map.items(), categories):
         old_name = file_info["name"]
-        category, known_name = categorize_file(old_name)
         
         if known_name:
             new_name = known_name
@@ -262,7 +195,7 @@ def organize_files():
             new_name = generate_new_name(old_name, category)
         
         # Ensure unique names
-        if new_name in [m["new_name"] for m in migration_map.values()]:
+        if new_name in used_names:
             base_name = Path(new_name).stem
             ext = Path(new_name).suffix
             counter = category_counts[category]
@@ -270,6 +203,7 @@ def organize_files():
             new_name = f"{base_name}-{counter}{ext}"
         else:
             category_counts[category] += 1
+        used_names.add(new_name)
         
         # Determine new directory (within cdn-assets)
         new_dir = NEW_STRUCTURE.get(category, "misc")
@@ -294,6 +228,10 @@ def organize_files():
     for cat, count in sorted(category_counts.items()):
         print(f"  {cat}: {count} files")
     
+    print("\nRule hits:")
+    for rule, count in CLASSIFIER.hit_report():
+        print(f"  {rule}: {count}")
+    
     return migration_map
 
 if __name__ == "__main__":
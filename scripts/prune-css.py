@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Prune the Webflow stylesheet down to the selectors the site can use.
+
+Builds an index of every class, id and tag used in src/ (class and
+class:list attributes, ids, start tags and class names in script strings)
+plus the allowlist in scripts/css-prune-allowlist.json for classes added at
+runtime by webflow.js, then drops every rule whose selectors cannot match.
+
+Usage:
+    python3 scripts/prune-css.py                      # write src/styles/webflow.pruned.css
+    python3 scripts/prune-css.py --dry-run            # report only
+    python3 scripts/prune-css.py --stylesheet src/styles/global.css --output /tmp/global.css
+    python3 scripts/prune-css.py --profile            # also write cProfile/collapsed stacks
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from asset_tools.paths import BASE_DIR, SRC_DIR, SCRIPTS_DIR
+from asset_tools.css import collect_used_selectors, load_allowlist, prune_stylesheet
+from asset_tools.references import iter_source_files
+from asset_tools.profiling import add_profile_argument, profiled, span
+
+STYLESHEET = SRC_DIR / "styles" / "webflow.css"
+ALLOWLIST_FILE = SCRIPTS_DIR / "css-prune-allowlist.json"
+REPORT_FILE = SCRIPTS_DIR / "css-prune-report.json"
+TEMPLATE_EXTENSIONS = ('.astro', '.ts', '.tsx', '.js', '.jsx', '.mdx', '.md', '.html')
+
+
+def format_kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Used-selector CSS pruning")
+    parser.add_argument("--stylesheet", type=Path, default=STYLESHEET, help="Stylesheet to prune")
+    parser.add_argument("--output", type=Path, help="Pruned stylesheet (default: <name>.pruned.css)")
+    parser.add_argument("--allowlist", type=Path, default=ALLOWLIST_FILE, help="Runtime classes/ids/tags to keep")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the report")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiled("prune-css", args.profile):
+        return prune(args)
+
+
+def prune(args):
+    """Prune the stylesheet and print the report."""
+    output = args.output or args.stylesheet.with_name(args.stylesheet.stem + ".pruned.css")
+    started = time.perf_counter()
+    files = list(iter_source_files((SRC_DIR,), TEMPLATE_EXTENSIONS))
+    with span("index"):
+        used = collect_used_selectors(files, load_allowlist(args.allowlist))
+    text = args.stylesheet.read_text(encoding="utf-8", errors="replace")
+    with span("prune"):
+        css, stats = prune_stylesheet(text, used)
+    elapsed = time.perf_counter() - started
+
+    print("=" * 70)
+    print("CSS PRUNING REPORT")
+    print("=" * 70)
+    print(f"Index: {len(used.names['class'])} classes, {len(used.names['id'])} ids, "
+          f"{len(used.names['tag'])} tags from {len(files)} files")
+    print()
+    print(f"{'Section':<45} {'Before':>10} {'After':>10} {'Rules':>11}")
+    for section, entry in stats.items():
+        print(f"{section[:45]:<45} {format_kb(entry['bytes_before']):>10} {format_kb(entry['bytes_after']):>10} "
+              f"{entry['rules_after']:>5}/{entry['rules_before']:<5}")
+
+    before = len(text.encode("utf-8"))
+    after = len(css.encode("utf-8"))
+    report = {
+        "stylesheet": args.stylesheet.resolve().relative_to(BASE_DIR).as_posix(),
+        "bytes_before": before,
+        "bytes_after": after,
+        "sections": stats,
+    }
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print()
+    print("=" * 70)
+    print(f"{format_kb(before)} -> {format_kb(after)} ({(1 - after / before) * 100:.0f}% removed) in {elapsed * 1000:.0f} ms")
+    if not args.dry_run:
+        output.write_text(css, encoding="utf-8")
+        print(f"✓ Pruned stylesheet written to {output}")
+    print(f"Report saved to: {REPORT_FILE.relative_to(BASE_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,18 +2,22 @@
 """
 Remove .html extensions from href attributes in Astro files.
 Converts URLs like /modulo/networking.html to /modulo/networking
-Preserves hash fragments and query parameters.
+Preserves hash fragments and query parameters. A link is only rewritten
+when the route table of src/pages (and public/) serves the new URL.
 """
 
 import re
 from pathlib import Path
 
+from asset_tools.routes import load_route_table
+
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
 
-def remove_html_extension(content, file_path):
+def remove_html_extension(content, file_path, skipped=None):
     """Remove .html extension from internal href attributes."""
     changes_made = []
+    routes = load_route_table()
     
     def replace_href(match):
         quote = match.group(1)  # Quote character (" or ')
@@ -31,6 +35,11 @@ def remove_html_extension(content, file_path):
         # Pattern handles: /page.html, /page.html#hash, /page.html?query, /page.html?query#hash
         new_href = re.sub(r'\.html(?=[#?]|$)', '', href)
         
+        if new_href != href and new_href.startswith('/') and not routes.exists(new_href):
+            if skipped is not None:
+                skipped.append(f'{href} (no route for {new_href})')
+            return match.group(0)
+        
         if new_href != href:
             changes_made.append(f'{href} -> {new_href}')
             return f'href={quote}{new_href}{quote}'
@@ -43,13 +52,13 @@ def remove_html_extension(content, file_path):
     
     return new_content, changes_made
 
-def process_file(file_path):
+def process_file(file_path, skipped=None):
     """Process a single file and remove .html extensions."""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        new_content, changes = remove_html_extension(content, file_path)
+        new_content, changes = remove_html_extension(content, file_path, skipped)
         
         if changes:
             with open(file_path, 'w', encoding='utf-8') as f:
@@ -65,6 +74,7 @@ def main():
     """Main function to process all Astro files."""
     total_changes = 0
     files_modified = 0
+    skipped = []
     
     # Find all .astro files in src directory
     astro_files = list(SRC_DIR.rglob("*.astro"))
@@ -72,7 +82,7 @@ def main():
     print(f"Found {len(astro_files)} Astro files to process\n")
     
     for file_path in sorted(astro_files):
-        changes = process_file(file_path)
+        changes = process_file(file_path, skipped)
         
         if changes:
             files_modified += 1
@@ -88,6 +98,9 @@ def main():
     print(f"Summary:")
     print(f"  Files modified: {files_modified}")
     print(f"  Total changes: {total_changes}")
+    print(f"  Left alone (target route missing): {len(skipped)}")
+    for link in skipped[:10]:
+        print(f"    ✗ {link}")
     print(f"{'='*50}")
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark the asset tooling hot paths against the fixture corpus.
+
+Covers reference extraction, multi-pattern and route rewriting, srcset
+updates, route resolution, hashing and encode throughput per format and
+effort (encode benchmarks need Pillow). Results can be appended to
+scripts/.cache/benchmark-history.json (kept per machine, not committed)
+and compared with the latest entry.
+
+Usage:
+    python3 scripts/run-benchmarks.py                      # run and print
+    python3 scripts/run-benchmarks.py --add                # run and add to the history
+    python3 scripts/run-benchmarks.py --compare            # run and compare with the latest entry
+    python3 scripts/run-benchmarks.py --compare --threshold 20 --add
+    python3 scripts/run-benchmarks.py --show               # trends of the last entries
+    python3 scripts/run-benchmarks.py rewrite-routes resolve-routes
+    python3 scripts/run-benchmarks.py --synthetic 5000     # generated 5k-page site instead of the fixtures
+"""
+
+import sys
+import argparse
+
+from asset_tools.benchmarks import (
+    BENCHMARKS,
+    DEFAULT_THRESHOLD,
+    HISTORY_FILE,
+    Corpus,
+    add_to_history,
+    compare,
+    load_history,
+    run_benchmarks,
+    save_history,
+)
+from asset_tools.paths import BASE_DIR
+
+
+def format_time(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.2f} ms"
+    return f"{seconds * 1_000_000:.1f} µs"
+
+
+def format_throughput(result):
+    value, unit = result["throughput"], result["unit"]
+    if unit == "B":
+        return f"{value / 1024 / 1024:.1f} MB/s"
+    if unit == "px":
+        return f"{value / 1_000_000:.2f} Mpx/s"
+    return f"{value:,.0f} {unit}/s"
+
+
+def print_result(name, result, skipped):
+    if skipped:
+        print(f"  {name:<28} skipped ({skipped})")
+    else:
+        print(f"  {name:<28} {format_time(result['median_s']):>10}  "
+              f"(min {format_time(result['min_s'])})  {format_throughput(result)}")
+
+
+def show_trends(history, last=10):
+    entries = history["entries"][-last:]
+    if not entries:
+        print("No history entries found.")
+        print("Run 'python3 scripts/run-benchmarks.py --add' to add entries.")
+        return
+    names = sorted({name for entry in entries for name in entry["results"]})
+    print(f"{'benchmark':<28} " + " ".join(f"{entry['git']['commit']:>10}" for entry in entries))
+    for name in names:
+        cells = []
+        for entry in entries:
+            result = entry["results"].get(name)
+            cells.append(f"{format_time(result['median_s']) if result else '-':>10}")
+        print(f"{name:<28} " + " ".join(cells))
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Asset tooling benchmarks")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run (default: all of {len(BENCHMARKS)})")
+    parser.add_argument("--add", action="store_true", help="Add the results to the history")
+    parser.add_argument("--compare", action="store_true", help="Compare with the latest history entry")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD * 100,
+                        help="Slowdown in percent reported as a regression (default 10)")
+    parser.add_argument("--show", action="store_true", help="Show the history and exit")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per sample")
+    parser.add_argument("--synthetic", type=int, metavar="PAGES",
+                        help="Run against a generated site with this many pages (10 assets per page)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the generated site")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+
+    if args.synthetic and (args.add or args.compare):
+        parser.error("--add and --compare only apply to the fixture corpus")
+
+    history = load_history()
+    if args.show:
+        show_trends(history)
+        return 0
+
+    print("=" * 70)
+    print("ASSET TOOLING BENCHMARKS")
+    print("=" * 70)
+    corpus = None
+    if args.synthetic:
+        corpus = Corpus.synthetic(pages=args.synthetic, assets=args.synthetic * 10, seed=args.seed)
+        print(f"Synthetic corpus: {len(corpus.pages)} pages, {corpus.bytes / 1024 / 1024:.1f} MB")
+    results, skipped = run_benchmarks(args.benchmarks, corpus, repeat=args.repeat, min_time=args.min_time,
+                                      report=print_result)
+
+    exit_code = 0
+    if args.compare:
+        print()
+        if not history["entries"]:
+            print("No history entry to compare with; run with --add first.")
+        else:
+            baseline = history["entries"][-1]
+            print(f"Compared with {baseline['git']['commit']} ({baseline['timestamp']}), "
+                  f"threshold {args.threshold:.0f}%:")
+            rows = compare(baseline["results"], results, args.threshold / 100)
+            for name, before, after, change, regressed in rows:
+                mark = "✗" if regressed else "✓"
+                print(f"  {mark} {name:<28} {format_time(before):>10} → {format_time(after):>10}  {change:+.1%}")
+            regressions = [row for row in rows if row[4]]
+            if regressions:
+                print(f"\n✗ {len(regressions)} regression(s) above {args.threshold:.0f}%")
+                exit_code = 1
+            else:
+                print("\n✓ No regressions")
+
+    if args.add:
+        entry = add_to_history(history, results)
+        save_history(history)
+        print(f"\nAdded entry {entry['id']} to {HISTORY_FILE.relative_to(BASE_DIR)} "
+              f"({len(history['entries'])} entries)")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Run the image pipeline (organize → convert → rewrite → verify) in dependency order.
+
+Stages, their scripts, dependencies, input and output globs are declared
+in scripts/image-pipeline.json. A stage only runs when its script, inputs
+or outputs changed since its last successful run or a dependency reran;
+independent stages (applying the mapping and rewriting references) run
+concurrently. Fingerprints are kept in scripts/.cache/pipeline-state.json.
+
+Usage:
+    python3 scripts/run-pipeline.py                       # run what is out of date
+    python3 scripts/run-pipeline.py --explain             # say what would run and why
+    python3 scripts/run-pipeline.py convert-images-to-avif   # one stage and its dependencies
+    python3 scripts/run-pipeline.py --force organize-images
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from asset_tools.pipeline import PIPELINE_FILE, STATE_FILE, PipelineError, PipelineRunner, load_pipeline
+
+
+def select_stages(stages, names):
+    """The named stages plus everything they depend on, in order."""
+    by_name = {stage.name: stage for stage in stages}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise PipelineError(f"unknown stage(s): {', '.join(unknown)}")
+    wanted, stack = set(), list(names)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(by_name[name].deps)
+    return [stage for stage in stages if stage.name in wanted]
+
+
+def print_output(text):
+    for line in text.rstrip().splitlines()[-20:]:
+        print(f"    {line}")
+
+
+def report(event, name, detail):
+    if event == "skip":
+        print(f"- {name}: up to date")
+    elif event == "blocked":
+        print(f"✗ {name}: not run ({'; '.join(detail)})")
+    elif event == "start":
+        print(f"→ {name}: running ({'; '.join(detail)})")
+    else:
+        process = detail["process"]
+        mark = "✓" if event == "done" else "✗"
+        print(f"{mark} {name}: exit {process.returncode} in {detail['elapsed']:.1f}s")
+        if event == "fail":
+            print_output(process.stdout)
+            print_output(process.stderr)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Dependency-aware image pipeline runner")
+    parser.add_argument("stages", nargs="*", help="Stages to run (default: all), with their dependencies")
+    parser.add_argument("--pipeline", type=Path, default=PIPELINE_FILE, help="Pipeline definition")
+    parser.add_argument("--explain", action="store_true", help="List what would run and why, without running")
+    parser.add_argument("--force", nargs="*", metavar="STAGE", help="Rerun these stages (all when empty)")
+    parser.add_argument("--jobs", type=int, default=4, help="Stages to run at the same time")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("IMAGE PIPELINE")
+    print("=" * 70)
+
+    try:
+        stages = load_pipeline(args.pipeline)
+        if args.stages:
+            stages = select_stages(stages, args.stages)
+        if args.force is None:
+            force = []
+        else:
+            force = args.force or [stage.name for stage in stages]
+        force_unknown = set(force) - {stage.name for stage in stages}
+        if force_unknown:
+            raise PipelineError(f"unknown stage(s) to force: {', '.join(sorted(force_unknown))}")
+    except PipelineError as e:
+        print(f"✗ {e}")
+        return 2
+
+    runner = PipelineRunner(stages, STATE_FILE, jobs=args.jobs, force=force)
+
+    if args.explain:
+        for name, reasons in runner.plan():
+            if reasons:
+                print(f"→ {name}")
+                for reason in reasons:
+                    print(f"    {reason}")
+            else:
+                print(f"- {name}: up to date")
+        return 0
+
+    status = runner.run(report)
+    counts = {key: sum(1 for value in status.values() if value == key)
+              for key in ("ran", "skipped", "failed", "blocked")}
+    print()
+    print(f"Ran: {counts['ran']}, up to date: {counts['skipped']}, "
+          f"failed: {counts['failed']}, not run: {counts['blocked']}")
+    return 1 if counts["failed"] or counts["blocked"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Summarize the streaming (JSONL) log of an AVIF or WebP conversion run.
+
+Rebuilds the aggregate that the converters write to
+scripts/{avif,webp}-conversion-log.json from scripts/.cache/*.jsonl, the
+last record of every image winning, so an interrupted or resumed run can
+still be summarized.
+
+Usage:
+    python3 scripts/summarize-conversion-log.py avif
+    python3 scripts/summarize-conversion-log.py webp --write   # also rewrite webp-conversion-log.json
+    python3 scripts/summarize-conversion-log.py --log path/to/run.jsonl
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from asset_tools.paths import BASE_DIR, CACHE_DIR, SCRIPTS_DIR
+from asset_tools.runlog import read_records, summarize, write_summary
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Conversion log summarizer")
+    parser.add_argument("format", nargs="?", choices=("avif", "webp"), default="avif", help="Converter log to read")
+    parser.add_argument("--log", type=Path, help="JSONL log (default scripts/.cache/<format>-conversion-log.jsonl)")
+    parser.add_argument("--write", action="store_true", help="Rewrite the aggregate JSON log")
+    parser.add_argument("--output", type=Path, help="Aggregate JSON to write (default scripts/<format>-conversion-log.json)")
+    args = parser.parse_args()
+
+    log_path = args.log or CACHE_DIR / f"{args.format}-conversion-log.jsonl"
+    output = args.output or SCRIPTS_DIR / f"{args.format}-conversion-log.json"
+
+    print("=" * 70)
+    print("CONVERSION LOG SUMMARY")
+    print("=" * 70)
+    if not log_path.exists():
+        print(f"✗ {log_path} not found")
+        return 1
+
+    try:
+        aggregate = write_summary(log_path, output) if args.write else summarize(log_path)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    ends = [record for record in read_records(log_path) if record.get("event") == "end"]
+    print(f"Log: {log_path}")
+    print(f"Runs: {aggregate['runs']} ({len(ends)} finished, "
+          f"{sum(1 for record in ends if record.get('interrupted'))} interrupted)")
+    for section, entries in aggregate.items():
+        if isinstance(entries, list):
+            print(f"  {section}: {len(entries)}")
+
+    stats = aggregate.get("stats")
+    if stats and stats["files_converted"]:
+        before, after = stats["total_size_before"], stats["total_size_after"]
+        print(f"Size before: {before / 1024 / 1024:.1f} MB")
+        print(f"Size after: {after / 1024 / 1024:.1f} MB")
+        if before:
+            print(f"Size reduction: {(before - after) / before * 100:.1f}%")
+    peaks = [(entry["peak_rss"], entry) for entries in aggregate.values() if isinstance(entries, list)
+             for entry in entries if isinstance(entry, dict) and entry.get("peak_rss")]
+    if peaks:
+        peak, entry = max(peaks, key=lambda item: item[0])
+        name = entry.get("input") or entry.get("original") or entry.get("file") or entry.get("path")
+        print(f"Peak RSS: {peak / 1024 / 1024:.1f} MB ({name})")
+    timing = aggregate.get("timing")
+    if timing:
+        print(f"Last run: {timing['total_seconds']:.1f}s")
+        for path, entry in timing["spans"].items():
+            print(f"  {path:<30} {entry['seconds']:>9.3f}s {entry['calls']:>7} call(s)")
+
+    if args.write:
+        print(f"✓ Aggregate written to {output.relative_to(BASE_DIR) if output.is_relative_to(BASE_DIR) else output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
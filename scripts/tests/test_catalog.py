@@ -0,0 +1,87 @@
+"""
+Re-importing the legacy JSON state into the asset catalog.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools import catalog as catalog_module  # noqa: E402
+from asset_tools.catalog import AssetCatalog, import_legacy_json  # noqa: E402
+
+
+class LegacyImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.gif_map = self.tmp / "gif-reorganization-map.json"
+        self.avif_log = self.tmp / "avif-conversion-log.json"
+        importers = [
+            ("gif-reorganization-map.json", self.gif_map, catalog_module.import_gif_reorganization_map),
+            ("avif-conversion-log.json", self.avif_log, catalog_module.import_avif_conversion_log),
+        ]
+        patcher = mock.patch.object(catalog_module, "IMPORTERS", importers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.catalog = AssetCatalog(self.tmp / "catalog.db")
+        self.addCleanup(self.catalog.close)
+
+    def write(self, path, data):
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+    def test_reimport_drops_removed_mappings(self):
+        self.write(self.gif_map, {
+            "/a.gif": {"new_path": "gifs/a.gif"},
+            "/b.gif": {"new_path": "gifs/b.gif"},
+        })
+        import_legacy_json(self.catalog, changed_only=True)
+        self.assertEqual(self.catalog.count_mappings("gif-reorganization"), 2)
+
+        self.write(self.gif_map, {"/a.gif": {"new_path": "gifs/moved/a.gif"}})
+        counts = import_legacy_json(self.catalog, changed_only=True)
+        self.assertEqual(counts, {"gif-reorganization-map.json": 1})
+        self.assertEqual(self.catalog.mapping_dict("gif-reorganization"),
+                         {"/a.gif": "/cdn-assets/gifs/moved/a.gif"})
+
+        # Unchanged files are not imported again
+        self.assertEqual(import_legacy_json(self.catalog, changed_only=True), {})
+
+    def test_conversion_log_imports_kept_originals(self):
+        self.write(self.avif_log, {
+            "converted": [{"input": "images/a.png", "output": "images/a.avif", "size_before": 10, "size_after": 4}],
+            "kept_original": [{"input": "images/b.png",
+                               "decision": {"size_before": 7, "size_after": 7,
+                                            "reason": "AVIF is not smaller than the source"}}],
+        })
+        import_legacy_json(self.catalog)
+        kept = self.catalog.get_conversion(catalog_module.CDN_ASSETS_DIR / "images/b.png", "avif")
+        self.assertEqual(kept["status"], "kept_original")
+        self.assertEqual((kept["size_before"], kept["size_after"]), (7, 7))
+        self.assertIsNone(kept["output"])
+
+        # A later run's log replaces the earlier results
+        self.write(self.avif_log, {"kept_original": []})
+        import_legacy_json(self.catalog)
+        self.assertIsNone(self.catalog.get_conversion(catalog_module.CDN_ASSETS_DIR / "images/a.png", "avif"))
+
+    def test_failed_import_leaves_previous_rows(self):
+        self.write(self.gif_map, {"/a.gif": {"new_path": "gifs/a.gif"}})
+        import_legacy_json(self.catalog)
+
+        self.write(self.gif_map, {"/a.gif": {"new_path": "gifs/a.gif"}, "/b.gif": {}})
+        with self.assertRaises(KeyError):
+            import_legacy_json(self.catalog)
+        self.assertEqual(self.catalog.mapping_dict("gif-reorganization"), {"/a.gif": "/cdn-assets/gifs/a.gif"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+AssetFetcher against a local ThreadingHTTPServer.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import asyncio
+import hashlib
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools.fetcher import AssetFetcher  # noqa: E402
+
+BODY = b"\x89PNG fake image body " * 4096
+ETAG = '"v1"'
+LAST_MODIFIED = formatdate(0, usegmt=True)
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    """Serves /logo.png with validators; everything else is a 404."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        if self.path != "/logo.png":
+            self.send_error(404)
+            return
+        if self.headers.get("If-None-Match") == ETAG or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class AssetFetcherTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _AssetHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _AssetHandler.requests = []
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def fetch(self, *jobs):
+        async def run():
+            async with AssetFetcher(cache_dir=self.tmp / "cache", concurrency=2) as fetcher:
+                return await fetcher.fetch_all(jobs)
+        return asyncio.run(run())
+
+    def test_download_then_not_modified(self):
+        url = f"{self.base_url}/logo.png"
+        target = self.tmp / "out" / "logo.png"
+
+        first, = self.fetch((url, target))
+        self.assertEqual(first["status"], "downloaded", first["error"])
+        self.assertEqual(first["sha256"], hashlib.sha256(BODY).hexdigest())
+        self.assertEqual(first["bytes_transferred"], len(BODY))
+        self.assertEqual(target.read_bytes(), BODY)
+
+        # A new fetcher on the same cache revalidates instead of downloading
+        target.unlink()
+        second, = self.fetch((url, target))
+        self.assertEqual(second["status"], "not_modified", second["error"])
+        self.assertEqual(second["bytes_transferred"], 0)
+        self.assertEqual(target.read_bytes(), BODY)
+        _, headers = _AssetHandler.requests[-1]
+        self.assertEqual(headers.get("If-None-Match"), ETAG)
+        self.assertEqual(headers.get("If-Modified-Since"), LAST_MODIFIED)
+
+    def test_missing_asset_is_an_error(self):
+        target = self.tmp / "missing.png"
+        result, = self.fetch((f"{self.base_url}/missing.png", target))
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["error"], "HTTP 404")
+        self.assertFalse(target.exists())
+
+    def test_hash_mismatch_is_rejected(self):
+        url = f"{self.base_url}/logo.png"
+        target = self.tmp / "logo.png"
+        result, = self.fetch((url, target, "0" * 64))
+        self.assertEqual(result["status"], "error")
+        self.assertIn("Hash mismatch", result["error"])
+        self.assertFalse(target.exists())
+        # Nothing unverified is left in the cache
+        self.assertEqual([p for p in (self.tmp / "cache" / "blobs").rglob("*") if p.is_file()], [])
+        self.assertEqual(list((self.tmp / "cache" / "tmp").iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
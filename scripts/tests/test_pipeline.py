@@ -0,0 +1,131 @@
+"""
+Pipeline ordering, change detection and scheduling over a SyntheticSite tree.
+
+Stage scripts are not executed: ``_run_stage`` is replaced by a stub that
+records the call and "converts" the stage's inputs.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools import pipeline  # noqa: E402
+from asset_tools.pipeline import (PipelineError, PipelineRunner, Stage, explain, input_state,  # noqa: E402
+                                  topological_order)
+from asset_tools.synthetic import SyntheticSite  # noqa: E402
+
+PNG = "public/cdn-assets/**/*.png"
+AVIF = "public/cdn-assets/**/*.avif"
+
+
+class TopologicalOrderTest(unittest.TestCase):
+
+    def test_dependencies_come_first(self):
+        stages = {
+            "convert": Stage("convert", "convert.py", deps=["organize"]),
+            "rewrite": Stage("rewrite", "rewrite.py", deps=["convert", "organize"]),
+            "organize": Stage("organize", "organize.py"),
+        }
+        self.assertEqual([stage.name for stage in topological_order(stages)], ["organize", "convert", "rewrite"])
+
+    def test_cycle_and_unknown_dependency(self):
+        with self.assertRaisesRegex(PipelineError, "cycle: a -> b -> a"):
+            topological_order({"a": Stage("a", "a.py", deps=["b"]), "b": Stage("b", "b.py", deps=["a"])})
+        with self.assertRaisesRegex(PipelineError, "unknown stage 'missing'"):
+            topological_order({"a": Stage("a", "a.py", deps=["missing"])})
+
+
+class PipelineRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        SyntheticSite(pages=5, assets=200).write(self.tmp)
+        self.stages = topological_order({
+            "convert": Stage("convert", "convert.py", inputs=[PNG], outputs=[AVIF]),
+            "rewrite": Stage("rewrite", "rewrite.py", deps=["convert"], inputs=["src/pages/**/*.astro"]),
+        })
+        self.failing = set()
+        self.calls = []
+        self.lock = threading.Lock()
+        # Point the runner at the temporary tree instead of the repo
+        expand_globs = pipeline.expand_globs
+        for name, replacement in (
+            ("expand_globs", lambda patterns, base_dir=None: expand_globs(patterns, self.tmp)),
+            ("input_state", lambda stage, base_dir=None: input_state(stage, self.tmp)),
+        ):
+            patcher = mock.patch.object(pipeline, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(PipelineRunner, "_run_stage", self.run_stage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_stage(self, stage):
+        with self.lock:
+            self.calls.append(stage.name)
+        if stage.name == "convert":
+            for png in pipeline.expand_globs([PNG]):
+                (self.tmp / png).with_suffix(".avif").write_bytes(b"avif\n")
+        returncode = 1 if stage.name in self.failing else 0
+        return subprocess.CompletedProcess([stage.script], returncode, "", ""), 0.0
+
+    def runner(self):
+        return PipelineRunner(self.stages, state_file=self.tmp / "state.json")
+
+    def run_pipeline(self):
+        events = []
+        status = self.runner().run(lambda event, name, detail: events.append((event, name)))
+        return status, events
+
+    def test_second_run_skips_and_input_change_reruns(self):
+        status, _ = self.run_pipeline()
+        self.assertEqual(status, {"convert": "ran", "rewrite": "ran"})
+        self.assertEqual(self.runner().plan(), [("convert", []), ("rewrite", [])])
+
+        status, _ = self.run_pipeline()
+        self.assertEqual(status, {"convert": "skipped", "rewrite": "skipped"})
+
+        png = pipeline.expand_globs([PNG])[0]
+        os.utime(self.tmp / png, ns=(0, 0))
+        self.assertEqual(self.runner().plan(), [
+            ("convert", [f"inputs modified: {png}"]),
+            ("rewrite", ["dependency 'convert' reran"]),
+        ])
+        self.calls.clear()
+        status, _ = self.run_pipeline()
+        self.assertEqual(status, {"convert": "ran", "rewrite": "ran"})
+        self.assertEqual(self.calls, ["convert", "rewrite"])
+
+    def test_failure_blocks_dependents(self):
+        self.failing.add("convert")
+        status, events = self.run_pipeline()
+        self.assertEqual(status, {"convert": "failed", "rewrite": "blocked"})
+        self.assertIn(("blocked", "rewrite"), events)
+        self.assertEqual(self.runner().plan()[0][1][0], "last run failed")
+
+    def test_explain(self):
+        convert = self.stages[0]
+        self.assertEqual(explain(convert, None, {}, []), ["never ran"])
+        inputs = input_state(convert, self.tmp)
+        previous = {"status": "ok", "definition": pipeline.definition_hash(convert), "inputs": inputs}
+        self.assertEqual(explain(convert, previous, inputs, [], self.tmp), [])
+        added = dict(inputs, **{"public/cdn-assets/new.png": [1, 1]})
+        self.assertEqual(explain(convert, previous, added, ["organize"], self.tmp),
+                         ["dependency 'organize' reran", "inputs added: public/cdn-assets/new.png"])
+        build = Stage("build", "build.py", inputs=[PNG], outputs=["dist/**/*.html"])
+        previous = {"status": "ok", "definition": pipeline.definition_hash(build), "inputs": inputs}
+        self.assertEqual(explain(build, previous, inputs, [], self.tmp), ["outputs missing"])
+
+if __name__ == "__main__":
+    unittest.main()
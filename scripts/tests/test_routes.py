@@ -0,0 +1,59 @@
+"""
+RouteTable against a generated SyntheticSite.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools.routes import RouteTable, normalize_link  # noqa: E402
+from asset_tools.synthetic import SyntheticSite  # noqa: E402
+
+
+class RouteTableTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.site = SyntheticSite(pages=80, assets=200)
+        cls.manifest = cls.site.write(cls.tmp)
+        cls.table = RouteTable.from_directory(cls.tmp / "src" / "pages", cls.tmp / "public")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_every_page_is_served(self):
+        for route in self.site.routes:
+            self.assertTrue(self.table.exists(route), route)
+            self.assertTrue(self.table.exists(route + "/?utm=x#top"), route)
+        self.assertIn("/perfil/[...rest]", self.table.routes())
+
+    def test_broken_and_legacy_links_are_not_served(self):
+        self.assertTrue(self.manifest["broken_links"])
+        for link in self.manifest["broken_links"]:
+            self.assertFalse(self.table.exists(link["href"]), link)
+        for legacy, route in self.site.route_map.items():
+            self.assertFalse(self.table.exists(legacy + ".html"), legacy)
+            self.assertTrue(self.table.exists(route), route)
+
+    def test_rest_parameter(self):
+        page, params = self.table.resolve("/perfil/ana/vagas")
+        self.assertTrue(page.endswith("perfil/[...rest].astro"))
+        self.assertEqual(params, {"rest": "ana/vagas"})
+        self.assertEqual(self.table.resolve("/perfil")[1], {"rest": ""})
+
+    def test_public_files(self):
+        path = next(self.site.iter_asset_paths())
+        self.assertTrue(self.table.exists("/cdn-assets/" + path))
+        self.assertEqual(normalize_link("/vagas/?page=2"), "/vagas")
+
+
+if __name__ == "__main__":
+    unittest.main()
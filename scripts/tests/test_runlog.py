@@ -0,0 +1,76 @@
+"""
+RunLog resume and summarize over a SyntheticSite-sized run.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools.runlog import RunLog, latest_items, summarize  # noqa: E402
+from asset_tools.synthetic import SyntheticSite  # noqa: E402
+
+TEMPLATE = {"converted": [], "errors": [], "stats": {"total_size_before": 0, "total_size_after": 0}}
+
+
+class RunLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.log = self.tmp / "conversion-log.jsonl"
+        self.keys = list(SyntheticSite(pages=1, assets=200).iter_asset_paths())
+
+    def convert(self, log, key, fail=False):
+        if fail:
+            log.record("errors", key, {"file": key, "error": "decode failed"})
+        else:
+            log.record("converted", key, {"input": key}, size_before=100, size_after=40)
+
+    def test_interrupted_run_resumes(self):
+        half = len(self.keys) // 2
+        with self.assertRaises(KeyboardInterrupt):
+            with RunLog(self.log, TEMPLATE) as log:
+                for i, key in enumerate(self.keys):
+                    if i == half:
+                        raise KeyboardInterrupt
+                    self.convert(log, key, fail=i == 0)
+        # A crash mid-write leaves a truncated line
+        with open(self.log, "a", encoding="utf-8") as f:
+            f.write('{"event": "item", "sect')
+
+        with RunLog(self.log, TEMPLATE, resume=True) as log:
+            todo = [key for key in self.keys if not log.is_done(key)]
+            self.assertEqual(todo, [self.keys[0]] + self.keys[half:])
+            for key in todo:
+                self.convert(log, key)
+
+        summary = summarize(self.log)
+        self.assertEqual(summary["runs"], 2)
+        self.assertEqual(summary["errors"], [])
+        self.assertEqual(sorted(entry["input"] for entry in summary["converted"]), sorted(self.keys))
+        self.assertEqual(summary["stats"]["total_size_before"], 100 * len(self.keys))
+        self.assertEqual(summary["stats"]["files_converted"], len(self.keys))
+        self.assertEqual(TEMPLATE["converted"], [])
+
+    def test_last_record_per_key_wins(self):
+        with RunLog(self.log, TEMPLATE) as log:
+            self.convert(log, self.keys[0])
+            self.convert(log, self.keys[1])
+            self.convert(log, self.keys[0], fail=True)
+        self.assertEqual(latest_items(self.log)[self.keys[0]]["section"], "errors")
+        summary = summarize(self.log)
+        self.assertEqual([entry["input"] for entry in summary["converted"]], [self.keys[1]])
+        self.assertEqual([entry["file"] for entry in summary["errors"]], [self.keys[0]])
+        records = [json.loads(line) for line in self.log.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual((records[0]["event"], records[-1]["event"]), ("start", "end"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Scale smoke test: audit a default-size SyntheticSite (1k pages, 10k assets).
+
+Set SYNTHETIC_PAGES to run it bigger (assets scale 10x with pages):
+
+    SYNTHETIC_PAGES=10000 python3 -m unittest scripts/tests/test_scale.py
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools.synthetic import SyntheticSite  # noqa: E402
+from asset_tools.watch import AuditIndex  # noqa: E402
+
+PAGES = int(os.environ.get("SYNTHETIC_PAGES", "1000"))
+
+
+class ScaleSmokeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.site = SyntheticSite(pages=PAGES, assets=PAGES * 10)
+        cls.manifest = cls.site.write(cls.tmp)
+        cls.index = AuditIndex(src_dir=cls.tmp / "src", public_dir=cls.tmp / "public",
+                               pages_dir=cls.tmp / "src" / "pages")
+        started = time.perf_counter()
+        cls.index.build()
+        cls.build_seconds = time.perf_counter() - started
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_full_audit_matches_manifest(self):
+        self.assertEqual(self.manifest["pages"], PAGES + 1)
+        broken = self.index.broken_references()
+        assets = [ref for ref in broken if ref.kind == "asset"]
+        links = [ref for ref in broken if ref.kind == "link" and not ref.path.startswith("/jng/")]
+        self.assertEqual(len(assets), len(self.manifest["broken_assets"]))
+        self.assertEqual(len(links), len(self.manifest["broken_links"]))
+        links = [ref for refs in self.index.references.values() for ref in refs if ref.kind == "link"]
+        self.assertEqual(len(links), self.manifest["links"])
+
+    def test_refresh_is_incremental(self):
+        page, content = next(self.site.iter_pages())
+        path = self.tmp / "src" / "pages" / page
+        path.write_text(content.replace("</BaseLayout>", '<a href="/nao-existe">x</a>\n</BaseLayout>'),
+                        encoding="utf-8")
+        change = self.index.refresh()
+        self.assertEqual(change.files, [path.as_posix()])
+        self.assertEqual([key[2] for key in change.broken], ["/nao-existe"])
+        # One edited page is re-extracted, not the whole tree
+        self.assertLess(change.elapsed, self.build_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()
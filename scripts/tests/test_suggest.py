@@ -0,0 +1,66 @@
+"""
+AssetSuggester on the SyntheticSite asset set.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path, PurePosixPath
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools.suggest import AssetSuggester  # noqa: E402
+from asset_tools.synthetic import SyntheticSite, asset_url  # noqa: E402
+
+
+class AssetSuggesterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = SyntheticSite(pages=10, assets=2000)
+        cls.paths = ["/cdn-assets/" + path for path in cls.site.iter_asset_paths()]
+        cls.renamed = {"/cdn-assets/images/antigo.png": cls.paths[0]}
+        cls.suggester = AssetSuggester(cls.paths, cls.renamed)
+        # Originals only (srcset variants have a near twin in every width)
+        cls.sample = [asset for asset in cls.site.assets if not asset.variants][:50]
+
+    def test_moved_file_is_found(self):
+        # Top-level references predate the images/ folders
+        for asset in self.sample:
+            missing = "/cdn-assets/" + PurePosixPath(asset.path).name
+            best = self.suggester.best(missing)
+            self.assertIsNotNone(best, missing)
+            self.assertEqual((best["path"], best["reason"]), ("/cdn-assets/" + asset.path, "moved"))
+
+    def test_unrelated_folder_is_only_suggested(self):
+        asset = self.sample[0]
+        missing = "/cdn-assets/old/" + PurePosixPath(asset.path).name
+        self.assertEqual(self.suggester.suggest(missing)[0]["path"], "/cdn-assets/" + asset.path)
+        self.assertIsNone(self.suggester.best(missing))
+
+    def test_converted_image_is_found(self):
+        for asset in self.sample:
+            if asset.path.endswith((".png", ".svg")):
+                continue
+            missing = "/cdn-assets/" + str(PurePosixPath(asset.path).with_suffix(".png"))
+            best = self.suggester.best(missing)
+            self.assertIsNotNone(best, missing)
+            self.assertEqual((best["path"], best["reason"]), ("/cdn-assets/" + asset.path, "different extension"))
+
+    def test_encoded_paths_are_decoded(self):
+        for asset in self.sample:
+            best = self.suggester.best(asset_url(PurePosixPath(asset.path).name))
+            self.assertEqual(best["path"], "/cdn-assets/" + asset.path)
+
+    def test_recorded_rename(self):
+        self.assertEqual(self.suggester.suggest("/cdn-assets/images/antigo.png"),
+                         [{"path": self.paths[0], "confidence": 1.0, "reason": "renamed"}])
+        self.assertEqual(self.suggester.best("/cdn-assets/images/antigo.png")["path"], self.paths[0])
+
+    def test_removed_file_has_no_automatic_fix(self):
+        self.assertIsNone(self.suggester.best("/cdn-assets/images/photos/removida-0badf00d.png"))
+
+
+if __name__ == "__main__":
+    unittest.main()
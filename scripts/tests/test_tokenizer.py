@@ -0,0 +1,51 @@
+"""
+The template tokenizer on SyntheticSite pages.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import re
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools.synthetic import SyntheticSite  # noqa: E402
+from asset_tools.tokenizer import attribute_values, tokenize  # noqa: E402
+
+
+class TokenizerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pages = list(SyntheticSite(pages=40, assets=200).iter_pages())
+
+    def test_attribute_values_match_the_markup(self):
+        for page, content in self.pages:
+            tokens = list(tokenize(content, page))
+            for name in ("href", "src", "srcset"):
+                expected = re.findall(rf' {name}="([^"]*)"', content)
+                self.assertEqual([t.value for t in attribute_values(tokens, name)], expected, (page, name))
+
+    def test_offsets_point_into_the_content(self):
+        for page, content in self.pages:
+            for token in tokenize(content, page):
+                if token.kind != "attr" or token.value is None:
+                    continue
+                self.assertEqual(content[token.start:token.end], token.value, (page, token))
+                self.assertEqual(content.count("\n", 0, token.start) + 1, token.line)
+
+    def test_frontmatter_and_expressions(self):
+        page, content = self.pages[0]
+        tokens = list(tokenize(content, page))
+        imports = [t.value for t in tokens if t.kind == "prop"]
+        self.assertEqual(imports, ["@layouts/BaseLayout.astro", "@components/CommunityNavbar.astro"])
+        # {'...'} expressions are unwrapped to the literal, offsets included
+        title, = [t for t in tokens if t.kind == "attr" and t.name == "title"]
+        self.assertEqual(title.quote, "'")
+        self.assertTrue(title.value.endswith("| #jobnagringa"))
+        self.assertEqual(content[title.start - 2:title.start], "{'")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+AuditIndex build and incremental refresh on a written SyntheticSite.
+
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset_tools.routes import page_route  # noqa: E402
+from asset_tools.synthetic import SyntheticSite  # noqa: E402
+from asset_tools.watch import AuditIndex  # noqa: E402
+
+
+class AuditIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.site = SyntheticSite(pages=60, assets=300, broken_asset_rate=0.05)
+        self.manifest = self.site.write(self.tmp)
+        self.pages_dir = self.tmp / "src" / "pages"
+        self.index = AuditIndex(src_dir=self.tmp / "src", public_dir=self.tmp / "public", pages_dir=self.pages_dir)
+        self.broken_count = self.index.build()
+
+    def broken(self, kind):
+        return {(Path(ref.file).relative_to(self.pages_dir).as_posix(), ref.path)
+                for ref in self.index.broken_references() if ref.kind == kind}
+
+    def test_build_finds_the_manifest_entries(self):
+        self.assertEqual(self.broken("asset"),
+                         {(entry["page"], "/cdn-assets/" + entry["path"]) for entry in self.manifest["broken_assets"]})
+        # Legacy /jng/*.html links are generated without targets
+        links = {link for link in self.broken("link") if not link[1].startswith("/jng/")}
+        self.assertEqual(links, {(entry["page"], entry["href"]) for entry in self.manifest["broken_links"]})
+        self.assertEqual(self.broken_count, len(self.index.broken_references()))
+
+    def test_refresh_reports_fixed_asset(self):
+        entry = self.manifest["broken_assets"][0]
+        (self.tmp / "public" / "cdn-assets" / entry["path"]).write_bytes(b"restored\n")
+        change = self.index.refresh()
+        self.assertEqual(change.broken, [])
+        self.assertIn(("asset", "/cdn-assets/" + entry["path"]), [key[1:] for key in change.fixed])
+        self.assertEqual(change.files, [(self.tmp / "public" / "cdn-assets" / entry["path"]).as_posix()])
+
+    def test_refresh_reports_edited_page(self):
+        self.assertEqual(self.index.refresh().files, [])
+        page, content = next(self.site.iter_pages())
+        path = self.pages_dir / page
+        path.write_text(content.replace("</BaseLayout>", '<a href="/vagas/nao-existe">x</a>\n</BaseLayout>'),
+                        encoding="utf-8")
+        change = self.index.refresh()
+        self.assertEqual(change.broken, [(path.as_posix(), "link", "/vagas/nao-existe")])
+        self.assertEqual(change.fixed, [])
+
+    def test_refresh_after_page_removal(self):
+        entry = self.manifest["broken_links"][0]
+        removed = self.pages_dir / entry["page"]
+        route = page_route(removed, self.pages_dir)
+        linking = {(self.pages_dir / page).as_posix() for page, content in self.site.iter_pages()
+                   if f'href="{route}"' in content and page != entry["page"]}
+        removed.unlink()
+        # The page takes its broken links with it and breaks the links to its route
+        change = self.index.refresh()
+        self.assertIn(removed.as_posix(), [key[0] for key in change.fixed])
+        self.assertEqual(change.broken, sorted((file, "link", route) for file in linking))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,19 +8,14 @@ import re
 import json
 from pathlib import Path
 
+from asset_tools.inventory import get_inventory
+
 BASE_DIR = Path(__file__).parent.parent
 MIGRATION_MAP_FILE = BASE_DIR / "scripts" / "asset-migration-map.json"
 
-# Files to search and update
-SEARCH_PATTERNS = [
-    "**/*.astro",
-    "**/*.ts",
-    "**/*.tsx",
-    "**/*.js",
-    "**/*.jsx",
-    "**/*.css",
-    "**/*.html",
-]
+# Directories and files to search and update (scripts/ holds fixed benchmark fixtures)
+SEARCH_DIRS = [BASE_DIR / "src", BASE_DIR / "public"]
+SEARCH_EXTENSIONS = {'.astro', '.ts', '.tsx', '.js', '.jsx', '.css', '.html'}
 
 def load_migration_map():
     """Load the migration map."""
@@ -115,17 +110,9 @@ def update_file_references(file_path, reverse_map):
 
 def find_files_to_update():
     """Find all files that might contain asset references."""
-    files = []
-    
-    for pattern in SEARCH_PATTERNS:
-        for file_path in BASE_DIR.glob(pattern):
-            # Skip node_modules, .git, dist, etc.
-            if any(part in str(file_path) for part in ['node_modules', '.git', 'dist', '.astro']):
-                continue
-            if file_path.is_file():
-                files.append(file_path)
-    
-    return files
+    # node_modules, .git, dist and .astro are pruned by the inventory walk
+    inventory = get_inventory()
+    return [file_path for search_dir in SEARCH_DIRS for file_path in inventory.files(search_dir, SEARCH_EXTENSIONS)]
 
 def main():
     """Main function."""
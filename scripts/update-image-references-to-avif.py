@@ -8,6 +8,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+from asset_tools.inventory import get_inventory
+
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
 PUBLIC_DIR = BASE_DIR / "public"
@@ -81,13 +83,12 @@ def main():
     files_processed = 0
     
     # Process all source files
-    for ext in SOURCE_EXTENSIONS:
-        for file_path in SRC_DIR.rglob(f"*{ext}"):
-            files_processed += 1
-            if process_file(file_path):
-                rel_path = file_path.relative_to(BASE_DIR)
-                files_updated.append(str(rel_path))
-                print(f"Updated: {rel_path}")
+    for file_path in get_inventory().files(SRC_DIR, SOURCE_EXTENSIONS):
+        files_processed += 1
+        if process_file(file_path):
+            rel_path = file_path.relative_to(BASE_DIR)
+            files_updated.append(str(rel_path))
+            print(f"Updated: {rel_path}")
     
     print(f"\n{'='*60}")
     print("UPDATE SUMMARY")
@@ -4,13 +4,13 @@ Update all image references in source files to use new paths from mapping.
 """
 
 import re
-import json
 from pathlib import Path
 from collections import defaultdict
 
+from asset_tools.catalog import open_catalog
+
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
-MAPPING_FILE = BASE_DIR / "scripts" / "image-mapping.json"
 
 # Patterns to match image references
 IMAGE_REF_PATTERNS = [
@@ -23,13 +23,13 @@ IMAGE_REF_PATTERNS = [
 ]
 
 def load_mapping():
-    """Load the image mapping."""
-    with open(MAPPING_FILE, "r", encoding="utf-8") as f:
-        mapping = json.load(f)
+    """Load the image mapping from the asset catalog."""
+    with open_catalog() as catalog:
+        mapping = catalog.mappings("image-mapping")
     
     # Create reverse lookup: old_path -> new_path
     path_mapping = {}
-    for item in mapping.values():
+    for item in mapping:
         old_path = item["old_path"]
         new_path = item["new_path"]
         path_mapping[old_path] = new_path
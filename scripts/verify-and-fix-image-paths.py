@@ -5,15 +5,19 @@ Ensures all image references point to existing files.
 """
 
 import os
-import re
 from pathlib import Path
-from urllib.parse import unquote
+from urllib.parse import unquote, urlsplit
+
+from asset_tools.references import split_srcset
+from asset_tools.tokenizer import tokenize
 
 BASE_DIR = Path(__file__).parent.parent
 SRC_DIR = BASE_DIR / "src"
 PUBLIC_DIR = BASE_DIR / "public"
 CDN_ASSETS = PUBLIC_DIR / "cdn-assets"
 
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.avif', '.webp', '.svg'}
+
 def find_image_references_in_file(file_path):
     """Find all image references in a file."""
     try:
@@ -24,12 +28,16 @@ def find_image_references_in_file(file_path):
     
     references = []
     
-    # Pattern for /cdn-assets/ paths
-    pattern = r'(/cdn-assets/[^"\'\s\)]+\.(?:jpg|jpeg|png|gif|bmp|tiff|tif|avif|webp|svg))'
-    
-    for match in re.finditer(pattern, content, re.IGNORECASE):
-        path = match.group(1)
-        references.append((match.start(), match.end(), path))
+    for token in tokenize(content, file_path):
+        if not token.value or '/cdn-assets/' not in token.value or token.quote == '{':
+            continue
+        candidates = split_srcset(token.value) if token.name and token.name.lower() == 'srcset' else [token.value]
+        for path in candidates:
+            path = urlsplit(path).path
+            if not path.startswith('/cdn-assets/') or Path(path).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            start = content.find(path, token.start, token.end)
+            references.append((start, start + len(path), path))
     
     return references
 
@@ -37,7 +45,7 @@ def check_file_exists(image_path):
     """Check if image file exists."""
     # Remove leading slash
     rel_path = image_path.lstrip('/')
-    full_path = BASE_DIR / rel_path
+    full_path = PUBLIC_DIR / rel_path
     
     # Try exact path
     if full_path.exists():
@@ -45,7 +53,7 @@ def check_file_exists(image_path):
     
     # Try URL-decoded path
     decoded_path = unquote(rel_path)
-    decoded_full = BASE_DIR / decoded_path
+    decoded_full = PUBLIC_DIR / decoded_path
     if decoded_full.exists():
         return True, decoded_full
     
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Watch src/ and public/ and report broken references as files change.
+
+Keeps the public/ inventory, the references of every source file and the
+route table in memory, polls both trees (mtime and size only) and
+re-extracts just the files that changed, printing which asset references
+and internal links broke or were fixed by each save.
+
+Usage:
+    python3 scripts/watch-audit.py                 # watch, polling every 0.5 s
+    python3 scripts/watch-audit.py --interval 0.2
+    python3 scripts/watch-audit.py --once          # index once and list broken references
+"""
+
+import sys
+import time
+import argparse
+
+from asset_tools.watch import AuditIndex
+
+
+def print_references(index, keys, mark):
+    for ref in index.broken_references(set(keys)):
+        print(f"  {mark} {ref.file}:{ref.line} {ref.kind} {ref.path}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Watch mode for the broken reference audit")
+    parser.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds")
+    parser.add_argument("--once", action="store_true", help="Index once, print broken references and exit")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BROKEN REFERENCE WATCH")
+    print("=" * 70)
+    started = time.perf_counter()
+    index = AuditIndex()
+    broken = index.build()
+    references = sum(len(refs) for refs in index.references.values())
+    print(f"Indexed {len(index.src_files)} source files, {len(index.assets)} public files, "
+          f"{references} references in {(time.perf_counter() - started) * 1000:.0f} ms")
+    print(f"Broken references: {broken}")
+
+    if args.once:
+        for ref in index.broken_references():
+            print(f"  ✗ {ref.file}:{ref.line} {ref.kind} {ref.path}")
+        return 1 if broken else 0
+
+    print(f"Watching src/ and public/ every {args.interval}s (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            change = index.refresh()
+            if not change.files:
+                continue
+            print()
+            print(f"[{time.strftime('%H:%M:%S')}] {len(change.files)} file(s) changed, "
+                  f"checked in {change.elapsed * 1000:.1f} ms")
+            print_references(index, change.broken, "✗")
+            for file, kind, path in change.fixed:
+                print(f"  ✓ {file} {kind} {path}")
+            if change.broken or change.fixed:
+                print(f"Broken references: {sum(index.broken.values())}")
+    except KeyboardInterrupt:
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
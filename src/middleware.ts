@@ -1,5 +1,10 @@
 import { clerkMiddleware, createRouteMatcher, clerkClient } from '@clerk/astro/server';
+import { defineMiddleware, sequence } from 'astro:middleware';
 import type { APIContext } from 'astro';
+// Generated by scripts/generate-legacy-redirects.py
+import legacyHtmlRedirects from './data/legacy-html-redirects.json';
+
+const LEGACY_REDIRECTS: Record<string, string> = legacyHtmlRedirects;
 
 const isPublicRoute = createRouteMatcher([
   '/sign-in(.*)',
@@ -34,7 +39,16 @@ const checkIsPaidCustomer = async (context: APIContext, userId: string): Promise
 
 const isDev = import.meta.env.DEV;
 
-export const onRequest = clerkMiddleware(async (auth, context, next) => {
+// Old Webflow URLs (/jng/aulas/foo.html) get a 301 to their new route with a
+// single lookup, before the authentication middleware runs
+const redirectLegacyUrls = defineMiddleware((context, next) => {
+  const { pathname, search } = context.url;
+  const path = pathname.length > 1 ? pathname.replace(/\/+$/, '') : pathname;
+  const target = LEGACY_REDIRECTS[path];
+  return target ? context.redirect(target + search, 301) : next();
+});
+
+const authenticate = clerkMiddleware(async (auth, context, next) => {
   if (isDev || isTesting || isPublicRoute(context.request)) {
     return next();
   }
@@ -53,3 +67,5 @@ export const onRequest = clerkMiddleware(async (auth, context, next) => {
 
   return next();
 });
+
+export const onRequest = sequence(redirectLegacyUrls, authenticate);